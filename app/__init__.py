@@ -4,8 +4,10 @@ from flask_migrate import Migrate
 from flask_login import LoginManager
 from flask_cors import CORS
 from app.config import config
+from app.engine import RoutingSession
 
-db = SQLAlchemy()
+# Reads of GET requests go to the REPLICA_DATABASE_URL bind when configured
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 login_manager = LoginManager()
 
@@ -17,7 +19,14 @@ def create_app(config_name='default'):
     
     # Initialize extensions
     db.init_app(app)
-    migrate.init_app(app, db)
+    # SQLite can't ALTER most constraints; migrations rebuild tables in batch mode
+    migrate.init_app(app, db, render_as_batch=True)
+    
+    # Per-backend connection tuning (SQLite pragmas, read-only replica)
+    from app.engine import init_engines, write_markers
+    with app.app_context():
+        init_engines(db.engines, app.config)
+    write_markers.init_app(app)
     
     # Initialize CORS for REST API
     CORS(app, resources={
@@ -41,8 +50,8 @@ def create_app(config_name='default'):
     
     @login_manager.user_loader
     def load_user(user_id):
-        from app.models import User
-        return User.query.get(int(user_id))
+        from app.services.identity_cache import identity_cache
+        return identity_cache.get_user(int(user_id))
     
     # Register blueprints - Template-based routes (legacy)
     from app.routes.main import main_bp
@@ -72,6 +81,27 @@ def create_app(config_name='default'):
     app.register_blueprint(api_ai_bp, url_prefix='/api/ai')
     app.register_blueprint(api_users_bp, url_prefix='/api/users')
     
+    # Buffered review log writer
+    from app.services.review_log import review_log_buffer
+    review_log_buffer.init_app(app)
+    
+    # Versioned response cache for aggregate endpoints
+    from app.services.response_cache import response_cache
+    response_cache.init_app(app)
+    
+    # Identity payloads for /me, profile and dashboard
+    from app.services.identity_cache import identity_cache
+    identity_cache.init_app(app)
+    
+    # Persistent caches of AI flashcard generations and answer evaluations
+    from app.services.generation_cache import generation_cache, evaluation_cache
+    generation_cache.init_app(app, 'GENERATION_CACHE')
+    evaluation_cache.init_app(app, 'EVALUATION_CACHE')
+    
+    # Register CLI commands
+    from app.commands import register_commands
+    register_commands(app)
+    
     # Custom Jinja2 filters for timezone
     from datetime import timedelta
     
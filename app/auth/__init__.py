@@ -6,8 +6,11 @@ from app.auth.jwt import (
     generate_tokens,
     revoke_token,
     get_current_user_id,
+    identity_claims,
+    user_from_claims,
     user_to_dict
 )
+from app.auth.revocation import token_revocations
 
 __all__ = [
     'jwt',
@@ -15,5 +18,8 @@ __all__ = [
     'generate_tokens',
     'revoke_token',
     'get_current_user_id',
-    'user_to_dict'
+    'identity_claims',
+    'user_from_claims',
+    'user_to_dict',
+    'token_revocations'
 ]
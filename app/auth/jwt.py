@@ -1,8 +1,8 @@
 """JWT Authentication utilities for Flask REST API."""
 
 from functools import wraps
-from datetime import timedelta
-from flask import jsonify
+from datetime import datetime, timedelta
+from flask import current_app, jsonify
 from flask_jwt_extended import (
     JWTManager,
     create_access_token,
@@ -12,10 +12,9 @@ from flask_jwt_extended import (
     get_jwt
 )
 
-jwt = JWTManager()
+from app.auth.revocation import token_revocations
 
-# Token blocklist for logout functionality
-token_blocklist = set()
+jwt = JWTManager()
 
 
 def init_jwt(app):
@@ -29,12 +28,13 @@ def init_jwt(app):
     app.config.setdefault('JWT_HEADER_TYPE', 'Bearer')
     
     jwt.init_app(app)
+    token_revocations.init_app(app)
     
-    # Register token blocklist callback
+    # Register token blocklist callback (Bloom filter first, store only on a hit)
     @jwt.token_in_blocklist_loader
     def check_if_token_revoked(jwt_header, jwt_payload):
         jti = jwt_payload['jti']
-        return jti in token_blocklist
+        return token_revocations.is_revoked(jti)
     
     # Custom error handlers
     @jwt.expired_token_loader
@@ -69,7 +69,10 @@ def init_jwt(app):
 
 
 def generate_tokens(user_id, additional_claims=None):
-    """Generate access and refresh tokens for a user."""
+    """Generate access and refresh tokens for a user (who the request now acts for)."""
+    from app.engine import authenticate_client
+    
+    authenticate_client(user_id)
     claims = additional_claims or {}
     access_token = create_access_token(identity=str(user_id), additional_claims=claims)
     refresh_token = create_refresh_token(identity=str(user_id), additional_claims=claims)
@@ -79,9 +82,16 @@ def generate_tokens(user_id, additional_claims=None):
     }
 
 
-def revoke_token(jti):
-    """Add a token to the blocklist."""
-    token_blocklist.add(jti)
+def revoke_token(jti, expires_at=None, user_id=None):
+    """
+    Add a token to the shared revocation list.
+    
+    expires_at: when the token expires (naive UTC); the revocation is pruned
+    after that. Defaults to the longest token lifetime from now.
+    """
+    if expires_at is None:
+        expires_at = datetime.utcnow() + current_app.config['JWT_REFRESH_TOKEN_EXPIRES']
+    token_revocations.revoke(jti, expires_at, user_id)
 
 
 def get_current_user_id():
@@ -90,6 +100,25 @@ def get_current_user_id():
     return int(identity) if identity else None
 
 
+def identity_claims(user_data):
+    """Token claims that let /me be answered without a database read."""
+    return {
+        'username': user_data['username'],
+        'email': user_data['email'],
+        'full_name': user_data['full_name']
+    }
+
+
+def user_from_claims(user_id, claims):
+    """Rebuild the identity part of user_to_dict from a token's claims."""
+    return {
+        'id': user_id,
+        'username': claims.get('username'),
+        'email': claims.get('email'),
+        'full_name': claims.get('full_name')
+    }
+
+
 def user_to_dict(user):
     """Convert a User model to a dictionary for API responses."""
     return {
@@ -0,0 +1,208 @@
+"""Shared JWT revocation list with an in-process Bloom filter in front."""
+
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import RevokedToken
+
+# Incremental refreshes re-read this much history, so a revocation whose
+# transaction committed after a later-stamped one is still picked up
+REFRESH_OVERLAP = timedelta(seconds=30)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no false negatives, tunable false positives)."""
+    
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(capacity, 1)
+        self.size = max(int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(int(round(self.size / self.capacity * math.log(2))), 1)
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+    
+    def _positions(self, key: str):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+    
+    def add(self, key: str):
+        added = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not self._bits[position >> 3] & mask:
+                self._bits[position >> 3] |= mask
+                added = True
+        # Re-adding a present key (or a false positive) leaves the count alone
+        if added:
+            self.count += 1
+    
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class MemoryRevocationStore:
+    """Per-process store: revocations are not shared between workers or kept across restarts."""
+    
+    def __init__(self):
+        self._tokens: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+    
+    def add(self, jti: str, expires_at: datetime, user_id: Optional[int] = None):
+        with self._lock:
+            self._tokens[jti] = (datetime.utcnow(), expires_at)
+    
+    def contains(self, jti: str) -> bool:
+        return jti in self._tokens
+    
+    def revoked_since(self, since: datetime) -> Iterable[str]:
+        with self._lock:
+            return [jti for jti, (revoked_at, _) in self._tokens.items() if revoked_at > since]
+    
+    def active(self) -> Iterable[str]:
+        return list(self._tokens)
+    
+    def prune(self, now: datetime) -> int:
+        with self._lock:
+            expired = [jti for jti, (_, expires_at) in self._tokens.items() if expires_at < now]
+            for jti in expired:
+                del self._tokens[jti]
+        return len(expired)
+
+
+class DatabaseRevocationStore:
+    """
+    Revocations in the revoked_tokens table, shared by every worker.
+    
+    Reads and writes go through the primary engine, never a session, so a
+    revocation check neither joins the request's transaction nor reads a
+    lagging replica.
+    """
+    
+    table = RevokedToken.__table__
+    
+    def add(self, jti: str, expires_at: datetime, user_id: Optional[int] = None):
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(insert(self.table).values(
+                    jti=jti, user_id=user_id, revoked_at=datetime.utcnow(), expires_at=expires_at
+                ))
+        except IntegrityError:
+            pass  # already revoked
+    
+    def contains(self, jti: str) -> bool:
+        with db.engine.connect() as connection:
+            return connection.execute(
+                select(self.table.c.jti).where(self.table.c.jti == jti)
+            ).first() is not None
+    
+    def revoked_since(self, since: datetime) -> Iterable[str]:
+        with db.engine.connect() as connection:
+            return connection.execute(
+                select(self.table.c.jti).where(self.table.c.revoked_at > since)
+            ).scalars().all()
+    
+    def active(self) -> Iterable[str]:
+        with db.engine.connect() as connection:
+            return connection.execute(select(self.table.c.jti)).scalars().all()
+    
+    def prune(self, now: datetime) -> int:
+        with db.engine.begin() as connection:
+            return connection.execute(self.table.delete().where(self.table.c.expires_at < now)).rowcount
+
+
+class TokenRevocationList:
+    """
+    Answer "is this token revoked?" from a Bloom filter, confirming hits in the store.
+    
+    The common not-revoked path is a few in-memory bit tests. Each worker
+    pulls revocations made by other workers at most every `refresh_seconds`
+    (checked on the next lookup), so a logout takes effect everywhere within
+    that delay. Every `rebuild_seconds` expired revocations are pruned and
+    the filter is rebuilt from what remains, which also resizes it.
+    """
+    
+    STORES = ('database', 'memory')
+    
+    def __init__(self, store=None, refresh_seconds: float = 5.0, rebuild_seconds: float = 3600,
+                 capacity: int = 100000, error_rate: float = 0.001):
+        self.store = store or MemoryRevocationStore()
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._bloom: Optional[BloomFilter] = None
+        self._since: Optional[datetime] = None
+        self._refresh_due = 0.0
+        self._rebuild_due = 0.0
+        self._lock = threading.Lock()
+    
+    def init_app(self, app):
+        """Pick the store from JWT_REVOCATION_STORE and read the refresh settings."""
+        kind = app.config.get('JWT_REVOCATION_STORE', 'database')
+        if kind not in self.STORES:
+            raise ValueError(f'JWT_REVOCATION_STORE must be one of {", ".join(self.STORES)}')
+        self.store = DatabaseRevocationStore() if kind == 'database' else MemoryRevocationStore()
+        self.refresh_seconds = app.config.get('JWT_REVOCATION_REFRESH_SECONDS', self.refresh_seconds)
+        self.rebuild_seconds = app.config.get('JWT_REVOCATION_REBUILD_SECONDS', self.rebuild_seconds)
+        self.capacity = app.config.get('JWT_REVOCATION_BLOOM_CAPACITY', self.capacity)
+        self._bloom = None
+    
+    def revoke(self, jti: str, expires_at: datetime, user_id: Optional[int] = None):
+        """Record a revocation; it applies in this worker immediately."""
+        self.store.add(jti, expires_at, user_id)
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+    
+    def is_revoked(self, jti: str) -> bool:
+        self._sync()
+        if jti not in self._bloom:
+            return False
+        # Possible false positive: ask the store
+        return self.store.contains(jti)
+    
+    def rebuild(self):
+        """Prune expired revocations and rebuild the filter from the rest."""
+        with self._lock:
+            started = datetime.utcnow()
+            self.store.prune(started)
+            active = self.store.active()
+            bloom = BloomFilter(max(self.capacity, 2 * len(active)), self.error_rate)
+            for jti in active:
+                bloom.add(jti)
+            self._bloom = bloom
+            self._since = started - REFRESH_OVERLAP
+            now = time.monotonic()
+            self._refresh_due = now + self.refresh_seconds
+            self._rebuild_due = now + self.rebuild_seconds
+    
+    def _sync(self):
+        now = time.monotonic()
+        if self._bloom is None or now >= self._rebuild_due:
+            self.rebuild()
+        elif now >= self._refresh_due:
+            self._refresh()
+    
+    def _refresh(self):
+        with self._lock:
+            if time.monotonic() < self._refresh_due:
+                return  # another thread just refreshed
+            started = datetime.utcnow()
+            for jti in self.store.revoked_since(self._since):
+                self._bloom.add(jti)
+            self._since = started - REFRESH_OVERLAP
+            self._refresh_due = time.monotonic() + self.refresh_seconds
+            if self._bloom.count > self._bloom.capacity:
+                # Over capacity the false-positive rate climbs; resize on the next lookup
+                self._rebuild_due = 0.0
+
+
+token_revocations = TokenRevocationList()
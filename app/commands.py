@@ -0,0 +1,182 @@
+"""Flask CLI maintenance commands."""
+
+import click
+from flask.cli import AppGroup
+from app import db
+
+decks_cli = AppGroup('decks', help='Deck maintenance commands.')
+
+
+@decks_cli.command('rebuild-paths')
+def rebuild_paths():
+    """Recompute materialized deck paths from parent ids."""
+    from app.models import Deck
+    
+    count = Deck.rebuild_paths()
+    db.session.commit()
+    click.echo(f'Rebuilt paths for {count} decks.')
+
+
+@decks_cli.command('reconcile-counts')
+def reconcile_counts():
+    """Recompute every deck's card_count and total_card_count from the cards table."""
+    from app.models import Deck
+    
+    count = Deck.reconcile_card_counts()
+    db.session.commit()
+    click.echo(f'Reconciled card counts for {count} decks.')
+
+
+@decks_cli.command('reconcile-stats')
+def reconcile_stats():
+    """Rebuild the per-deck review statistics rollup from the cards table."""
+    from app.models import DeckStats
+    
+    count = DeckStats.rebuild()
+    db.session.commit()
+    click.echo(f'Rebuilt review statistics for {count} decks.')
+
+
+@decks_cli.command('backfill-owners')
+@click.option('--owner', type=int, help='User to assign every unowned deck to first.')
+def backfill_owners(owner):
+    """Copy deck owners onto their flashcards and test results (user_id)."""
+    from sqlalchemy import select
+    from app.models import Deck, Flashcard, TestResult
+    
+    decks = Deck.__table__
+    claimed = 0
+    if owner is not None:
+        claimed = db.session.execute(
+            decks.update().where(decks.c.user_id.is_(None)).values(user_id=owner)
+        ).rowcount
+    
+    counts = []
+    for table in (Flashcard.__table__, TestResult.__table__):
+        deck_owner = select(decks.c.user_id).where(decks.c.id == table.c.deck_id).scalar_subquery()
+        counts.append(db.session.execute(
+            table.update().where(table.c.deck_id.isnot(None)).values(user_id=deck_owner)
+        ).rowcount)
+    db.session.commit()
+    click.echo(f'Claimed {claimed} decks; set owners on {counts[0]} cards and {counts[1]} test results.')
+
+
+@decks_cli.command('reschedule')
+@click.argument('deck_id', type=int)
+@click.option('--shift-days', type=int, help='Move every due date by this many days.')
+@click.option('--exam-date', type=click.DateTime(), help='Compress the schedule to finish by this date.')
+@click.option('--interval-modifier', type=float, help='Recompute intervals scaled by this factor.')
+@click.option('--max-interval', type=int, default=36500, show_default=True,
+              help='Upper bound on recomputed intervals, in days.')
+@click.option('--include-subdecks', is_flag=True, help='Also reschedule every sub-deck.')
+def reschedule(deck_id, shift_days, exam_date, interval_modifier, max_interval, include_subdecks):
+    """Bulk-reschedule the reviewed cards of DECK_ID."""
+    from app.services.rescheduler import BulkRescheduler
+    from app.services.response_cache import response_cache
+    
+    chosen = [opt for opt in (shift_days, exam_date, interval_modifier) if opt is not None]
+    if len(chosen) != 1:
+        raise click.UsageError('Pass exactly one of --shift-days, --exam-date or --interval-modifier.')
+    
+    rescheduler = BulkRescheduler(deck_id, include_subdecks=include_subdecks)
+    if shift_days is not None:
+        count = rescheduler.shift(shift_days)
+    elif exam_date is not None:
+        count = rescheduler.compress_to(exam_date)
+    else:
+        count = rescheduler.recompute(interval_modifier=interval_modifier, max_interval=max_interval)
+    db.session.commit()
+    response_cache.invalidate(rescheduler.deck_ids())
+    click.echo(f'Rescheduled {count} cards.')
+
+
+@decks_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--deck-id', type=int, help='Existing deck to nest the imported decks under.')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'tsv', 'apkg']),
+              help='File format (default: from the file extension).')
+@click.option('--chunk-size', type=int, default=2000, show_default=True,
+              help='Rows per multi-row INSERT.')
+@click.option('--user-id', type=int, help='Owner of the imported decks and cards.')
+def import_cards(path, deck_id, fmt, chunk_size, user_id):
+    """Bulk-import flashcards from a CSV/TSV file or an Anki .apkg package."""
+    import os
+    from app.services.importer import FlashcardImporter
+    from app.services.response_cache import response_cache
+    
+    importer = FlashcardImporter(
+        user_id=user_id,
+        parent_id=deck_id,
+        default_deck=os.path.splitext(os.path.basename(path))[0],
+        chunk_size=chunk_size
+    )
+    try:
+        result = importer.import_file(path, fmt or FlashcardImporter.detect_format(path))
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    db.session.commit()
+    response_cache.invalidate(result.deck_ids)
+    click.echo(
+        f'Imported {result.imported} cards ({result.skipped} skipped, '
+        f'{result.decks_created} decks created) in {result.seconds:.2f}s '
+        f'({result.rows_per_second:.0f} rows/sec).'
+    )
+
+
+scheduler_cli = AppGroup('scheduler', help='Spaced repetition scheduler commands.')
+
+
+@scheduler_cli.command('optimize')
+@click.argument('user_id', type=int)
+@click.option('--iterations', type=int, default=150, show_default=True, help='Optimizer iterations.')
+def optimize(user_id, iterations):
+    """Fit FSRS parameters for USER_ID from their review log."""
+    from app.models import User
+    from app.scheduling.optimizer import FSRSOptimizer, optimize_user
+    
+    user = db.session.get(User, user_id)
+    if not user:
+        raise click.BadParameter(f'No user with id {user_id}', param_hint='USER_ID')
+    
+    try:
+        result = optimize_user(user, FSRSOptimizer(iterations=iterations))
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    db.session.commit()
+    click.echo(
+        f'Fitted {len(result.params)} parameters on {result.reviews} reviews '
+        f'({result.cards} cards) in {result.seconds}s: '
+        f'log-loss {result.initial_loss} -> {result.final_loss}'
+    )
+
+
+replica_cli = AppGroup('replica', help='Read replica commands.')
+
+
+@replica_cli.command('sync')
+def sync_replica():
+    """Copy the primary SQLite database into the replica file (for local testing)."""
+    import sqlite3
+    from app.engine import REPLICA_BIND
+    
+    replica = db.engines.get(REPLICA_BIND)
+    if replica is None:
+        raise click.ClickException('REPLICA_DATABASE_URL is not set.')
+    if db.engine.dialect.name != 'sqlite' or replica.dialect.name != 'sqlite':
+        raise click.ClickException('Only SQLite files can be synced; use streaming replication for PostgreSQL.')
+    
+    source = db.engine.raw_connection()
+    target = sqlite3.connect(replica.url.database)
+    try:
+        source.driver_connection.backup(target)
+    finally:
+        target.close()
+        source.close()
+    click.echo(f'Copied {db.engine.url.database} to {replica.url.database}.')
+
+
+def register_commands(app):
+    """Register CLI command groups on the application."""
+    app.cli.add_command(decks_cli)
+    app.cli.add_command(scheduler_cli)
+    app.cli.add_command(replica_cli)
@@ -0,0 +1,59 @@
+"""Conditional GET helpers: cheap collection validators, ETag and Last-Modified."""
+
+import hashlib
+from flask import Response, request
+from sqlalchemy import func
+from app import db
+
+
+def collection_state(model, *criteria):
+    """
+    Return (row count, max updated_at) of `model` rows matching `criteria`.
+
+    One aggregate over indexed columns; any insert or update moves the
+    timestamp and any delete moves the count.
+    """
+    count, last_updated = db.session.query(
+        func.count(model.id), func.max(model.updated_at)
+    ).filter(*criteria).one()
+    return count, last_updated
+
+
+def collection_validators(*states):
+    """
+    Combine collection states into a weak ETag and a Last-Modified datetime.
+
+    Returns:
+        Tuple of (etag, last_modified); last_modified is None for empty scopes.
+    """
+    fingerprint = '|'.join(
+        f'{count}:{last_updated.isoformat() if last_updated else "-"}' for count, last_updated in states
+    )
+    etag = hashlib.md5(fingerprint.encode()).hexdigest()
+    last_modified = max((last_updated for _, last_updated in states if last_updated), default=None)
+    return etag, last_modified
+
+
+def is_not_modified(etag):
+    """True if the request's If-None-Match already holds `etag`."""
+    return request.if_none_match.contains_weak(etag)
+
+
+def not_modified(etag, last_modified=None):
+    """Build an empty 304 response carrying the current validators."""
+    return with_validators(Response(status=304), etag, last_modified)
+
+
+def with_validators(response, etag, last_modified=None):
+    """
+    Attach ETag, Last-Modified and a revalidate-every-time Cache-Control.
+
+    Only If-None-Match is honoured: a delete lowers the row count without
+    moving max(updated_at), so Last-Modified alone could hide it.
+    """
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
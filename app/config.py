@@ -2,6 +2,34 @@ import os
 from datetime import timedelta
 
 
+def engine_options(uri, pool_size=5, max_overflow=10, statement_timeout_ms=30000, read_only=False):
+    """SQLAlchemy engine options for the database backend named by `uri`."""
+    if uri.startswith('postgresql'):
+        options = f'-c statement_timeout={statement_timeout_ms}'
+        if read_only:
+            options += ' -c default_transaction_read_only=on'
+        return {
+            'pool_size': pool_size,
+            'max_overflow': max_overflow,
+            # Drop connections the server closed while idle instead of failing the request
+            'pool_pre_ping': True,
+            'pool_recycle': 1800,
+            'connect_args': {'options': options}
+        }
+    # SQLite is tuned per connection with SQLITE_PRAGMAS (see app/engine.py)
+    return {}
+
+
+def replica_binds(uri, pool_size=5, max_overflow=10, statement_timeout_ms=30000):
+    """SQLALCHEMY_BINDS entry for the optional read replica (empty when unset)."""
+    if not uri:
+        return {}
+    if uri.startswith('postgres://'):
+        uri = uri.replace('postgres://', 'postgresql://', 1)
+    options = engine_options(uri, pool_size, max_overflow, statement_timeout_ms, read_only=True)
+    return {'replica': dict(options, url=uri)}
+
+
 class Config:
     """Base configuration."""
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -14,10 +42,89 @@ class Config:
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Engine profiles. SQLite: WAL lets readers run alongside the single
+    # writer, and busy_timeout makes writers wait instead of failing with
+    # "database is locked". PostgreSQL: bounded pool per worker and a
+    # server-side statement timeout.
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 10000)),
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,  # negative = KiB, i.e. 64 MiB
+        'temp_store': 'MEMORY'
+    }
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        SQLALCHEMY_DATABASE_URI, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_STATEMENT_TIMEOUT_MS
+    )
+    
+    # Optional read replica: SELECTs of GET requests go to it, except for
+    # clients that committed a write within REPLICA_STICKY_SECONDS. Those
+    # clients are recorded in a SQLite file shared by the workers on the host
+    # (REPLICA_STICKY_PATH, default instance/replica_sticky.db); with several
+    # hosts, keep each client on one host.
+    REPLICA_DATABASE_URL = os.environ.get('REPLICA_DATABASE_URL')
+    REPLICA_STICKY_SECONDS = float(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+    REPLICA_STICKY_PATH = os.environ.get('REPLICA_STICKY_PATH')
+    SQLALCHEMY_BINDS = replica_binds(
+        REPLICA_DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_STATEMENT_TIMEOUT_MS
+    )
+    
     # AI Configuration
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
     GROQ_API_KEY = os.environ.get('GROQ_API_KEY', '')
     
+    # Review log: records are buffered per worker and written in multi-row batches
+    REVIEW_LOG_BATCH_SIZE = int(os.environ.get('REVIEW_LOG_BATCH_SIZE', 50))
+    REVIEW_LOG_FLUSH_SECONDS = float(os.environ.get('REVIEW_LOG_FLUSH_SECONDS', 5))
+    # Per-worker cap while the database is unreachable; the oldest records go first
+    REVIEW_LOG_MAX_BUFFER = int(os.environ.get('REVIEW_LOG_MAX_BUFFER', 10000))
+    
+    # Reviews POST /api/users/scheduler/optimize fits on (most recent cards
+    # first); `flask scheduler optimize` always uses the full history
+    FSRS_OPTIMIZE_MAX_REVIEWS = int(os.environ.get('FSRS_OPTIMIZE_MAX_REVIEWS', 20000))
+    
+    # Response cache for aggregate endpoints: "sqlite" (shared by all workers
+    # on the host), "lru" or "none". With lru every worker keeps its own
+    # entries and invalidation counters, so after a write the other workers
+    # keep serving their copy for up to RESPONSE_CACHE_TTL seconds; use it
+    # only with a single worker process.
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'sqlite')
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+    RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 300))
+    RESPONSE_CACHE_PATH = os.environ.get('RESPONSE_CACHE_PATH')
+    
+    # Serialized user profiles for /me, profile and dashboard, per worker.
+    # Profile changes retire them in all workers only when the response cache
+    # backend is shared (sqlite); with lru other workers lag up to the TTL.
+    IDENTITY_CACHE_TTL = float(os.environ.get('IDENTITY_CACHE_TTL', 30))
+    IDENTITY_CACHE_MAX_ENTRIES = int(os.environ.get('IDENTITY_CACHE_MAX_ENTRIES', 1024))
+    
+    # AI flashcard generations keyed by source text hash and parameters:
+    # sqlite (LRU per worker in front of a file shared on the host), lru or none
+    GENERATION_CACHE_BACKEND = os.environ.get('GENERATION_CACHE_BACKEND', 'sqlite')
+    GENERATION_CACHE_TTL = float(os.environ.get('GENERATION_CACHE_TTL', 7 * 24 * 3600))
+    GENERATION_CACHE_MAX_ENTRIES = int(os.environ.get('GENERATION_CACHE_MAX_ENTRIES', 128))
+    GENERATION_CACHE_DISK_MAX_ENTRIES = int(os.environ.get('GENERATION_CACHE_DISK_MAX_ENTRIES', 5000))
+    GENERATION_CACHE_PATH = os.environ.get('GENERATION_CACHE_PATH')
+    
+    # AI answer evaluations keyed by card content and normalized answer
+    EVALUATION_CACHE_BACKEND = os.environ.get('EVALUATION_CACHE_BACKEND', 'sqlite')
+    EVALUATION_CACHE_TTL = float(os.environ.get('EVALUATION_CACHE_TTL', 7 * 24 * 3600))
+    EVALUATION_CACHE_MAX_ENTRIES = int(os.environ.get('EVALUATION_CACHE_MAX_ENTRIES', 2048))
+    EVALUATION_CACHE_DISK_MAX_ENTRIES = int(os.environ.get('EVALUATION_CACHE_DISK_MAX_ENTRIES', 50000))
+    EVALUATION_CACHE_PATH = os.environ.get('EVALUATION_CACHE_PATH')
+    
+    # JWT revocation list: "database" (shared by all workers, survives
+    # restarts) or "memory" (per worker). Workers see each other's
+    # revocations within JWT_REVOCATION_REFRESH_SECONDS.
+    JWT_REVOCATION_STORE = os.environ.get('JWT_REVOCATION_STORE', 'database')
+    JWT_REVOCATION_REFRESH_SECONDS = float(os.environ.get('JWT_REVOCATION_REFRESH_SECONDS', 5))
+    JWT_REVOCATION_BLOOM_CAPACITY = int(os.environ.get('JWT_REVOCATION_BLOOM_CAPACITY', 100000))
+    
     # Session configuration
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
 
@@ -32,6 +139,17 @@ class ProductionConfig(Config):
     """Production configuration."""
     DEBUG = False
     SQLALCHEMY_ECHO = False
+    
+    # Every gunicorn worker holds its own pool; keep workers * (pool + overflow)
+    # under the managed Postgres connection limit
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 5))
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        Config.SQLALCHEMY_DATABASE_URI, DB_POOL_SIZE, DB_MAX_OVERFLOW, Config.DB_STATEMENT_TIMEOUT_MS
+    )
+    SQLALCHEMY_BINDS = replica_binds(
+        Config.REPLICA_DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, Config.DB_STATEMENT_TIMEOUT_MS
+    )
 
 
 config = {
@@ -0,0 +1,170 @@
+"""Per-connection database engine tuning and read-replica routing."""
+
+import os
+from flask import g, has_request_context, request, session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.selectable import SelectBase
+
+# Bind key of the optional read replica in SQLALCHEMY_BINDS
+REPLICA_BIND = 'replica'
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+def init_engines(engines, config):
+    """
+    Apply the configured SQLite pragmas to every new connection of each SQLite engine.
+    
+    engines: Flask-SQLAlchemy's bind key -> engine mapping. SQLite replica
+    connections are additionally made query-only.
+    """
+    pragmas = config.get('SQLITE_PRAGMAS') or {}
+    for bind_key, engine in engines.items():
+        if engine.dialect.name != 'sqlite':
+            continue
+        if bind_key == REPLICA_BIND:
+            event.listen(engine, 'connect', sqlite_pragma_listener(dict(pragmas, query_only='ON')))
+        elif pragmas:
+            event.listen(engine, 'connect', sqlite_pragma_listener(pragmas))
+
+
+def sqlite_pragma_listener(pragmas):
+    """Build a pool 'connect' listener that runs PRAGMA statements on new connections."""
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+    return set_pragmas
+
+
+class RoutingSession(Session):
+    """
+    Session that sends the reads of GET and HEAD requests to the replica bind.
+    
+    Only SELECTs are routed, and only while a request that has not written
+    anything is being handled. Everything else stays on the primary: writes
+    and flushes, CLI and background work, reads after the session has
+    written, and every request from a client that committed a write within
+    the last REPLICA_STICKY_SECONDS (read-your-writes across requests).
+    """
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and isinstance(clause, SelectBase) and self._reads_from_replica():
+            return self._db.engines[REPLICA_BIND]
+        if isinstance(clause, UpdateBase):
+            self.info['wrote'] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+    
+    def _reads_from_replica(self):
+        if self._flushing or self.info.get('wrote') or not has_request_context():
+            return False
+        if request.method not in READ_METHODS or REPLICA_BIND not in self._db.engines:
+            return False
+        return not wrote_recently(client_identity())
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_written(session, flush_context):
+    session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _remember_commit(session):
+    if session.info.get('wrote') and has_request_context() and REPLICA_BIND in session._db.engines:
+        remember_write(client_identity())
+
+
+class WriteMarkers:
+    """
+    Clients that committed a write within the last REPLICA_STICKY_SECONDS.
+    
+    Markers live in their own SQLite file (REPLICA_STICKY_PATH) shared by
+    every worker on the host, whatever RESPONSE_CACHE_BACKEND is, so a client
+    pinned to the primary by one worker is pinned on all of them. Only
+    opened when a replica is configured.
+    """
+    
+    def __init__(self):
+        self.ttl = 5.0
+        self.store = None
+    
+    def init_app(self, app):
+        from app.services.response_cache import SQLiteBackend
+        
+        self.ttl = app.config.get('REPLICA_STICKY_SECONDS', self.ttl)
+        self.store = None
+        if REPLICA_BIND not in (app.config.get('SQLALCHEMY_BINDS') or {}):
+            return
+        path = app.config.get('REPLICA_STICKY_PATH') or os.path.join(app.instance_path, 'replica_sticky.db')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.store = SQLiteBackend(path, max_entries=app.config.get('REPLICA_STICKY_MAX_ENTRIES', 10000))
+    
+    def add(self, identity):
+        if self.store is not None:
+            self.store.set(f'read-primary:{identity}', b'1', self.ttl)
+    
+    def __contains__(self, identity):
+        return self.store is not None and self.store.get(f'read-primary:{identity}') is not None
+
+
+write_markers = WriteMarkers()
+
+
+def client_identity():
+    """
+    Who the current request acts for: JWT user, the user it just issued
+    tokens to (see authenticate_client), login session user or client address.
+    """
+    from flask_jwt_extended import get_jwt_identity
+    
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:
+        # No verified token (yet) in this request
+        identity = None
+    if identity:
+        return f'user:{identity}'
+    if g.get('_client_identity'):
+        return g._client_identity
+    if flask_session.get('_user_id'):
+        return f'user:{flask_session["_user_id"]}'
+    return f'addr:{request.remote_addr}'
+
+
+def authenticate_client(user_id):
+    """
+    Act for `user_id` for the rest of the request (register and login).
+    
+    Those requests commit before the client holds a token, so a write already
+    remembered under the previous identity (the client address) is copied to
+    the user, whose token the client's next requests carry.
+    """
+    if not has_request_context():
+        return
+    previous = client_identity()
+    g._client_identity = f'user:{user_id}'
+    if g.get('_read_primary', {}).get(previous):
+        remember_write(g._client_identity)
+
+
+def remember_write(identity):
+    """
+    Pin `identity`'s reads to the primary for REPLICA_STICKY_SECONDS.
+    
+    The marker is stored in write_markers, so every worker on the host sees it.
+    """
+    write_markers.add(identity)
+    g.setdefault('_read_primary', {})[identity] = True
+
+
+def wrote_recently(identity):
+    """True if `identity` committed a write within the sticky window (checked once per request)."""
+    decisions = g.setdefault('_read_primary', {})
+    if identity not in decisions:
+        decisions[identity] = identity in write_markers
+    return decisions[identity]
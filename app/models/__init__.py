@@ -1,6 +1,9 @@
 from app.models.deck import Deck
+from app.models.deck_stats import DeckStats
 from app.models.flashcard import Flashcard
+from app.models.review_log import ReviewLog
+from app.models.revoked_token import RevokedToken
 from app.models.student import Student, TestResult
 from app.models.user import User
 
-__all__ = ['Deck', 'Flashcard', 'Student', 'TestResult', 'User']
+__all__ = ['Deck', 'DeckStats', 'Flashcard', 'ReviewLog', 'RevokedToken', 'Student', 'TestResult', 'User']
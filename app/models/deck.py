@@ -1,10 +1,20 @@
 from datetime import datetime
+from sqlalchemy import event, func, inspect, literal, select
+from sqlalchemy.orm import attributes
 from app import db
 
 
 class Deck(db.Model):
     """Deck model for organizing flashcards into collections."""
     __tablename__ = 'decks'
+    __table_args__ = (
+        # REST listings are scoped to the caller: root/sub-deck pages by name,
+        # recent decks, conditional GET validators and subtree walks
+        db.Index('ix_decks_user_parent_name', 'user_id', 'parent_id', 'name'),
+        db.Index('ix_decks_user_created', 'user_id', 'created_at'),
+        db.Index('ix_decks_user_updated', 'user_id', 'updated_at'),
+        db.Index('ix_decks_user_path', 'user_id', 'path'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -12,6 +22,8 @@ class Deck(db.Model):
     category = db.Column(db.String(50))
     tags = db.Column(db.String(200))  # Comma-separated tags
     card_count = db.Column(db.Integer, default=0)
+    # Cards in this deck and all sub-decks; maintained with card_count by adjust_card_counts
+    total_card_count = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -21,6 +33,13 @@ class Deck(db.Model):
     # Hierarchical structure - sub-decks
     parent_id = db.Column(db.Integer, db.ForeignKey('decks.id'), nullable=True)
     
+    # Spaced repetition engine for this deck; None inherits the owner's choice
+    scheduler = db.Column(db.String(20), nullable=True)
+    
+    # Materialized path of ancestor ids including self, e.g. "/1/4/9/".
+    # Maintained by the insert/update listeners below.
+    path = db.Column(db.String(255), index=True)
+    
     # Relationships
     flashcards = db.relationship('Flashcard', backref='deck', lazy='dynamic', cascade='all, delete-orphan')
     
@@ -33,33 +52,144 @@ class Deck(db.Model):
     def __repr__(self):
         return f'<Deck {self.name}>'
     
+    @staticmethod
+    def build_path(parent_path, deck_id):
+        """Build the materialized path for a deck under `parent_path`."""
+        return f'{parent_path or "/"}{deck_id}/'
+    
+    @staticmethod
+    def parse_path(path):
+        """Return the ancestor ids (root first, self last) encoded in a path."""
+        return [int(part) for part in path.strip('/').split('/') if part]
+    
+    @property
+    def path_ids(self):
+        """Ancestor ids from the root down to this deck."""
+        if self.path:
+            return self.parse_path(self.path)
+        # Decks created before paths were maintained
+        if self.parent_id is None:
+            return [self.id]
+        return self.parent.path_ids + [self.id]
+    
     @property
     def is_folder(self):
         """Check if this deck is a folder (has children but no cards)."""
-        return self.children.count() > 0 and self.card_count == 0
+        return self.card_count == 0 and self.children.count() > 0
     
-    @property
-    def total_card_count(self):
-        """Get total cards including all sub-decks recursively."""
-        total = self.card_count
-        for child in self.children:
-            total += child.total_card_count
-        return total
+    @classmethod
+    def children_counts(cls, deck_ids):
+        """Map each of `deck_ids` with sub-decks to its sub-deck count, in one grouped query."""
+        if not deck_ids:
+            return {}
+        return dict(
+            db.session.query(cls.parent_id, func.count(cls.id))
+            .filter(cls.parent_id.in_(deck_ids))
+            .group_by(cls.parent_id)
+            .all()
+        )
     
     @property
     def depth(self):
         """Get the depth level of this deck (0 = root)."""
-        if self.parent_id is None:
-            return 0
-        return self.parent.depth + 1
+        return len(self.path_ids) - 1
+    
+    @classmethod
+    def get_owned(cls, deck_id, user_id):
+        """The deck with `deck_id` if it belongs to `user_id`, else None."""
+        return cls.query.filter_by(id=deck_id, user_id=user_id).first()
     
     def get_breadcrumb(self):
         """Get the full path breadcrumb for this deck."""
-        if self.parent_id is None:
+        ancestor_ids = self.path_ids[:-1]
+        if not ancestor_ids:
             return [self]
-        return self.parent.get_breadcrumb() + [self]
+        ancestors = {d.id: d for d in Deck.query.filter(Deck.id.in_(ancestor_ids))}
+        return [ancestors[i] for i in ancestor_ids if i in ancestors] + [self]
+    
+    @classmethod
+    def adjust_card_counts(cls, connection, deck_id, delta, session=None):
+        """
+        Atomically add `delta` to a deck's card_count and to the
+        total_card_count of the deck and each of its ancestors.
+        
+        Every card write path goes through here (via the Flashcard flush
+        listeners, or directly from bulk inserts) so counts never need a
+        COUNT(*) on the write path.
+        """
+        if not deck_id or not delta:
+            return
+        decks = cls.__table__
+        path = connection.execute(select(decks.c.path).where(decks.c.id == deck_id)).scalar()
+        ancestor_ids = cls.parse_path(path) if path else [deck_id]
+        
+        connection.execute(
+            decks.update()
+            .where(decks.c.id == deck_id)
+            .values(card_count=func.coalesce(decks.c.card_count, 0) + delta)
+        )
+        connection.execute(
+            decks.update()
+            .where(decks.c.id.in_(ancestor_ids))
+            .values(total_card_count=func.coalesce(decks.c.total_card_count, 0) + delta)
+        )
+        if session is not None:
+            _shift_loaded_counts(session, deck_id, ancestor_ids, delta)
+    
+    @classmethod
+    def reconcile_card_counts(cls):
+        """Recompute every deck's direct and rolled-up card counts in one UPDATE."""
+        from app.models.flashcard import Flashcard
+        
+        decks = cls.__table__
+        cards = Flashcard.__table__
+        subtree = decks.alias('subtree')
+        
+        direct = select(func.count()).where(cards.c.deck_id == decks.c.id).scalar_subquery()
+        total = (
+            select(func.count())
+            .select_from(cards.join(subtree, cards.c.deck_id == subtree.c.id))
+            .where(subtree.c.path.startswith(decks.c.path))
+            .scalar_subquery()
+        )
+        result = db.session.execute(decks.update().values(card_count=direct, total_card_count=total))
+        return result.rowcount
     
-    def to_dict(self, include_children=False, include_parent=False):
+    @classmethod
+    def rebuild_paths(cls):
+        """Recompute every deck's path from parent_id. Returns the number of decks."""
+        rows = db.session.query(cls.id, cls.parent_id).all()
+        parents = dict(rows)
+        paths = {}
+        
+        def resolve(deck_id):
+            if deck_id not in paths:
+                parent_id = parents.get(deck_id)
+                parent_path = resolve(parent_id) if parent_id in parents else None
+                paths[deck_id] = cls.build_path(parent_path, deck_id)
+            return paths[deck_id]
+        
+        for deck_id in parents:
+            resolve(deck_id)
+        
+        db.session.execute(
+            cls.__table__.update().where(cls.__table__.c.id == db.bindparam('deck_id')),
+            [{'deck_id': deck_id, 'path': path} for deck_id, path in paths.items()]
+        )
+        return len(paths)
+    
+    def to_dict(self, include_children=False, include_parent=False, children_count=None):
+        """
+        Serialize the deck.
+        
+        children_count: number of sub-decks, if already known (see
+        children_counts); avoids one COUNT query per deck when listing
+        """
+        if children_count is None:
+            is_folder = self.is_folder
+        else:
+            is_folder = self.card_count == 0 and children_count > 0
+        
         data = {
             'id': self.id,
             'name': self.name,
@@ -69,13 +199,15 @@ class Deck(db.Model):
             'card_count': self.card_count,
             'total_card_count': self.total_card_count,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'is_folder': self.is_folder,
+            'is_folder': is_folder,
             'depth': self.depth,
             'parent_id': self.parent_id
         }
         
         if include_children:
-            data['children'] = [child.to_dict() for child in self.children]
+            children = self.children.all()
+            counts = Deck.children_counts([child.id for child in children])
+            data['children'] = [child.to_dict(children_count=counts.get(child.id, 0)) for child in children]
         
         if include_parent and self.parent:
             data['parent'] = {
@@ -84,3 +216,69 @@ class Deck(db.Model):
             }
         
         return data
+
+
+def _shift_loaded_counts(session, deck_id, ancestor_ids, delta):
+    """Mirror a counter UPDATE onto Deck instances already loaded in the session."""
+    for deck_key in ancestor_ids:
+        deck = session.identity_map.get(session.identity_key(Deck, deck_key))
+        if deck is None:
+            continue
+        if deck_key == deck_id and 'card_count' in deck.__dict__:
+            attributes.set_committed_value(deck, 'card_count', (deck.card_count or 0) + delta)
+        if 'total_card_count' in deck.__dict__:
+            attributes.set_committed_value(deck, 'total_card_count', (deck.total_card_count or 0) + delta)
+
+
+def _parent_path(connection, parent_id):
+    if parent_id is None:
+        return None
+    decks = Deck.__table__
+    return connection.execute(select(decks.c.path).where(decks.c.id == parent_id)).scalar()
+
+
+@event.listens_for(Deck, 'after_insert')
+def _set_path_on_insert(mapper, connection, target):
+    """Store the materialized path once the new deck has an id."""
+    path = Deck.build_path(_parent_path(connection, target.parent_id), target.id)
+    decks = Deck.__table__
+    connection.execute(decks.update().where(decks.c.id == target.id).values(path=path))
+    attributes.set_committed_value(target, 'path', path)
+
+
+@event.listens_for(Deck, 'after_update')
+def _move_subtree_on_reparent(mapper, connection, target):
+    """Rewrite the paths of a re-parented deck and all of its descendants."""
+    if not inspect(target).attrs.parent_id.history.has_changes():
+        return
+    old_path = target.path
+    new_path = Deck.build_path(_parent_path(connection, target.parent_id), target.id)
+    if not old_path or old_path == new_path:
+        return
+    
+    # Move the subtree's cards out of the old ancestors' totals and into the new ones
+    moved = target.total_card_count or 0
+    old_ancestors = Deck.parse_path(old_path)[:-1]
+    new_ancestors = Deck.parse_path(new_path)[:-1]
+    session = inspect(target).session
+    decks = Deck.__table__
+    for ancestor_ids, delta in ((old_ancestors, -moved), (new_ancestors, moved)):
+        if moved and ancestor_ids:
+            connection.execute(
+                decks.update()
+                .where(decks.c.id.in_(ancestor_ids))
+                .values(total_card_count=func.coalesce(decks.c.total_card_count, 0) + delta)
+            )
+            if session is not None:
+                _shift_loaded_counts(session, None, ancestor_ids, delta)
+    
+    connection.execute(
+        decks.update()
+        .where(decks.c.path.startswith(old_path))
+        .values(path=literal(new_path) + func.substr(decks.c.path, len(old_path) + 1))
+    )
+    
+    # Keep already-loaded descendants consistent with the database
+    for obj in list(session.identity_map.values()) if session else []:
+        if isinstance(obj, Deck) and obj.path and obj.path.startswith(old_path):
+            attributes.set_committed_value(obj, 'path', new_path + obj.path[len(old_path):])
@@ -0,0 +1,130 @@
+from datetime import datetime
+from sqlalchemy import case, event, func, insert, select
+from app import db
+from app.models.deck import Deck
+
+
+class DeckStats(db.Model):
+    """Per-deck review rollup, maintained incrementally from flashcard writes."""
+    __tablename__ = 'deck_stats'
+    
+    # Review interval (days) at which a card counts as mastered
+    MASTERED_INTERVAL = 21
+    
+    deck_id = db.Column(db.Integer, db.ForeignKey('decks.id', ondelete='CASCADE'), primary_key=True)
+    total_reviews = db.Column(db.Integer, nullable=False, default=0)
+    total_correct = db.Column(db.Integer, nullable=False, default=0)
+    mastered_count = db.Column(db.Integer, nullable=False, default=0)
+    new_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<DeckStats deck={self.deck_id}>'
+    
+    @property
+    def success_rate(self):
+        """Percentage of reviews answered correctly."""
+        if not self.total_reviews:
+            return 0
+        return round((self.total_correct / self.total_reviews) * 100, 2)
+    
+    @classmethod
+    def card_contribution(cls, times_reviewed, times_correct, interval_days):
+        """The (reviews, correct, mastered, new) a single card adds to its deck's row."""
+        times_reviewed = times_reviewed or 0
+        return (
+            times_reviewed,
+            times_correct or 0,
+            1 if times_reviewed and (interval_days or 0) >= cls.MASTERED_INTERVAL else 0,
+            1 if not times_reviewed else 0
+        )
+    
+    @classmethod
+    def adjust(cls, connection, deck_id, delta):
+        """Apply a (reviews, correct, mastered, new) delta to a deck's row."""
+        if not deck_id or not any(delta):
+            return
+        stats = cls.__table__
+        reviews, correct, mastered, new = delta
+        result = connection.execute(
+            stats.update()
+            .where(stats.c.deck_id == deck_id)
+            .values(
+                total_reviews=stats.c.total_reviews + reviews,
+                total_correct=stats.c.total_correct + correct,
+                mastered_count=stats.c.mastered_count + mastered,
+                new_count=stats.c.new_count + new,
+                updated_at=datetime.utcnow()
+            )
+        )
+        if result.rowcount == 0:
+            # Deck predates the rollup: seed its row from the cards table,
+            # which already reflects the change being flushed
+            connection.execute(
+                insert(stats).from_select(cls._aggregate_columns(), cls._aggregate_select(deck_id))
+            )
+    
+    @classmethod
+    def rebuild(cls):
+        """Recompute every deck's row from the cards table. Returns the number of rows."""
+        stats = cls.__table__
+        db.session.execute(stats.delete())
+        result = db.session.execute(
+            insert(stats).from_select(cls._aggregate_columns(), cls._aggregate_select())
+        )
+        return result.rowcount
+    
+    @classmethod
+    def refresh(cls, deck_ids):
+        """Recompute the rows of the given decks after a bulk write that bypassed the ORM."""
+        stats = cls.__table__
+        deck_ids = list(deck_ids)
+        db.session.execute(stats.delete().where(stats.c.deck_id.in_(deck_ids)))
+        db.session.execute(insert(stats).from_select(
+            cls._aggregate_columns(), cls._aggregate_select().where(Deck.__table__.c.id.in_(deck_ids))
+        ))
+    
+    @classmethod
+    def _aggregate_columns(cls):
+        return ['deck_id', 'total_reviews', 'total_correct', 'mastered_count', 'new_count', 'updated_at']
+    
+    @classmethod
+    def _aggregate_select(cls, deck_id=None):
+        from app.models.flashcard import Flashcard
+        
+        decks = Deck.__table__
+        cards = Flashcard.__table__
+        reviewed = func.coalesce(cards.c.times_reviewed, 0)
+        query = (
+            select(
+                decks.c.id,
+                func.coalesce(func.sum(reviewed), 0),
+                func.coalesce(func.sum(cards.c.times_correct), 0),
+                func.coalesce(func.sum(case(
+                    ((reviewed > 0) & (cards.c.interval_days >= cls.MASTERED_INTERVAL), 1), else_=0
+                )), 0),
+                func.coalesce(func.sum(case(
+                    ((cards.c.id.isnot(None)) & (reviewed == 0), 1), else_=0
+                )), 0),
+                func.now()
+            )
+            .select_from(decks.outerjoin(cards, cards.c.deck_id == decks.c.id))
+            .group_by(decks.c.id)
+        )
+        if deck_id is not None:
+            query = query.where(decks.c.id == deck_id)
+        return query
+
+
+@event.listens_for(Deck, 'after_insert')
+def _create_stats_row(mapper, connection, target):
+    connection.execute(insert(DeckStats.__table__).values(
+        deck_id=target.id, total_reviews=0, total_correct=0, mastered_count=0, new_count=0,
+        updated_at=datetime.utcnow()
+    ))
+
+
+@event.listens_for(Deck, 'after_delete')
+def _delete_stats_row(mapper, connection, target):
+    stats = DeckStats.__table__
+    connection.execute(stats.delete().where(stats.c.deck_id == target.id))
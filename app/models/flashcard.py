@@ -1,13 +1,47 @@
 from datetime import datetime
+from sqlalchemy import case, event, func, inspect, select
+from sqlalchemy.orm import validates
 from app import db
+from app.models.deck import Deck
+from app.models.deck_stats import DeckStats
+
+
+def _initial_priority(context):
+    """Column default: priority of a never-reviewed card at its difficulty."""
+    difficulty = context.get_current_parameters().get('difficulty')
+    return Flashcard.compute_priority(0, 0, difficulty)
 
 
 class Flashcard(db.Model):
     """Flashcard model with spaced repetition support."""
     __tablename__ = 'flashcards'
+    __table_args__ = (
+        # Adaptive sessions read "ORDER BY priority DESC LIMIT n" within a deck
+        db.Index('ix_flashcards_deck_priority', 'deck_id', 'priority'),
+        # Due queues and due counts are range scans on next_review within a deck
+        db.Index('ix_flashcards_deck_next_review', 'deck_id', 'next_review'),
+        # Keyset pagination walks (created_at, id) newest-first, optionally within a deck
+        db.Index('ix_flashcards_created', 'created_at', 'id'),
+        db.Index('ix_flashcards_deck_created', 'deck_id', 'created_at', 'id'),
+        # Conditional GET validators read COUNT and MAX(updated_at), optionally within a deck
+        db.Index('ix_flashcards_updated', 'updated_at'),
+        db.Index('ix_flashcards_deck_updated', 'deck_id', 'updated_at'),
+        # Per-user variants of the above, so REST queries scoped to the caller
+        # touch only that user's rows
+        db.Index('ix_flashcards_user_priority', 'user_id', 'priority'),
+        db.Index('ix_flashcards_user_next_review', 'user_id', 'next_review'),
+        db.Index('ix_flashcards_user_created', 'user_id', 'created_at', 'id'),
+        db.Index('ix_flashcards_user_updated', 'user_id', 'updated_at'),
+    )
+    
+    # Sentinel due date for never-reviewed cards, so "due" is a plain range
+    # predicate (next_review <= now) instead of "<= now OR IS NULL"
+    NEW_CARD_DUE = datetime(1970, 1, 1)
     
     id = db.Column(db.Integer, primary_key=True)
     deck_id = db.Column(db.Integer, db.ForeignKey('decks.id'), nullable=True)
+    # Owner, denormalized from the deck (see the insert/update listeners below)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     question = db.Column(db.Text, nullable=False)
     answer = db.Column(db.Text, nullable=False)
     
@@ -17,9 +51,16 @@ class Flashcard(db.Model):
     times_correct = db.Column(db.Integer, default=0)
     ease_factor = db.Column(db.Float, default=2.5)  # SM-2 ease factor
     interval_days = db.Column(db.Integer, default=1)
-    next_review = db.Column(db.DateTime)
+    next_review = db.Column(db.DateTime, nullable=False, default=NEW_CARD_DUE, index=True)
     last_reviewed = db.Column(db.DateTime)
     
+    # FSRS memory state (unset until the card is reviewed under the FSRS scheduler)
+    stability = db.Column(db.Float)
+    memory_difficulty = db.Column(db.Float)
+    
+    # Stored adaptive-ordering score (see priority_score), kept in sync on review and difficulty edits
+    priority = db.Column(db.Float, default=_initial_priority, index=True)
+    
     # Metadata
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -37,58 +78,240 @@ class Flashcard(db.Model):
             'times_reviewed': self.times_reviewed,
             'times_correct': self.times_correct,
             'accuracy': round(self.times_correct / self.times_reviewed * 100, 1) if self.times_reviewed > 0 else 0,
-            'next_review': self.next_review.isoformat() if self.next_review else None,
+            'next_review': None if self.is_new else self.next_review.isoformat(),
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
     
-    @property
-    def error_rate(self):
-        """Calculate error rate (0.0 to 1.0) for adaptive ordering."""
-        if self.times_reviewed == 0:
-            return 0.5  # Neutral for new cards
-        return 1.0 - (self.times_correct / self.times_reviewed)
+    @classmethod
+    def due_filter(cls, now=None):
+        """SQL predicate matching cards due for review at `now` (new cards included)."""
+        return cls.next_review <= (now or datetime.utcnow())
+    
+    @classmethod
+    def summary(cls, *criteria, now=None):
+        """
+        Aggregate card statistics in a single SELECT with conditional sums.
+        
+        Returns a dict with total, due, reviewed, mastered, total_reviews and
+        total_correct over the cards matching `criteria`.
+        """
+        def count_if(condition):
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+        
+        row = db.session.query(
+            func.count(cls.id).label('total'),
+            count_if(cls.due_filter(now)).label('due'),
+            count_if(cls.times_reviewed > 0).label('reviewed'),
+            count_if(cls.interval_days >= DeckStats.MASTERED_INTERVAL).label('mastered'),
+            func.coalesce(func.sum(cls.times_reviewed), 0).label('total_reviews'),
+            func.coalesce(func.sum(cls.times_correct), 0).label('total_correct')
+        ).filter(*criteria).one()
+        return dict(row._mapping)
+    
+    @classmethod
+    def bulk_insert(cls, rows):
+        """
+        Insert new cards with one multi-row INSERT ... RETURNING and return their ids.
+        
+        rows: dicts with deck_id (int or numeric string), question, answer
+        and difficulty, and optionally user_id (the deck's owner otherwise).
+        The ORM flush
+        listeners are bypassed, so deck counters and review stats are
+        bumped here once per deck by the known delta.
+        """
+        if not rows:
+            return []
+        
+        # Form posts carry deck ids as strings; the owner lookup is keyed by int
+        rows = [dict(row, deck_id=int(row['deck_id']) if row.get('deck_id') else None) for row in rows]
+        deck_ids = {row['deck_id'] for row in rows if row['deck_id'] and 'user_id' not in row}
+        owners = dict(
+            db.session.query(Deck.id, Deck.user_id).filter(Deck.id.in_(deck_ids)).all()
+        ) if deck_ids else {}
+        
+        now = datetime.utcnow()
+        values = [{
+            'deck_id': row['deck_id'],
+            'user_id': row['user_id'] if 'user_id' in row else owners.get(row['deck_id']),
+            'question': row['question'],
+            'answer': row['answer'],
+            'difficulty': row.get('difficulty', 1),
+            'priority': cls.compute_priority(0, 0, row.get('difficulty', 1)),
+            'created_at': now,
+            'updated_at': now
+        } for row in rows]
+        
+        # RETURNING order is not guaranteed without a per-row sentinel (which
+        # would split SQLite inserts into one statement per row), but a single
+        # multi-row INSERT assigns ascending ids, so sorting restores row order
+        cards = cls.__table__
+        ids = sorted(db.session.execute(cards.insert().returning(cards.c.id), values).scalars())
+        
+        per_deck = {}
+        for value in values:
+            per_deck[value['deck_id']] = per_deck.get(value['deck_id'], 0) + 1
+        connection = db.session.connection()
+        for deck_id, count in per_deck.items():
+            Deck.adjust_card_counts(connection, deck_id, count, db.session)
+            DeckStats.adjust(connection, deck_id, (0, 0, 0, count))
+        
+        return ids
     
     @property
-    def priority_score(self):
+    def is_new(self):
+        """True if the card has never been scheduled by a review."""
+        return self.next_review is None or self.next_review <= self.NEW_CARD_DUE
+    
+    @staticmethod
+    def compute_priority(times_reviewed, times_correct, difficulty):
         """Calculate priority score for adaptive ordering (higher = more important to review)."""
+        times_reviewed = times_reviewed or 0
+        times_correct = times_correct or 0
+        difficulty = difficulty or 1
+        
         # Combine error rate, review count, and difficulty
         # Cards with higher error rates and lower review counts get higher priority
-        base_score = self.error_rate * 100
+        if times_reviewed == 0:
+            error_rate = 0.5  # Neutral for new cards
+        else:
+            error_rate = 1.0 - (times_correct / times_reviewed)
+        base_score = error_rate * 100
         
         # Boost cards that haven't been reviewed much
-        if self.times_reviewed < 3:
+        if times_reviewed < 3:
             base_score += 20
         
         # Factor in difficulty
-        base_score += (self.difficulty * 5)
+        base_score += (difficulty * 5)
         
         return base_score
     
-    def update_spaced_repetition(self, quality):
+    @property
+    def error_rate(self):
+        """Calculate error rate (0.0 to 1.0) for adaptive ordering."""
+        if not self.times_reviewed:
+            return 0.5  # Neutral for new cards
+        return 1.0 - (self.times_correct / self.times_reviewed)
+    
+    @property
+    def priority_score(self):
+        """Calculate priority score for adaptive ordering (higher = more important to review)."""
+        return self.compute_priority(self.times_reviewed, self.times_correct, self.difficulty)
+    
+    def refresh_priority(self):
+        """Recompute the stored priority column from the current review state."""
+        self.priority = self.priority_score
+    
+    @validates('difficulty')
+    def _validate_difficulty(self, key, difficulty):
+        """Keep the stored priority in step with difficulty edits."""
+        self.priority = self.compute_priority(self.times_reviewed, self.times_correct, difficulty)
+        return difficulty
+    
+    def update_spaced_repetition(self, quality, reviewed_at=None, scheduler=None):
         """
-        Update spaced repetition parameters using SM-2 algorithm.
+        Update spaced repetition parameters with the card's scheduler.
         Quality: 0-5 (0=complete blackout, 5=perfect response)
+        reviewed_at: when the answer was given (naive UTC), defaults to now
+        scheduler: engine to use; by default the deck's or deck owner's choice (SM-2 if unset)
+        
+        Returns a review record (see ReviewLog) describing this review.
         """
-        self.times_reviewed += 1
+        from app.scheduling import scheduler_for_card
         
+        now = reviewed_at or datetime.utcnow()
+        previous_interval = self.interval_days
+        previous_review = self.last_reviewed
+        
+        self.times_reviewed += 1
         if quality >= 3:
             self.times_correct += 1
-            
-            # Calculate new ease factor
-            self.ease_factor = max(1.3, self.ease_factor + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)))
-            
-            # Calculate new interval
-            if self.times_reviewed == 1:
-                self.interval_days = 1
-            elif self.times_reviewed == 2:
-                self.interval_days = 6
-            else:
-                self.interval_days = round(self.interval_days * self.ease_factor)
-        else:
-            # Reset on failure
-            self.interval_days = 1
-            self.ease_factor = max(1.3, self.ease_factor - 0.2)
         
-        self.last_reviewed = datetime.utcnow()
+        (scheduler or scheduler_for_card(self)).review(self, quality, now)
+        
+        self.last_reviewed = now
         from datetime import timedelta
-        self.next_review = datetime.utcnow() + timedelta(days=self.interval_days)
+        self.next_review = now + timedelta(days=self.interval_days)
+        self.refresh_priority()
+        
+        return {
+            'flashcard_id': self.id,
+            'reviewed_at': now,
+            'quality': quality,
+            'previous_interval': previous_interval if previous_review else None,
+            'new_interval': self.interval_days,
+            'elapsed_days': (now - previous_review).total_seconds() / 86400 if previous_review else None
+        }
+
+
+# Cards belong to their deck's owner; user_id follows the deck on insert
+# and on moves so per-user queries never need to join decks.
+
+def _deck_owner(connection, deck_id):
+    decks = Deck.__table__
+    return connection.execute(select(decks.c.user_id).where(decks.c.id == deck_id)).scalar()
+
+
+@event.listens_for(Flashcard, 'before_insert')
+def _inherit_deck_owner(mapper, connection, target):
+    if target.user_id is None and target.deck_id:
+        target.user_id = _deck_owner(connection, target.deck_id)
+
+
+@event.listens_for(Flashcard, 'before_update')
+def _follow_deck_owner(mapper, connection, target):
+    if target.deck_id and inspect(target).attrs.deck_id.history.has_changes():
+        target.user_id = _deck_owner(connection, target.deck_id)
+
+
+# Deck card counters and review rollups follow every flashcard insert,
+# delete, review and move.
+
+_STATS_ATTRS = ('times_reviewed', 'times_correct', 'interval_days')
+
+
+def _stats_contribution(target, previous=False):
+    """A card's DeckStats contribution, as flushed now or as it was before this flush."""
+    state = inspect(target)
+    values = []
+    for attr in _STATS_ATTRS:
+        history = state.attrs[attr].history
+        if previous and history.deleted:
+            values.append(history.deleted[0])
+        else:
+            values.append(getattr(target, attr))
+    return DeckStats.card_contribution(*values)
+
+
+@event.listens_for(Flashcard, 'after_insert')
+def _count_inserted_card(mapper, connection, target):
+    Deck.adjust_card_counts(connection, target.deck_id, 1, inspect(target).session)
+    DeckStats.adjust(connection, target.deck_id, _stats_contribution(target))
+
+
+@event.listens_for(Flashcard, 'after_delete')
+def _count_deleted_card(mapper, connection, target):
+    Deck.adjust_card_counts(connection, target.deck_id, -1, inspect(target).session)
+    DeckStats.adjust(connection, target.deck_id, tuple(-v for v in _stats_contribution(target, previous=True)))
+
+
+@event.listens_for(Flashcard, 'after_update')
+def _count_updated_card(mapper, connection, target):
+    state = inspect(target)
+    deck_history = state.attrs.deck_id.history
+    stats_changed = any(state.attrs[attr].history.has_changes() for attr in _STATS_ATTRS)
+    if not deck_history.has_changes() and not stats_changed:
+        return
+    
+    old_deck_id = deck_history.deleted[0] if deck_history.deleted else target.deck_id
+    if deck_history.has_changes():
+        Deck.adjust_card_counts(connection, old_deck_id, -1, state.session)
+        Deck.adjust_card_counts(connection, target.deck_id, 1, state.session)
+    
+    before = _stats_contribution(target, previous=True)
+    after = _stats_contribution(target)
+    if old_deck_id == target.deck_id:
+        DeckStats.adjust(connection, target.deck_id, tuple(a - b for a, b in zip(after, before)))
+    else:
+        DeckStats.adjust(connection, old_deck_id, tuple(-v for v in before))
+        DeckStats.adjust(connection, target.deck_id, after)
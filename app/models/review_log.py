@@ -0,0 +1,37 @@
+from datetime import datetime
+from app import db
+
+
+class ReviewLog(db.Model):
+    """Append-only history of individual flashcard reviews."""
+    __tablename__ = 'review_log'
+    __table_args__ = (
+        # Per-card history and per-day / per-user range reads
+        db.Index('ix_review_log_card_reviewed', 'flashcard_id', 'reviewed_at'),
+        db.Index('ix_review_log_user_reviewed', 'user_id', 'reviewed_at'),
+        db.Index('ix_review_log_reviewed', 'reviewed_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    flashcard_id = db.Column(db.Integer, db.ForeignKey('flashcards.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    reviewed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    quality = db.Column(db.SmallInteger, nullable=False)  # 0-5 scale
+    previous_interval = db.Column(db.Integer)  # days
+    new_interval = db.Column(db.Integer)  # days
+    elapsed_days = db.Column(db.Float)  # since the previous review, None for a first review
+    
+    def __repr__(self):
+        return f'<ReviewLog card={self.flashcard_id} q={self.quality}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'flashcard_id': self.flashcard_id,
+            'user_id': self.user_id,
+            'reviewed_at': self.reviewed_at.isoformat() if self.reviewed_at else None,
+            'quality': self.quality,
+            'previous_interval': self.previous_interval,
+            'new_interval': self.new_interval,
+            'elapsed_days': self.elapsed_days
+        }
@@ -0,0 +1,16 @@
+from datetime import datetime
+from app import db
+
+
+class RevokedToken(db.Model):
+    """A revoked JWT, kept until the token would have expired anyway."""
+    __tablename__ = 'revoked_tokens'
+    
+    jti = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    # Workers read revocations newer than their last refresh, and prune by expiry
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<RevokedToken {self.jti}>'
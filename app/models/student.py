@@ -34,10 +34,18 @@ class Student(db.Model):
 class TestResult(db.Model):
     """Test result model for tracking student performance."""
     __tablename__ = 'test_results'
+    __table_args__ = (
+        # Keyset pagination walks (completed_at, id) newest-first, optionally per student
+        db.Index('ix_test_results_completed', 'completed_at', 'id'),
+        db.Index('ix_test_results_student_completed', 'student_id', 'completed_at', 'id'),
+        db.Index('ix_test_results_user_completed', 'user_id', 'completed_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
     deck_id = db.Column(db.Integer, db.ForeignKey('decks.id'))
+    # Account that ran the test; REST reports and dashboards are scoped to it
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     total_questions = db.Column(db.Integer, nullable=False)
     correct_answers = db.Column(db.Integer, nullable=False)
     wrong_answers = db.Column(db.Integer, nullable=False)
@@ -45,6 +53,9 @@ class TestResult(db.Model):
     time_taken_seconds = db.Column(db.Integer)
     completed_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Relationships
+    deck = db.relationship('Deck', lazy='select')
+    
     def __repr__(self):
         return f'<TestResult {self.id}: {self.score_percentage}%>'
     
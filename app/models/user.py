@@ -23,6 +23,11 @@ class User(UserMixin, db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime, nullable=True)
     
+    # Spaced repetition preferences (decks may override the scheduler)
+    scheduler = db.Column(db.String(20), nullable=False, default='sm2')
+    fsrs_params = db.Column(db.JSON, nullable=True)  # fitted FSRS weights, None = defaults
+    desired_retention = db.Column(db.Float, nullable=False, default=0.9)
+    
     # Relationships
     decks = db.relationship('Deck', backref='owner', lazy='dynamic')
     
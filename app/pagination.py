@@ -0,0 +1,52 @@
+"""Keyset (cursor) pagination helpers for newest-first listings."""
+
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(sort_value, row_id):
+    """Encode the last row's sort key as an opaque URL-safe cursor."""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor. Raises ValueError if malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (TypeError, ValueError, json.JSONDecodeError) as e:
+        raise ValueError('Invalid pagination cursor') from e
+
+
+def keyset_page(query, sort_column, id_column, cursor=None, limit=20):
+    """
+    Fetch one page of `query` ordered by (sort_column, id_column) descending.
+    
+    Rows after the cursor are found with a range predicate on the index
+    rather than an OFFSET scan, so every page costs the same.
+    
+    Returns:
+        Tuple of (items, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            sort_column < sort_value,
+            and_(sort_column == sort_value, id_column < last_id)
+        ))
+    
+    items = query.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    
+    return items, next_cursor
@@ -1,5 +1,6 @@
 """AI Routes for flashcard generation and answer evaluation."""
 
+import json
 import os
 import requests
 from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for, current_app
@@ -8,6 +9,7 @@ from app import db
 from app.models import Flashcard, Deck
 from app.services.ai_service import FlashcardGenerator
 from app.services.evaluation_service import AnswerEvaluator
+from app.services.response_cache import response_cache
 
 ai_bp = Blueprint('ai', __name__, url_prefix='/ai')
 
@@ -212,10 +214,16 @@ def save_flashcards():
     try:
         data = request.get_json() if request.is_json else request.form
         
-        deck_id = data.get('deck_id')
+        try:
+            deck_id = int(data['deck_id']) if data.get('deck_id') else None
+        except (TypeError, ValueError):
+            return _reject_save('Invalid deck_id')
         deck_name = data.get('deck_name')
         deck_name = deck_name.strip() if deck_name else ''
-        flashcards_data = data.get('flashcards', [])
+        if request.is_json:
+            flashcards_data = data.get('flashcards', [])
+        else:
+            flashcards_data = request.form.getlist('flashcards')
         
         # Get flashcards from session if not provided
         if not flashcards_data:
@@ -228,6 +236,22 @@ def save_flashcards():
             flash('No flashcards to save.', 'error')
             return redirect(url_for('ai.generate'))
         
+        # Form posts send each card as its own JSON object string
+        cards = []
+        for index, card_data in enumerate(flashcards_data):
+            if isinstance(card_data, str):
+                try:
+                    card_data = json.loads(card_data)
+                except ValueError:
+                    return _reject_save(f'Flashcard {index + 1} is not valid JSON')
+            if not isinstance(card_data, dict):
+                return _reject_save(f'Flashcard {index + 1} must be an object')
+            cards.append(card_data)
+        
+        # Cards without a question or answer are skipped, not saved blank
+        complete = [card_data for card_data in cards if card_data.get('question') and card_data.get('answer')]
+        skipped_count = len(cards) - len(complete)
+        
         # Create new deck if needed
         if deck_name and not deck_id:
             deck = Deck(name=deck_name, description='AI-generated deck')
@@ -235,29 +259,17 @@ def save_flashcards():
             db.session.flush()
             deck_id = deck.id
         
-        # Save flashcards
-        saved_count = 0
-        for card_data in flashcards_data:
-            if isinstance(card_data, str):
-                import json
-                card_data = json.loads(card_data)
-            
-            flashcard = Flashcard(
-                deck_id=deck_id,
-                question=card_data.get('question', ''),
-                answer=card_data.get('answer', ''),
-                difficulty=_map_difficulty(card_data.get('difficulty', 'intermediate'))
-            )
-            db.session.add(flashcard)
-            saved_count += 1
-        
-        # Update deck card count
-        if deck_id:
-            deck = Deck.query.get(deck_id)
-            if deck:
-                deck.card_count = Flashcard.query.filter_by(deck_id=deck_id).count()
+        # Save flashcards with one multi-row INSERT
+        flashcard_ids = Flashcard.bulk_insert([{
+            'deck_id': deck_id,
+            'question': card_data['question'],
+            'answer': card_data['answer'],
+            'difficulty': _map_difficulty(card_data.get('difficulty', 'intermediate'))
+        } for card_data in complete])
+        saved_count = len(flashcard_ids)
         
         db.session.commit()
+        response_cache.invalidate([deck_id])
         
         # Clear session
         from flask import session
@@ -268,9 +280,13 @@ def save_flashcards():
             return jsonify({
                 'success': True,
                 'saved_count': saved_count,
+                'skipped_count': skipped_count,
+                'flashcard_ids': flashcard_ids,
                 'deck_id': deck_id
             })
         
+        if skipped_count:
+            flash(f'Skipped {skipped_count} flashcards without a question or answer.', 'warning')
         flash(f'Successfully saved {saved_count} flashcards!', 'success')
         return redirect(url_for('flashcards.list_flashcards', deck_id=deck_id))
         
@@ -319,6 +335,14 @@ def evaluate_answer():
         return jsonify({'error': str(e)}), 500
 
 
+def _reject_save(message: str):
+    """400 for JSON saves, a flash message back on the preview page for forms."""
+    if request.is_json:
+        return jsonify({'error': message}), 400
+    flash(message, 'error')
+    return redirect(url_for('ai.preview'))
+
+
 def _map_difficulty(difficulty_str: str) -> int:
     """Map difficulty string to integer (1-5)."""
     mapping = {
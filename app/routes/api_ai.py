@@ -6,8 +6,10 @@ from flask_jwt_extended import jwt_required
 from werkzeug.utils import secure_filename
 from app import db
 from app.models import Flashcard, Deck
+from app.auth import get_current_user_id
 from app.services.ai_service import FlashcardGenerator
 from app.services.evaluation_service import AnswerEvaluator
+from app.services.response_cache import response_cache
 
 api_ai_bp = Blueprint('api_ai', __name__)
 
@@ -239,36 +241,33 @@ def save_flashcards():
         if not flashcards_data:
             return jsonify({'error': 'No flashcards to save'}), 400
         
+        user_id = get_current_user_id()
+        if deck_id and not Deck.get_owned(deck_id, user_id):
+            return jsonify({'error': 'Deck not found'}), 404
+        
         # Create new deck if needed
         if deck_name and not deck_id:
-            deck = Deck(name=deck_name, description='AI-generated deck')
+            deck = Deck(name=deck_name, description='AI-generated deck', user_id=user_id)
             db.session.add(deck)
             db.session.flush()
             deck_id = deck.id
         
-        # Save flashcards
-        saved_count = 0
-        for card_data in flashcards_data:
-            flashcard = Flashcard(
-                deck_id=deck_id,
-                question=card_data.get('question', ''),
-                answer=card_data.get('answer', ''),
-                difficulty=_map_difficulty(card_data.get('difficulty', 'intermediate'))
-            )
-            db.session.add(flashcard)
-            saved_count += 1
-        
-        # Update deck card count
-        if deck_id:
-            deck = Deck.query.get(deck_id)
-            if deck:
-                deck.card_count = Flashcard.query.filter_by(deck_id=deck_id).count()
+        # Save flashcards with one multi-row INSERT
+        flashcard_ids = Flashcard.bulk_insert([{
+            'deck_id': deck_id,
+            'user_id': user_id,
+            'question': card_data.get('question', ''),
+            'answer': card_data.get('answer', ''),
+            'difficulty': _map_difficulty(card_data.get('difficulty', 'intermediate'))
+        } for card_data in flashcards_data])
         
         db.session.commit()
+        response_cache.invalidate([deck_id], user_id=user_id)
         
         return jsonify({
             'success': True,
-            'saved_count': saved_count,
+            'saved_count': len(flashcard_ids),
+            'flashcard_ids': flashcard_ids,
             'deck_id': deck_id
         })
         
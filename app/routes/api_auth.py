@@ -5,7 +5,11 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
 from app import db
 from app.models import User
-from app.auth import generate_tokens, revoke_token, get_current_user_id, user_to_dict
+from app.services.response_cache import response_cache
+from app.auth import (
+    generate_tokens, revoke_token, get_current_user_id, identity_claims, user_from_claims, user_to_dict
+)
+from app.services.identity_cache import identity_cache
 
 api_auth_bp = Blueprint('api_auth', __name__)
 
@@ -56,16 +60,14 @@ def register():
         
         db.session.add(user)
         db.session.commit()
+        user_data = user_to_dict(user)
         
         # Generate tokens
-        tokens = generate_tokens(
-            user.id,
-            additional_claims={'username': user.username}
-        )
+        tokens = generate_tokens(user.id, additional_claims=identity_claims(user_data))
         
         return jsonify({
             'message': 'Registration successful',
-            'user': user_to_dict(user),
+            'user': user_data,
             **tokens
         }), 201
         
@@ -100,16 +102,15 @@ def login():
         # Update last login
         user.last_login = datetime.utcnow()
         db.session.commit()
+        response_cache.invalidate_user(user.id)
+        user_data = user_to_dict(user)
         
         # Generate tokens
-        tokens = generate_tokens(
-            user.id,
-            additional_claims={'username': user.username}
-        )
+        tokens = generate_tokens(user.id, additional_claims=identity_claims(user_data))
         
         return jsonify({
             'message': 'Login successful',
-            'user': user_to_dict(user),
+            'user': user_data,
             **tokens
         })
         
@@ -122,8 +123,12 @@ def login():
 def logout():
     """Logout user by revoking the current token."""
     try:
-        jti = get_jwt()['jti']
-        revoke_token(jti)
+        claims = get_jwt()
+        revoke_token(
+            claims['jti'],
+            expires_at=datetime.utcfromtimestamp(claims['exp']) if 'exp' in claims else None,
+            user_id=get_current_user_id()
+        )
         
         return jsonify({'message': 'Successfully logged out'})
         
@@ -134,16 +139,28 @@ def logout():
 @api_auth_bp.route('/me', methods=['GET'])
 @jwt_required()
 def get_current_user():
-    """Get current authenticated user information."""
+    """
+    Get current authenticated user information.
+    
+    source=token answers from the token's claims alone (id, username, email,
+    full_name as of the last login or refresh) without touching the database.
+    """
     try:
         user_id = get_current_user_id()
-        user = User.query.get(user_id)
+        
+        if request.args.get('source') == 'token':
+            return jsonify({
+                'user': user_from_claims(user_id, get_jwt()),
+                'source': 'token'
+            })
+        
+        user = identity_cache.user_dict(user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         return jsonify({
-            'user': user_to_dict(user)
+            'user': user
         })
         
     except Exception as e:
@@ -156,15 +173,12 @@ def refresh_token():
     """Refresh access token using refresh token."""
     try:
         user_id = get_current_user_id()
-        user = User.query.get(user_id)
+        user = identity_cache.user_dict(user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        tokens = generate_tokens(
-            user.id,
-            additional_claims={'username': user.username}
-        )
+        tokens = generate_tokens(user_id, additional_claims=identity_claims(user))
         
         return jsonify({
             'message': 'Token refreshed',
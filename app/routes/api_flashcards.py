@@ -1,10 +1,22 @@
 """REST API Flashcard and Deck Routes."""
 
-from flask import Blueprint, request, jsonify
+import os
+import sqlite3
+import zipfile
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required
+from werkzeug.utils import secure_filename
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 from app import db
 from app.models import Flashcard, Deck
 from app.auth import get_current_user_id
+from app.conditional import collection_state, collection_validators, is_not_modified, not_modified, with_validators
+from app.pagination import keyset_page
+from app.scheduling import SCHEDULERS
+from app.services.response_cache import response_cache
+from app.services.exporter import FlashcardExporter
+from app.services.importer import FlashcardImporter
 
 api_flashcards_bp = Blueprint('api_flashcards', __name__)
 
@@ -14,21 +26,50 @@ api_flashcards_bp = Blueprint('api_flashcards', __name__)
 @api_flashcards_bp.route('', methods=['GET'])
 @jwt_required()
 def list_flashcards():
-    """List all flashcards with optional deck filter."""
+    """
+    List the current user's flashcards with optional deck filter.
+    
+    Passing `cursor` (empty for the first page) switches from page numbers
+    to keyset pagination; the total is then only counted with include_total=true.
+    """
     try:
         deck_id = request.args.get('deck_id', type=int)
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total', 'false').lower() == 'true'
+        user_id = get_current_user_id()
         
-        query = Flashcard.query
-        
+        # Cards in scope plus decks (for deck names); answer 304 before loading any rows
+        card_scope = [Flashcard.user_id == user_id]
         if deck_id:
-            query = query.filter_by(deck_id=deck_id)
+            card_scope.append(Flashcard.deck_id == deck_id)
+        etag, last_modified = collection_validators(
+            collection_state(Flashcard, *card_scope), collection_state(Deck, Deck.user_id == user_id)
+        )
+        if is_not_modified(etag):
+            return not_modified(etag, last_modified)
+        
+        query = Flashcard.query.options(joinedload(Flashcard.deck)).filter(*card_scope)
         
         # Paginate results
-        pagination = query.order_by(Flashcard.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        if cursor is not None:
+            items, next_cursor = keyset_page(
+                query, Flashcard.created_at, Flashcard.id, cursor or None, per_page
+            )
+            page_info = {'next_cursor': next_cursor}
+            if include_total:
+                page_info['total'] = query.count()
+        else:
+            pagination = query.order_by(Flashcard.created_at.desc()).paginate(
+                page=page, per_page=per_page, error_out=False
+            )
+            items = pagination.items
+            page_info = {
+                'total': pagination.total,
+                'pages': pagination.pages,
+                'current_page': pagination.page
+            }
         
         flashcards = [{
             'id': card.id,
@@ -40,15 +81,15 @@ def list_flashcards():
             'times_reviewed': card.times_reviewed,
             'times_correct': card.times_correct,
             'created_at': card.created_at.isoformat() if card.created_at else None
-        } for card in pagination.items]
+        } for card in items]
         
-        return jsonify({
+        return with_validators(jsonify({
             'flashcards': flashcards,
-            'total': pagination.total,
-            'pages': pagination.pages,
-            'current_page': pagination.page
-        })
+            **page_info
+        }), etag, last_modified)
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -71,21 +112,20 @@ def create_flashcard():
         if not question or not answer:
             return jsonify({'error': 'Question and answer are required'}), 400
         
+        user_id = get_current_user_id()
+        if deck_id and not Deck.get_owned(deck_id, user_id):
+            return jsonify({'error': 'Deck not found'}), 404
+        
         flashcard = Flashcard(
             question=question,
             answer=answer,
             deck_id=deck_id,
+            user_id=user_id,
             difficulty=difficulty
         )
         db.session.add(flashcard)
-        
-        # Update deck card count
-        if deck_id:
-            deck = Deck.query.get(deck_id)
-            if deck:
-                deck.card_count = Flashcard.query.filter_by(deck_id=deck_id).count() + 1
-        
         db.session.commit()
+        response_cache.invalidate([flashcard.deck_id], user_id=user_id)
         
         return jsonify({
             'message': 'Flashcard created successfully',
@@ -104,71 +144,170 @@ def create_flashcard():
         return jsonify({'error': str(e)}), 500
 
 
+@api_flashcards_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_flashcards():
+    """
+    Stream flashcards as NDJSON or CSV without building the export in memory.
+    
+    Query: deck_id (all of the user's cards if omitted), include_subdecks, format=ndjson|csv
+    and gzip=true for a compressed download.
+    """
+    try:
+        deck_id = request.args.get('deck_id', type=int)
+        user_id = get_current_user_id()
+        
+        if deck_id and not Deck.get_owned(deck_id, user_id):
+            return jsonify({'error': 'Deck not found'}), 404
+        
+        exporter = FlashcardExporter(
+            user_id=user_id,
+            deck_id=deck_id,
+            include_subdecks=request.args.get('include_subdecks', 'false').lower() == 'true',
+            fmt=request.args.get('format', 'ndjson').lower(),
+            compress=request.args.get('gzip', 'false').lower() == 'true'
+        )
+        
+        response = Response(stream_with_context(exporter.stream()), mimetype=exporter.mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename="{exporter.filename}"'
+        return response
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@api_flashcards_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_flashcards():
+    """
+    Bulk-import flashcards from an uploaded CSV, TSV or Anki .apkg file.
+    
+    Form fields: file (required), deck_id (optional parent deck for the
+    imported decks) and format (defaults to the file extension).
+    """
+    try:
+        upload = request.files.get('file')
+        
+        if not upload or not upload.filename:
+            return jsonify({'error': 'An import file is required'}), 400
+        
+        user_id = get_current_user_id()
+        parent_id = request.form.get('deck_id', type=int)
+        if parent_id and not Deck.get_owned(parent_id, user_id):
+            return jsonify({'error': 'Deck not found'}), 404
+        
+        fmt = request.form.get('format') or FlashcardImporter.detect_format(upload.filename)
+        importer = FlashcardImporter(
+            user_id=user_id,
+            parent_id=parent_id,
+            default_deck=os.path.splitext(secure_filename(upload.filename))[0] or 'Imported'
+        )
+        result = importer.import_file(upload.stream, fmt.lower())
+        db.session.commit()
+        response_cache.invalidate(result.deck_ids, user_id=user_id)
+        
+        return jsonify({
+            'success': True,
+            **result.to_dict()
+        }), 201
+        
+    except (ValueError, UnicodeDecodeError, zipfile.BadZipFile, sqlite3.DatabaseError) as e:
+        db.session.rollback()
+        return jsonify({'error': f'Could not import file: {e}'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
 @api_flashcards_bp.route('/<int:id>', methods=['GET'])
 @jwt_required()
 def get_flashcard(id):
     """Get a single flashcard by ID."""
     try:
-        flashcard = Flashcard.query.get(id)
+        flashcard = Flashcard.query.options(joinedload(Flashcard.deck)).filter_by(
+            id=id, user_id=get_current_user_id()
+        ).first()
         
         if not flashcard:
             return jsonify({'error': 'Flashcard not found'}), 404
         
-        return jsonify({
-            'flashcard': {
-                'id': flashcard.id,
-                'question': flashcard.question,
-                'answer': flashcard.answer,
-                'deck_id': flashcard.deck_id,
-                'deck_name': flashcard.deck.name if flashcard.deck else None,
-                'difficulty': flashcard.difficulty,
-                'times_reviewed': flashcard.times_reviewed,
-                'times_correct': flashcard.times_correct,
-                'easiness_factor': flashcard.easiness_factor,
-                'interval': flashcard.interval,
-                'next_review': flashcard.next_review.isoformat() if flashcard.next_review else None,
-                'created_at': flashcard.created_at.isoformat() if flashcard.created_at else None
-            }
-        })
+        return jsonify({'flashcard': _flashcard_detail(flashcard)})
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@api_flashcards_bp.route('/random', methods=['GET'])
+@jwt_required()
+def get_random_flashcard():
+    """Get one of the current user's flashcards at random, optionally from one deck."""
+    try:
+        query = Flashcard.query.options(joinedload(Flashcard.deck)).filter_by(user_id=get_current_user_id())
+        
+        deck_id = request.args.get('deck_id', type=int)
+        if deck_id:
+            query = query.filter_by(deck_id=deck_id)
+        
+        flashcard = query.order_by(func.random()).first()
+        
+        if not flashcard:
+            return jsonify({'error': 'No flashcards available'}), 404
+        
+        return jsonify({'flashcard': _flashcard_detail(flashcard)})
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def _flashcard_detail(flashcard):
+    """Full JSON for one card (single-card endpoints)."""
+    return {
+        'id': flashcard.id,
+        'question': flashcard.question,
+        'answer': flashcard.answer,
+        'deck_id': flashcard.deck_id,
+        'deck_name': flashcard.deck.name if flashcard.deck else None,
+        'difficulty': flashcard.difficulty,
+        'times_reviewed': flashcard.times_reviewed,
+        'times_correct': flashcard.times_correct,
+        'easiness_factor': flashcard.ease_factor,
+        'interval': flashcard.interval_days,
+        'next_review': None if flashcard.is_new else flashcard.next_review.isoformat(),
+        'created_at': flashcard.created_at.isoformat() if flashcard.created_at else None
+    }
+
+
 @api_flashcards_bp.route('/<int:id>', methods=['PUT'])
 @jwt_required()
 def update_flashcard(id):
     """Update an existing flashcard."""
     try:
-        flashcard = Flashcard.query.get(id)
+        user_id = get_current_user_id()
+        flashcard = Flashcard.query.filter_by(id=id, user_id=user_id).first()
         
         if not flashcard:
             return jsonify({'error': 'Flashcard not found'}), 404
         
         data = request.get_json()
+        previous_deck_id = flashcard.deck_id
         
         if 'question' in data:
             flashcard.question = data['question'].strip()
         if 'answer' in data:
             flashcard.answer = data['answer'].strip()
         if 'deck_id' in data:
-            old_deck_id = flashcard.deck_id
+            if data['deck_id'] and not Deck.get_owned(data['deck_id'], user_id):
+                return jsonify({'error': 'Deck not found'}), 404
+            # Deck card counts follow the move in the Flashcard flush listeners
             flashcard.deck_id = data['deck_id']
-            
-            # Update card counts
-            if old_deck_id:
-                old_deck = Deck.query.get(old_deck_id)
-                if old_deck:
-                    old_deck.card_count = max(0, Flashcard.query.filter_by(deck_id=old_deck_id).count() - 1)
-            if data['deck_id']:
-                new_deck = Deck.query.get(data['deck_id'])
-                if new_deck:
-                    new_deck.card_count = Flashcard.query.filter_by(deck_id=data['deck_id']).count() + 1
         
         if 'difficulty' in data:
             flashcard.difficulty = data['difficulty']
         
         db.session.commit()
+        response_cache.invalidate([previous_deck_id, flashcard.deck_id], user_id=user_id)
         
         return jsonify({
             'message': 'Flashcard updated successfully',
@@ -191,22 +330,16 @@ def update_flashcard(id):
 def delete_flashcard(id):
     """Delete a flashcard."""
     try:
-        flashcard = Flashcard.query.get(id)
+        user_id = get_current_user_id()
+        flashcard = Flashcard.query.filter_by(id=id, user_id=user_id).first()
         
         if not flashcard:
             return jsonify({'error': 'Flashcard not found'}), 404
         
         deck_id = flashcard.deck_id
-        
         db.session.delete(flashcard)
-        
-        # Update deck card count
-        if deck_id:
-            deck = Deck.query.get(deck_id)
-            if deck:
-                deck.card_count = max(0, Flashcard.query.filter_by(deck_id=deck_id).count() - 1)
-        
         db.session.commit()
+        response_cache.invalidate([deck_id], user_id=user_id)
         
         return jsonify({'message': 'Flashcard deleted successfully'})
         
@@ -220,38 +353,111 @@ def delete_flashcard(id):
 @api_flashcards_bp.route('/decks', methods=['GET'])
 @jwt_required()
 def list_decks():
-    """List all decks with hierarchical structure."""
+    """List the current user's decks with hierarchical structure."""
     try:
         parent_id = request.args.get('parent_id', type=int)
+        user_id = get_current_user_id()
+        
+        # Deck rows carry names, hierarchy and card counts, so one validator covers the listing
+        etag, last_modified = collection_validators(collection_state(Deck, Deck.user_id == user_id))
+        if is_not_modified(etag):
+            return not_modified(etag, last_modified)
         
         if parent_id:
             # Get sub-decks of a parent
-            decks = Deck.query.filter_by(parent_id=parent_id).order_by(Deck.name).all()
-            parent_deck = Deck.query.get(parent_id)
+            decks = Deck.query.filter_by(user_id=user_id, parent_id=parent_id).order_by(Deck.name).all()
+            parent_deck = Deck.get_owned(parent_id, user_id)
             breadcrumb = parent_deck.get_breadcrumb() if parent_deck else []
         else:
             # Get root-level decks only
-            decks = Deck.query.filter_by(parent_id=None).order_by(Deck.name).all()
+            decks = Deck.query.filter_by(user_id=user_id, parent_id=None).order_by(Deck.name).all()
             parent_deck = None
             breadcrumb = []
         
+        # Sub-deck counts for the whole page in one grouped query
+        children_counts = Deck.children_counts([deck.id for deck in decks])
+        
         decks_data = [{
             'id': deck.id,
             'name': deck.name,
             'description': deck.description,
             'parent_id': deck.parent_id,
             'card_count': deck.card_count,
-            'children_count': len(deck.children) if hasattr(deck, 'children') else 0,
+            'children_count': children_counts.get(deck.id, 0),
             'created_at': deck.created_at.isoformat() if deck.created_at else None
         } for deck in decks]
         
-        return jsonify({
+        return with_validators(jsonify({
             'decks': decks_data,
             'parent_deck': {
                 'id': parent_deck.id,
                 'name': parent_deck.name
             } if parent_deck else None,
             'breadcrumb': [{'id': d.id, 'name': d.name} for d in breadcrumb]
+        }), etag, last_modified)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# Decks created before paths were maintained can't be placed in the tree
+MISSING_PATHS_ERROR = 'Deck paths are missing; run "flask decks rebuild-paths"'
+
+
+@api_flashcards_bp.route('/decks/tree', methods=['GET'])
+@jwt_required()
+def get_deck_tree():
+    """Get the user's whole deck hierarchy (or one subtree) with recursive card totals."""
+    try:
+        root_id = request.args.get('root_id', type=int)
+        user_id = get_current_user_id()
+        
+        query = Deck.query.filter_by(user_id=user_id)
+        if root_id:
+            root = Deck.get_owned(root_id, user_id)
+            if not root:
+                return jsonify({'error': 'Deck not found'}), 404
+            if root.path is None:
+                return jsonify({'error': MISSING_PATHS_ERROR}), 409
+            query = query.filter(Deck.path.startswith(root.path))
+        
+        # Parents sort before their descendants because a path prefixes its subtree
+        decks = query.order_by(Deck.path).all()
+        if any(deck.path is None for deck in decks):
+            return jsonify({'error': MISSING_PATHS_ERROR}), 409
+        
+        nodes = {}
+        roots = []
+        for deck in decks:
+            node = {
+                'id': deck.id,
+                'name': deck.name,
+                'description': deck.description,
+                'parent_id': deck.parent_id,
+                'card_count': deck.card_count or 0,
+                'total_card_count': deck.card_count or 0,
+                'depth': deck.depth,
+                'path': deck.path_ids,
+                'children': []
+            }
+            nodes[deck.id] = node
+            parent = nodes.get(deck.parent_id)
+            if parent is not None and deck.id != root_id:
+                parent['children'].append(node)
+            else:
+                roots.append(node)
+        
+        # Roll card totals up from the deepest decks first
+        for deck in reversed(decks):
+            node = nodes[deck.id]
+            node['is_folder'] = bool(node['children']) and node['card_count'] == 0
+            parent = nodes.get(deck.parent_id)
+            if parent is not None and deck.id != root_id:
+                parent['total_card_count'] += node['total_card_count']
+        
+        return jsonify({
+            'tree': roots,
+            'total_decks': len(decks)
         })
         
     except Exception as e:
@@ -271,18 +477,29 @@ def create_deck():
         name = data.get('name', '').strip()
         description = data.get('description', '').strip()
         parent_id = data.get('parent_id')
+        scheduler = data.get('scheduler')
         
         if not name:
             return jsonify({'error': 'Deck name is required'}), 400
         
+        if scheduler and scheduler not in SCHEDULERS:
+            return jsonify({'error': f'Scheduler must be one of: {", ".join(SCHEDULERS)}'}), 400
+        
+        user_id = get_current_user_id()
+        if parent_id and not Deck.get_owned(parent_id, user_id):
+            return jsonify({'error': 'Parent deck not found'}), 404
+        
         deck = Deck(
             name=name,
             description=description,
-            parent_id=parent_id
+            parent_id=parent_id,
+            user_id=user_id,
+            scheduler=scheduler or None
         )
         
         db.session.add(deck)
         db.session.commit()
+        response_cache.invalidate([deck.id], user_id=user_id)
         
         return jsonify({
             'message': 'Deck created successfully',
@@ -304,13 +521,30 @@ def create_deck():
 @api_flashcards_bp.route('/decks/<int:id>', methods=['GET'])
 @jwt_required()
 def get_deck(id):
-    """Get a single deck with its flashcards."""
+    """Get a single deck with one keyset page of its flashcards."""
     try:
-        deck = Deck.query.get(id)
+        cursor = request.args.get('cursor')
+        per_page = min(request.args.get('per_page', 100, type=int), 500)
+        user_id = get_current_user_id()
+        
+        # The deck, its children and breadcrumb are deck rows; its cards are the other scope
+        etag, last_modified = collection_validators(
+            collection_state(Deck, Deck.user_id == user_id),
+            collection_state(Flashcard, Flashcard.user_id == user_id, Flashcard.deck_id == id)
+        )
+        if is_not_modified(etag):
+            return not_modified(etag, last_modified)
+        
+        deck = Deck.get_owned(id, user_id)
         
         if not deck:
             return jsonify({'error': 'Deck not found'}), 404
         
+        cards, next_cursor = keyset_page(
+            Flashcard.query.filter_by(deck_id=deck.id),
+            Flashcard.created_at, Flashcard.id, cursor, per_page
+        )
+        
         flashcards = [{
             'id': card.id,
             'question': card.question,
@@ -318,7 +552,7 @@ def get_deck(id):
             'difficulty': card.difficulty,
             'times_reviewed': card.times_reviewed,
             'times_correct': card.times_correct
-        } for card in deck.flashcards]
+        } for card in cards]
         
         children = [{
             'id': child.id,
@@ -326,7 +560,7 @@ def get_deck(id):
             'card_count': child.card_count
         } for child in deck.children]
         
-        return jsonify({
+        return with_validators(jsonify({
             'deck': {
                 'id': deck.id,
                 'name': deck.name,
@@ -336,10 +570,13 @@ def get_deck(id):
                 'created_at': deck.created_at.isoformat() if deck.created_at else None
             },
             'flashcards': flashcards,
+            'next_cursor': next_cursor,
             'children': children,
             'breadcrumb': [{'id': d.id, 'name': d.name} for d in deck.get_breadcrumb()]
-        })
+        }), etag, last_modified)
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -349,7 +586,8 @@ def get_deck(id):
 def update_deck(id):
     """Update an existing deck."""
     try:
-        deck = Deck.query.get(id)
+        user_id = get_current_user_id()
+        deck = Deck.get_owned(id, user_id)
         
         if not deck:
             return jsonify({'error': 'Deck not found'}), 404
@@ -361,9 +599,19 @@ def update_deck(id):
         if 'description' in data:
             deck.description = data['description'].strip()
         if 'parent_id' in data:
+            new_parent = Deck.get_owned(data['parent_id'], user_id) if data['parent_id'] else None
+            if data['parent_id'] and not new_parent:
+                return jsonify({'error': 'Parent deck not found'}), 404
+            if new_parent and deck.id in new_parent.path_ids:
+                return jsonify({'error': 'A deck cannot be moved into its own sub-deck'}), 400
             deck.parent_id = data['parent_id']
+        if 'scheduler' in data:
+            if data['scheduler'] and data['scheduler'] not in SCHEDULERS:
+                return jsonify({'error': f'Scheduler must be one of: {", ".join(SCHEDULERS)}'}), 400
+            deck.scheduler = data['scheduler'] or None
         
         db.session.commit()
+        response_cache.invalidate([deck.id], user_id=user_id)
         
         return jsonify({
             'message': 'Deck updated successfully',
@@ -371,7 +619,8 @@ def update_deck(id):
                 'id': deck.id,
                 'name': deck.name,
                 'description': deck.description,
-                'parent_id': deck.parent_id
+                'parent_id': deck.parent_id,
+                'scheduler': deck.scheduler
             }
         })
         
@@ -385,14 +634,20 @@ def update_deck(id):
 def delete_deck(id):
     """Delete a deck and all its flashcards and sub-decks."""
     try:
-        deck = Deck.query.get(id)
+        user_id = get_current_user_id()
+        deck = Deck.get_owned(id, user_id)
         
         if not deck:
             return jsonify({'error': 'Deck not found'}), 404
         
+        subtree_ids = [deck.id]
+        if deck.path:
+            subtree_ids = [row.id for row in db.session.query(Deck.id).filter(Deck.path.startswith(deck.path))]
+        
         # Delete will cascade to flashcards and children
         db.session.delete(deck)
         db.session.commit()
+        response_cache.invalidate(subtree_ids, user_id=user_id)
         
         return jsonify({'message': 'Deck deleted successfully'})
         
@@ -2,31 +2,70 @@
 
 import random
 import re
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
+from sqlalchemy import case, func
+from sqlalchemy.orm import joinedload
 from app import db
 from app.models import Flashcard, Deck, Student, TestResult
 from app.auth import get_current_user_id
+from app.pagination import keyset_page
+from app.services.review_log import review_log_buffer
+from app.services.rescheduler import BulkRescheduler
+from app.services.response_cache import response_cache
 
 api_study_bp = Blueprint('api_study', __name__)
 
+MAX_BATCH_ANSWERS = 200
+# How far back offline answers may be dated
+MAX_ANSWER_AGE_DAYS = 30
+MAX_FORECAST_DAYS = 365
+
 
 @api_study_bp.route('/session', methods=['GET'])
 @jwt_required()
 def start_study_session():
-    """Start a study session and return flashcards to review."""
+    """Start a study session and return flashcards to review.
+    
+    mode=due restricts the session to cards due now: overdue reviews first
+    (oldest first), then never-reviewed cards in creation order, at most
+    new_limit of them when given.
+    """
     try:
         deck_id = request.args.get('deck_id', type=int)
         adaptive = request.args.get('adaptive', 'true').lower() == 'true'
         limit = request.args.get('limit', 20, type=int)
+        mode = request.args.get('mode', 'all').lower()
+        new_limit = request.args.get('new_limit', type=int)
+        
+        if mode not in ('all', 'due'):
+            return jsonify({'error': 'Mode must be "all" or "due"'}), 400
         
-        query = Flashcard.query
+        query = Flashcard.query.options(joinedload(Flashcard.deck)).filter_by(user_id=get_current_user_id())
         
         if deck_id:
             query = query.filter_by(deck_id=deck_id)
         
-        cards = query.all()
+        # Due queue, adaptive ordering (prioritize difficult cards) or random,
+        # letting the database pick the top `limit` rows
+        if mode == 'due':
+            # New cards are due since NEW_CARD_DUE (1970) and would otherwise
+            # sort ahead of every overdue review
+            cards = query.filter(
+                Flashcard.due_filter(), Flashcard.next_review > Flashcard.NEW_CARD_DUE
+            ).order_by(Flashcard.next_review.asc()).limit(limit).all()
+            new_cards = limit - len(cards) if new_limit is None else min(limit - len(cards), new_limit)
+            if new_cards > 0:
+                cards += query.filter(
+                    Flashcard.next_review <= Flashcard.NEW_CARD_DUE
+                ).order_by(Flashcard.id.asc()).limit(new_cards).all()
+        else:
+            if adaptive:
+                query = query.order_by(Flashcard.priority.desc())
+            else:
+                query = query.order_by(func.random())
+            cards = query.limit(limit).all()
         
         if not cards:
             return jsonify({
@@ -34,15 +73,6 @@ def start_study_session():
                 'flashcards': []
             }), 404
         
-        # Use adaptive ordering (prioritize difficult cards) or random
-        if adaptive:
-            cards.sort(key=lambda card: card.priority_score, reverse=True)
-        else:
-            random.shuffle(cards)
-        
-        # Limit cards
-        cards = cards[:limit]
-        
         flashcards = [{
             'id': card.id,
             'question': card.question,
@@ -58,7 +88,8 @@ def start_study_session():
             'session_id': datetime.utcnow().isoformat(),
             'flashcards': flashcards,
             'total': len(flashcards),
-            'adaptive': adaptive
+            'adaptive': adaptive,
+            'mode': mode
         })
         
     except Exception as e:
@@ -76,20 +107,26 @@ def submit_answer():
             return jsonify({'error': 'Request body is required'}), 400
         
         flashcard_id = data.get('flashcard_id')
-        quality = data.get('quality', 3)  # 0-5 scale
+        quality = _parse_quality(data.get('quality', 3))  # 0-5 scale
         user_answer = data.get('user_answer', '')
         
         if not flashcard_id:
             return jsonify({'error': 'Flashcard ID is required'}), 400
         
-        card = Flashcard.query.get(flashcard_id)
+        if quality is None:
+            return jsonify({'error': 'Quality must be an integer from 0 to 5'}), 400
+        
+        user_id = get_current_user_id()
+        card = Flashcard.query.filter_by(id=flashcard_id, user_id=user_id).first()
         
         if not card:
             return jsonify({'error': 'Flashcard not found'}), 404
         
         # Update spaced repetition
-        card.update_spaced_repetition(quality)
+        review = card.update_spaced_repetition(quality)
         db.session.commit()
+        response_cache.invalidate([card.deck_id], user_id=user_id)
+        review_log_buffer.add(review, user_id=user_id)
         
         # Determine if answer is correct (simple comparison)
         is_correct = quality >= 3
@@ -106,7 +143,7 @@ def submit_answer():
             'quality': quality,
             'correct_answer': card.answer,
             'next_review': card.next_review.isoformat() if card.next_review else None,
-            'interval': card.interval,
+            'interval': card.interval_days,
             'ai_feedback': ai_feedback
         })
         
@@ -115,6 +152,176 @@ def submit_answer():
         return jsonify({'error': str(e)}), 500
 
 
+@api_study_bp.route('/answers', methods=['POST'])
+@jwt_required()
+def submit_answers():
+    """
+    Submit a batch of answers and update spaced repetition data in one commit.
+    
+    Body: {"answers": [{"flashcard_id", "quality", "answered_at"}, ...]}.
+    Answers are applied in answered_at order so repeated cards schedule correctly.
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('answers'), list) or not data['answers']:
+            return jsonify({'error': 'A non-empty answers list is required'}), 400
+        
+        answers = data['answers']
+        if len(answers) > MAX_BATCH_ANSWERS:
+            return jsonify({'error': f'At most {MAX_BATCH_ANSWERS} answers per request'}), 400
+        
+        now = datetime.utcnow()
+        parsed = []
+        for answer in answers:
+            if not isinstance(answer, dict):
+                return jsonify({'error': 'Each answer must be an object'}), 400
+            flashcard_id = answer.get('flashcard_id')
+            if not flashcard_id:
+                return jsonify({'error': 'Each answer needs a flashcard_id'}), 400
+            answered_at = _parse_answered_at(answer.get('answered_at'), now)
+            if answered_at is None:
+                return jsonify({
+                    'error': f'Invalid answered_at for flashcard {flashcard_id} '
+                             f'(ISO-8601, at most {MAX_ANSWER_AGE_DAYS} days ago)'
+                }), 400
+            quality = _parse_quality(answer.get('quality', 3))
+            if quality is None:
+                return jsonify({'error': f'Quality for flashcard {flashcard_id} must be an integer from 0 to 5'}), 400
+            parsed.append((answered_at, int(flashcard_id), quality))
+        
+        # One IN query for every card in the batch
+        user_id = get_current_user_id()
+        card_ids = {flashcard_id for _, flashcard_id, _ in parsed}
+        cards = {
+            card.id: card
+            for card in Flashcard.query.filter(Flashcard.id.in_(card_ids), Flashcard.user_id == user_id)
+        }
+        
+        results = []
+        reviews = []
+        for answered_at, flashcard_id, quality in sorted(parsed, key=lambda a: a[0]):
+            card = cards.get(flashcard_id)
+            if not card:
+                results.append({'flashcard_id': flashcard_id, 'error': 'Flashcard not found'})
+                continue
+            if card.last_reviewed and answered_at < card.last_reviewed:
+                # Would move last_reviewed backwards (negative elapsed time for FSRS)
+                results.append({'flashcard_id': flashcard_id, 'error': 'Answered before the card\'s last review'})
+                continue
+            
+            reviews.append(card.update_spaced_repetition(quality, reviewed_at=answered_at))
+            results.append({
+                'flashcard_id': flashcard_id,
+                'is_correct': quality >= 3,
+                'quality': quality,
+                'next_review': card.next_review.isoformat(),
+                'interval': card.interval_days
+            })
+        
+        db.session.commit()
+        response_cache.invalidate((card.deck_id for card in cards.values()), user_id=user_id)
+        
+        for review in reviews:
+            review_log_buffer.add(review, user_id=user_id)
+        
+        return jsonify({
+            'success': True,
+            'processed': len(reviews),
+            'results': results
+        })
+        
+    except (TypeError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+def _parse_quality(value):
+    """An answer quality as an int from 0 to 5, or None if it is out of range or not a number."""
+    try:
+        quality = int(value)
+    except (TypeError, ValueError):
+        return None
+    return quality if 0 <= quality <= 5 else None
+
+
+def _parse_answered_at(value, now):
+    """
+    Parse an ISO-8601 answer timestamp into naive UTC, clamped to `now`.
+    
+    Returns None for unparseable timestamps and ones older than
+    MAX_ANSWER_AGE_DAYS.
+    """
+    if not value:
+        return now
+    try:
+        answered_at = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if answered_at.tzinfo is not None:
+        answered_at = answered_at.astimezone(timezone.utc).replace(tzinfo=None)
+    if answered_at < now - timedelta(days=MAX_ANSWER_AGE_DAYS):
+        return None
+    return min(answered_at, now)
+
+
+@api_study_bp.route('/reschedule', methods=['POST'])
+@jwt_required()
+def reschedule_deck():
+    """
+    Bulk-reschedule a deck's reviewed cards.
+    
+    Modes: "shift" (days), "exam" (exam_date) and "recompute"
+    (interval_modifier, max_interval).
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not data.get('deck_id'):
+            return jsonify({'error': 'Deck ID is required'}), 400
+        
+        deck = Deck.get_owned(data['deck_id'], get_current_user_id())
+        if not deck:
+            return jsonify({'error': 'Deck not found'}), 404
+        
+        mode = data.get('mode', 'shift')
+        rescheduler = BulkRescheduler(deck.id, include_subdecks=bool(data.get('include_subdecks')))
+        
+        if mode == 'shift':
+            rescheduled = rescheduler.shift(int(data.get('days', 0)))
+        elif mode == 'exam':
+            if not data.get('exam_date'):
+                return jsonify({'error': 'exam_date is required for exam mode'}), 400
+            rescheduled = rescheduler.compress_to(datetime.fromisoformat(data['exam_date']))
+        elif mode == 'recompute':
+            rescheduled = rescheduler.recompute(
+                interval_modifier=float(data.get('interval_modifier', 1.0)),
+                max_interval=int(data.get('max_interval', 36500))
+            )
+        else:
+            return jsonify({'error': 'Mode must be "shift", "exam" or "recompute"'}), 400
+        
+        db.session.commit()
+        response_cache.invalidate(rescheduler.deck_ids(), user_id=deck.user_id)
+        
+        return jsonify({
+            'success': True,
+            'mode': mode,
+            'deck_id': deck.id,
+            'rescheduled': rescheduled
+        })
+        
+    except (TypeError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
 @api_study_bp.route('/test/start', methods=['POST'])
 @jwt_required()
 def start_test():
@@ -143,7 +350,7 @@ def start_test():
                 db.session.commit()
         
         # Get cards for test
-        query = Flashcard.query
+        query = Flashcard.query.filter_by(user_id=get_current_user_id())
         if deck_id:
             query = query.filter_by(deck_id=deck_id)
         
@@ -192,8 +399,9 @@ def submit_test():
             return jsonify({'error': 'Answers are required'}), 400
         
         # Get flashcards
+        user_id = get_current_user_id()
         card_ids = [int(id) for id in answers.keys()]
-        cards = Flashcard.query.filter(Flashcard.id.in_(card_ids)).all()
+        cards = Flashcard.query.filter(Flashcard.id.in_(card_ids), Flashcard.user_id == user_id).all()
         
         correct = 0
         wrong = 0
@@ -225,6 +433,7 @@ def submit_test():
             test_result = TestResult(
                 student_id=student_id,
                 deck_id=deck_id,
+                user_id=user_id,
                 total_questions=total,
                 correct_answers=correct,
                 wrong_answers=wrong,
@@ -233,6 +442,7 @@ def submit_test():
             )
             db.session.add(test_result)
             db.session.commit()
+            response_cache.invalidate([deck_id], user_id=user_id)
         
         return jsonify({
             'success': True,
@@ -251,38 +461,29 @@ def submit_test():
 
 @api_study_bp.route('/stats', methods=['GET'])
 @jwt_required()
+@response_cache.cached(deck_arg='deck_id')
 def get_study_stats():
-    """Get study statistics."""
+    """Get study statistics for the current user's cards."""
     try:
         deck_id = request.args.get('deck_id', type=int)
+        user_id = get_current_user_id()
         
-        query = Flashcard.query
+        # Every card count and review sum in one conditional-aggregate SELECT
+        criteria = [Flashcard.user_id == user_id]
         if deck_id:
-            query = query.filter_by(deck_id=deck_id)
-        
-        total_cards = query.count()
-        
-        # Cards due for review
-        due_cards = query.filter(
-            (Flashcard.next_review <= datetime.utcnow()) | (Flashcard.next_review.is_(None))
-        ).count()
-        
-        # Cards that have been reviewed
-        reviewed_cards = query.filter(Flashcard.times_reviewed > 0).count()
+            criteria.append(Flashcard.deck_id == deck_id)
+        summary = Flashcard.summary(*criteria)
         
         # Average success rate
-        cards_with_reviews = query.filter(Flashcard.times_reviewed > 0).all()
-        if cards_with_reviews:
-            total_reviews = sum(c.times_reviewed for c in cards_with_reviews)
-            total_correct = sum(c.times_correct for c in cards_with_reviews)
-            avg_success_rate = round((total_correct / total_reviews) * 100, 2) if total_reviews > 0 else 0
+        if summary['total_reviews'] > 0:
+            avg_success_rate = round((summary['total_correct'] / summary['total_reviews']) * 100, 2)
         else:
             avg_success_rate = 0
         
         # Get deck stats if deck_id provided
         deck_info = None
         if deck_id:
-            deck = Deck.query.get(deck_id)
+            deck = Deck.get_owned(deck_id, user_id)
             if deck:
                 deck_info = {
                     'id': deck.id,
@@ -291,10 +492,10 @@ def get_study_stats():
                 }
         
         return jsonify({
-            'total_cards': total_cards,
-            'due_cards': due_cards,
-            'reviewed_cards': reviewed_cards,
-            'mastered_cards': query.filter(Flashcard.interval >= 21).count(),
+            'total_cards': summary['total'],
+            'due_cards': summary['due'],
+            'reviewed_cards': summary['reviewed'],
+            'mastered_cards': summary['mastered'],
             'avg_success_rate': avg_success_rate,
             'deck': deck_info
         })
@@ -303,23 +504,143 @@ def get_study_stats():
         return jsonify({'error': str(e)}), 500
 
 
+@api_study_bp.route('/forecast', methods=['GET'])
+@jwt_required()
+def get_forecast():
+    """
+    Get the number of reviews due on each of the next `days` days.
+    
+    Overdue cards are folded into today; never-reviewed cards are reported
+    separately as `new`. by_deck=true adds a per-deck split to every day.
+    """
+    try:
+        days = request.args.get('days', 30, type=int)
+        deck_id = request.args.get('deck_id', type=int)
+        include_subdecks = request.args.get('include_subdecks', 'false').lower() == 'true'
+        by_deck = request.args.get('by_deck', 'false').lower() == 'true'
+        
+        if days < 1 or days > MAX_FORECAST_DAYS:
+            return jsonify({'error': f'Days must be between 1 and {MAX_FORECAST_DAYS}'}), 400
+        
+        today = datetime.utcnow().date()
+        start = datetime.combine(today, datetime.min.time())
+        end = start + timedelta(days=days)
+        
+        user_id = get_current_user_id()
+        scope = [Flashcard.user_id == user_id]
+        if deck_id:
+            deck = Deck.get_owned(deck_id, user_id)
+            if not deck:
+                return jsonify({'error': 'Deck not found'}), 404
+            if include_subdecks and deck.path:
+                subtree = db.session.query(Deck.id).filter(Deck.path.startswith(deck.path))
+                scope.append(Flashcard.deck_id.in_(subtree))
+            else:
+                scope.append(Flashcard.deck_id == deck.id)
+        
+        # One range scan over the next_review index; overdue days are clamped
+        # to today in SQL so the grouping never grows with the backlog
+        due_day = func.date(case((Flashcard.next_review < start, start), else_=Flashcard.next_review))
+        columns = [due_day.label('day')]
+        if by_deck:
+            columns.append(Flashcard.deck_id)
+        
+        rows = (
+            db.session.query(
+                *columns,
+                func.count(Flashcard.id).label('due'),
+                func.sum(case((Flashcard.next_review < start, 1), else_=0)).label('overdue')
+            )
+            .filter(*scope)
+            .filter(Flashcard.next_review > Flashcard.NEW_CARD_DUE, Flashcard.next_review < end)
+            .group_by(*columns)
+            .all()
+        )
+        
+        new_cards = (
+            db.session.query(func.count(Flashcard.id))
+            .filter(*scope)
+            .filter(Flashcard.next_review <= Flashcard.NEW_CARD_DUE)
+            .scalar()
+        )
+        
+        overdue = 0
+        buckets = {
+            (today + timedelta(days=offset)).isoformat(): {'due': 0, 'decks': {}}
+            for offset in range(days)
+        }
+        for row in rows:
+            # SQLite returns dates as text, PostgreSQL as date objects
+            day = row.day if isinstance(row.day, str) else row.day.isoformat()
+            bucket = buckets.get(day)
+            if bucket is None:
+                continue
+            bucket['due'] += row.due
+            overdue += row.overdue or 0
+            if by_deck:
+                bucket['decks'][str(row.deck_id)] = row.due
+        
+        forecast = []
+        for day, bucket in buckets.items():
+            entry = {'date': day, 'due': bucket['due']}
+            if by_deck:
+                entry['decks'] = bucket['decks']
+            forecast.append(entry)
+        
+        return jsonify({
+            'days': days,
+            'deck_id': deck_id,
+            'overdue': overdue,
+            'new': new_cards,
+            'total_due': sum(entry['due'] for entry in forecast),
+            'forecast': forecast
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @api_study_bp.route('/reports', methods=['GET'])
 @jwt_required()
 def get_reports():
-    """Get test reports."""
+    """
+    Get the current user's test reports.
+    
+    Passing `cursor` (empty for the first page) switches from page numbers
+    to keyset pagination; the total is then only counted with include_total=true.
+    """
     try:
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
         student_id = request.args.get('student_id', type=int)
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total', 'false').lower() == 'true'
         
-        query = TestResult.query
+        query = TestResult.query.options(
+            joinedload(TestResult.student),
+            joinedload(TestResult.deck)
+        ).filter_by(user_id=get_current_user_id())
         
         if student_id:
             query = query.filter_by(student_id=student_id)
         
-        pagination = query.order_by(TestResult.completed_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        if cursor is not None:
+            items, next_cursor = keyset_page(
+                query, TestResult.completed_at, TestResult.id, cursor or None, per_page
+            )
+            page_info = {'next_cursor': next_cursor}
+            if include_total:
+                page_info['total'] = query.count()
+        else:
+            pagination = query.order_by(TestResult.completed_at.desc()).paginate(
+                page=page, per_page=per_page, error_out=False
+            )
+            items = pagination.items
+            page_info = {
+                'total': pagination.total,
+                'pages': pagination.pages,
+                'current_page': pagination.page
+            }
         
         results = [{
             'id': result.id,
@@ -333,14 +654,14 @@ def get_reports():
             'score_percentage': result.score_percentage,
             'time_taken_seconds': result.time_taken_seconds,
             'completed_at': result.completed_at.isoformat() if result.completed_at else None
-        } for result in pagination.items]
+        } for result in items]
         
         return jsonify({
             'results': results,
-            'total': pagination.total,
-            'pages': pagination.pages,
-            'current_page': pagination.page
+            **page_info
         })
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1,11 +1,17 @@
 """REST API User Management Routes."""
 
-from datetime import datetime
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 from app import db
-from app.models import User, Flashcard, Deck, TestResult
+from app.models import User, Flashcard, Deck, DeckStats, TestResult
 from app.auth import get_current_user_id, user_to_dict
+from app.scheduling import DEFAULT_SCHEDULER, SCHEDULERS
+from app.scheduling.optimizer import optimize_user
+from app.services.generation_cache import generation_cache, evaluation_cache
+from app.services.identity_cache import identity_cache
+from app.services.response_cache import response_cache
 
 api_users_bp = Blueprint('api_users', __name__)
 
@@ -15,14 +21,13 @@ api_users_bp = Blueprint('api_users', __name__)
 def get_profile():
     """Get current user's profile."""
     try:
-        user_id = get_current_user_id()
-        user = User.query.get(user_id)
+        user = identity_cache.user_dict(get_current_user_id())
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         return jsonify({
-            'user': user_to_dict(user)
+            'user': user
         })
         
     except Exception as e:
@@ -54,6 +59,7 @@ def update_profile():
                 user.email = new_email
         
         db.session.commit()
+        identity_cache.invalidate(user_id)
         
         return jsonify({
             'message': 'Profile updated successfully',
@@ -96,6 +102,7 @@ def change_password():
         
         user.set_password(new_password)
         db.session.commit()
+        identity_cache.invalidate(user_id)
         
         return jsonify({'message': 'Password changed successfully'})
         
@@ -106,43 +113,30 @@ def change_password():
 
 @api_users_bp.route('/dashboard', methods=['GET'])
 @jwt_required()
+@response_cache.cached()
 def get_dashboard():
     """Get dashboard statistics for current user."""
     try:
         user_id = get_current_user_id()
-        user = User.query.get(user_id)
+        user = identity_cache.user_dict(user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Get overall statistics
-        total_cards = Flashcard.query.count()
-        total_decks = Deck.query.count()
-        
-        # Cards due for review
-        due_cards = Flashcard.query.filter(
-            (Flashcard.next_review <= datetime.utcnow()) | (Flashcard.next_review.is_(None))
-        ).count()
+        # Overall card statistics in one conditional-aggregate SELECT
+        summary = Flashcard.summary(Flashcard.user_id == user_id)
+        total_decks = db.session.query(func.count(Deck.id)).filter(Deck.user_id == user_id).scalar()
         
-        # Study progress
-        cards_reviewed = Flashcard.query.filter(Flashcard.times_reviewed > 0).count()
-        
-        # Calculate mastery rate
-        all_reviewed_cards = Flashcard.query.filter(Flashcard.times_reviewed > 0).all()
-        if all_reviewed_cards:
-            total_reviews = sum(c.times_reviewed for c in all_reviewed_cards)
-            total_correct = sum(c.times_correct for c in all_reviewed_cards)
-            mastery_rate = round((total_correct / total_reviews) * 100, 2) if total_reviews > 0 else 0
+        # Correct answers over all reviews
+        if summary['total_reviews'] > 0:
+            mastery_rate = round((summary['total_correct'] / summary['total_reviews']) * 100, 2)
         else:
             mastery_rate = 0
         
-        # Cards that are considered "mastered" (high interval)
-        mastered_cards = Flashcard.query.filter(Flashcard.interval >= 21).count()
-        
         # Recent test results
-        recent_tests = TestResult.query.order_by(
-            TestResult.completed_at.desc()
-        ).limit(5).all()
+        recent_tests = TestResult.query.options(joinedload(TestResult.deck)).filter_by(
+            user_id=user_id
+        ).order_by(TestResult.completed_at.desc()).limit(5).all()
         
         recent_tests_data = [{
             'id': test.id,
@@ -152,7 +146,7 @@ def get_dashboard():
         } for test in recent_tests]
         
         # Recent decks
-        recent_decks = Deck.query.order_by(Deck.created_at.desc()).limit(5).all()
+        recent_decks = Deck.query.filter_by(user_id=user_id).order_by(Deck.created_at.desc()).limit(5).all()
         recent_decks_data = [{
             'id': deck.id,
             'name': deck.name,
@@ -162,16 +156,16 @@ def get_dashboard():
         
         return jsonify({
             'user': {
-                'username': user.username,
-                'full_name': user.full_name,
-                'last_login': user.last_login.isoformat() if user.last_login else None
+                'username': user['username'],
+                'full_name': user['full_name'],
+                'last_login': user['last_login']
             },
             'stats': {
-                'total_cards': total_cards,
+                'total_cards': summary['total'],
                 'total_decks': total_decks,
-                'due_cards': due_cards,
-                'cards_reviewed': cards_reviewed,
-                'mastered_cards': mastered_cards,
+                'due_cards': summary['due'],
+                'cards_reviewed': summary['reviewed'],
+                'mastered_cards': summary['mastered'],
                 'mastery_rate': mastery_rate
             },
             'recent_tests': recent_tests_data,
@@ -184,49 +178,45 @@ def get_dashboard():
 
 @api_users_bp.route('/stats', methods=['GET'])
 @jwt_required()
+@response_cache.cached()
 def get_user_stats():
     """Get detailed user statistics."""
     try:
         user_id = get_current_user_id()
         
-        # Deck-by-deck statistics
-        decks = Deck.query.all()
-        deck_stats = []
-        
-        for deck in decks:
-            cards = Flashcard.query.filter_by(deck_id=deck.id).all()
-            
-            if cards:
-                total_reviews = sum(c.times_reviewed for c in cards)
-                total_correct = sum(c.times_correct for c in cards)
-                success_rate = round((total_correct / total_reviews) * 100, 2) if total_reviews > 0 else 0
-                
-                due_count = sum(1 for c in cards if c.next_review is None or c.next_review <= datetime.utcnow())
-            else:
-                success_rate = 0
-                due_count = 0
-            
-            deck_stats.append({
-                'id': deck.id,
-                'name': deck.name,
-                'card_count': deck.card_count,
-                'due_count': due_count,
-                'success_rate': success_rate
-            })
+        # Deck-by-deck statistics: one rollup row per deck plus one grouped due count
+        rows = db.session.query(Deck, DeckStats).outerjoin(
+            DeckStats, DeckStats.deck_id == Deck.id
+        ).filter(Deck.user_id == user_id).all()
+        
+        due_counts = dict(
+            db.session.query(Flashcard.deck_id, func.count(Flashcard.id))
+            .filter(Flashcard.user_id == user_id, Flashcard.due_filter())
+            .group_by(Flashcard.deck_id)
+            .all()
+        )
+        
+        deck_stats = [{
+            'id': deck.id,
+            'name': deck.name,
+            'card_count': deck.card_count,
+            'due_count': due_counts.get(deck.id, 0),
+            'success_rate': stats.success_rate if stats else 0,
+            'mastered_count': stats.mastered_count if stats else 0,
+            'new_count': stats.new_count if stats else 0
+        } for deck, stats in rows]
         
         # Sort by due count (most urgent first)
         deck_stats.sort(key=lambda d: d['due_count'], reverse=True)
         
         # Overall test performance
-        all_tests = TestResult.query.all()
-        if all_tests:
-            avg_score = round(sum(t.score_percentage for t in all_tests) / len(all_tests), 2)
-            total_test_questions = sum(t.total_questions for t in all_tests)
-            total_tests = len(all_tests)
-        else:
-            avg_score = 0
-            total_test_questions = 0
-            total_tests = 0
+        total_tests, avg_score, total_test_questions = db.session.query(
+            func.count(TestResult.id),
+            func.avg(TestResult.score_percentage),
+            func.sum(TestResult.total_questions)
+        ).filter(TestResult.user_id == user_id).one()
+        avg_score = round(avg_score, 2) if avg_score is not None else 0
+        total_test_questions = total_test_questions or 0
         
         return jsonify({
             'deck_stats': deck_stats,
@@ -239,3 +229,113 @@ def get_user_stats():
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+
+@api_users_bp.route('/scheduler', methods=['GET'])
+@jwt_required()
+def get_scheduler_settings():
+    """Get the current user's spaced repetition scheduler settings."""
+    try:
+        user = User.query.get(get_current_user_id())
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        return jsonify({
+            'scheduler': user.scheduler or DEFAULT_SCHEDULER,
+            'available': list(SCHEDULERS),
+            'desired_retention': user.desired_retention,
+            'fsrs_params': user.fsrs_params
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@api_users_bp.route('/scheduler', methods=['PUT'])
+@jwt_required()
+def update_scheduler_settings():
+    """Choose the current user's default scheduler and target retention."""
+    try:
+        user = User.query.get(get_current_user_id())
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        data = request.get_json() or {}
+        
+        if 'scheduler' in data:
+            if data['scheduler'] not in SCHEDULERS:
+                return jsonify({'error': f'Scheduler must be one of: {", ".join(SCHEDULERS)}'}), 400
+            user.scheduler = data['scheduler']
+        
+        if 'desired_retention' in data:
+            retention = float(data['desired_retention'])
+            if not 0.7 <= retention <= 0.99:
+                return jsonify({'error': 'Desired retention must be between 0.7 and 0.99'}), 400
+            user.desired_retention = retention
+        
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'Scheduler settings updated',
+            'scheduler': user.scheduler,
+            'desired_retention': user.desired_retention
+        })
+        
+    except (TypeError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@api_users_bp.route('/scheduler/optimize', methods=['POST'])
+@jwt_required()
+def optimize_scheduler():
+    """
+    Fit personal FSRS parameters from the current user's recent review history.
+    
+    Fits on at most FSRS_OPTIMIZE_MAX_REVIEWS reviews to keep the request
+    short; `flask scheduler optimize USER_ID` fits on the full history.
+    """
+    try:
+        user = User.query.get(get_current_user_id())
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        result = optimize_user(user, max_reviews=current_app.config.get('FSRS_OPTIMIZE_MAX_REVIEWS', 20000))
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'fsrs_params': result.params,
+            'initial_loss': result.initial_loss,
+            'final_loss': result.final_loss,
+            'reviews': result.reviews,
+            'cards': result.cards,
+            'seconds': result.seconds
+        })
+        
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@api_users_bp.route('/cache/stats', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    """Get response, AI generation and evaluation cache hit/miss counters for this worker."""
+    try:
+        stats = response_cache.stats()
+        stats['generation'] = generation_cache.stats()
+        stats['evaluation'] = evaluation_cache.stats()
+        return jsonify(stats)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
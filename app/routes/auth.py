@@ -5,6 +5,7 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_user, logout_user, login_required, current_user
 from app import db
 from app.models import User
+from app.services.response_cache import response_cache
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
 
@@ -32,6 +33,7 @@ def login():
             login_user(user, remember=remember)
             user.last_login = datetime.utcnow()
             db.session.commit()
+            response_cache.invalidate_user(user.id)
             
             next_page = request.args.get('next')
             flash(f'Welcome back, {user.username}!', 'success')
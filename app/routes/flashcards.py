@@ -1,24 +1,33 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, abort
 from app import db
 from app.models import Flashcard, Deck
+from app.pagination import keyset_page
+from app.services.response_cache import response_cache
 
 flashcards_bp = Blueprint('flashcards', __name__)
 
 
 @flashcards_bp.route('/')
 def list_flashcards():
-    """List all flashcards with optional deck filter."""
+    """List flashcards newest-first, one keyset page at a time, with optional deck filter."""
     deck_id = request.args.get('deck_id', type=int)
+    cursor = request.args.get('cursor')
+    per_page = request.args.get('per_page', 50, type=int)
     
+    query = Flashcard.query
+    deck = None
     if deck_id:
-        flashcards = Flashcard.query.filter_by(deck_id=deck_id).order_by(Flashcard.created_at.desc()).all()
+        query = query.filter_by(deck_id=deck_id)
         deck = Deck.query.get(deck_id)
-    else:
-        flashcards = Flashcard.query.order_by(Flashcard.created_at.desc()).all()
-        deck = None
+    
+    try:
+        flashcards, next_cursor = keyset_page(query, Flashcard.created_at, Flashcard.id, cursor, per_page)
+    except ValueError:
+        abort(400)
     
     decks = Deck.query.all()
-    return render_template('flashcards/list.html', flashcards=flashcards, decks=decks, current_deck=deck)
+    return render_template('flashcards/list.html', flashcards=flashcards, decks=decks, current_deck=deck,
+                           next_cursor=next_cursor)
 
 
 @flashcards_bp.route('/create', methods=['GET', 'POST'])
@@ -35,14 +44,8 @@ def create_flashcard():
         
         flashcard = Flashcard(question=question, answer=answer, deck_id=deck_id)
         db.session.add(flashcard)
-        
-        # Update deck card count
-        if deck_id:
-            deck = Deck.query.get(deck_id)
-            if deck:
-                deck.card_count = Flashcard.query.filter_by(deck_id=deck_id).count() + 1
-        
         db.session.commit()
+        response_cache.invalidate([flashcard.deck_id])
         flash('Flashcard created successfully!', 'success')
         return redirect(url_for('flashcards.list_flashcards'))
     
@@ -56,11 +59,13 @@ def edit_flashcard(id):
     flashcard = Flashcard.query.get_or_404(id)
     
     if request.method == 'POST':
+        previous_deck_id = flashcard.deck_id
         flashcard.question = request.form.get('question', '').strip()
         flashcard.answer = request.form.get('answer', '').strip()
         flashcard.deck_id = request.form.get('deck_id', type=int)
         
         db.session.commit()
+        response_cache.invalidate([previous_deck_id, flashcard.deck_id])
         flash('Flashcard updated successfully!', 'success')
         return redirect(url_for('flashcards.list_flashcards'))
     
@@ -73,16 +78,9 @@ def delete_flashcard(id):
     """Delete a flashcard."""
     flashcard = Flashcard.query.get_or_404(id)
     deck_id = flashcard.deck_id
-    
     db.session.delete(flashcard)
-    
-    # Update deck card count
-    if deck_id:
-        deck = Deck.query.get(deck_id)
-        if deck:
-            deck.card_count = max(0, Flashcard.query.filter_by(deck_id=deck_id).count() - 1)
-    
     db.session.commit()
+    response_cache.invalidate([deck_id])
     flash('Flashcard deleted successfully!', 'success')
     return redirect(url_for('flashcards.list_flashcards'))
 
@@ -132,6 +130,7 @@ def create_deck():
         
         db.session.add(deck)
         db.session.commit()
+        response_cache.invalidate([deck.id])
         
         deck_type = 'folder' if is_folder else 'deck'
         flash(f'{deck_type.capitalize()} "{name}" created successfully!', 'success')
@@ -156,10 +155,15 @@ def delete_deck(deck_id):
     """Delete a deck and all its flashcards and sub-decks."""
     deck = Deck.query.get_or_404(deck_id)
     parent_id = deck.parent_id
+    owner_id = deck.user_id
+    subtree_ids = [deck.id]
+    if deck.path:
+        subtree_ids = [row.id for row in db.session.query(Deck.id).filter(Deck.path.startswith(deck.path))]
     
     # Delete will cascade to flashcards and children
     db.session.delete(deck)
     db.session.commit()
+    response_cache.invalidate(subtree_ids, user_id=owner_id)
     flash('Deck deleted successfully!', 'success')
     
     # Return to parent or root
@@ -1,8 +1,12 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
 from datetime import datetime
+from sqlalchemy import func
+from flask_login import current_user
+from sqlalchemy.orm import joinedload
 from app import db
 from app.models import Flashcard, Deck, Student, TestResult
-import random
+from app.services.review_log import review_log_buffer
+from app.services.response_cache import response_cache
 import re
 
 study_bp = Blueprint('study', __name__)
@@ -13,9 +17,7 @@ def study_home():
     """Study mode selection page."""
     decks = Deck.query.all()
     total_cards = Flashcard.query.count()
-    due_cards = Flashcard.query.filter(
-        (Flashcard.next_review <= datetime.utcnow()) | (Flashcard.next_review.is_(None))
-    ).count()
+    due_cards = Flashcard.query.filter(Flashcard.due_filter()).count()
     
     return render_template('study/index.html', 
                          decks=decks, 
@@ -28,27 +30,30 @@ def study_session():
     """Start a study session with adaptive or random ordering."""
     deck_id = request.args.get('deck_id', type=int)
     adaptive = request.args.get('adaptive', 'true').lower() == 'true'  # Default to adaptive
+    limit = request.args.get('limit', type=int)
     
+    query = Flashcard.query.with_entities(Flashcard.id)
     if deck_id:
-        cards = Flashcard.query.filter_by(deck_id=deck_id).all()
-        deck = Deck.query.get(deck_id)
-    else:
-        cards = Flashcard.query.all()
-        deck = None
-    
-    if not cards:
-        flash('No flashcards available. Add some cards first!', 'warning')
-        return redirect(url_for('study.study_home'))
+        query = query.filter_by(deck_id=deck_id)
     
     # Use adaptive ordering (prioritize difficult cards) or random
     if adaptive:
-        # Sort by priority score (highest first) - struggling cards appear more
-        cards.sort(key=lambda card: card.priority_score, reverse=True)
+        # Highest stored priority first - struggling cards appear more
+        query = query.order_by(Flashcard.priority.desc())
     else:
-        random.shuffle(cards)
+        query = query.order_by(func.random())
+    
+    if limit:
+        query = query.limit(limit)
+    
+    card_ids = [row.id for row in query]
+    
+    if not card_ids:
+        flash('No flashcards available. Add some cards first!', 'warning')
+        return redirect(url_for('study.study_home'))
     
     # Store card IDs in session
-    session['study_cards'] = [c.id for c in cards]
+    session['study_cards'] = card_ids
     session['study_index'] = 0
     session['study_correct'] = 0
     session['study_wrong'] = 0
@@ -93,8 +98,10 @@ def submit_answer():
     
     card = Flashcard.query.get(card_id)
     if card:
-        card.update_spaced_repetition(quality)
+        review = card.update_spaced_repetition(quality)
         db.session.commit()
+        response_cache.invalidate([card.deck_id])
+        review_log_buffer.add(review, user_id=current_user.id if current_user.is_authenticated else None)
         
         if quality >= 3:
             session['study_correct'] = session.get('study_correct', 0) + 1
@@ -244,6 +251,7 @@ def test_results():
         )
         db.session.add(test_result)
         db.session.commit()
+        response_cache.invalidate([deck_id])
     
     # Clear test session
     session.pop('test_cards', None)
@@ -264,5 +272,8 @@ def test_results():
 @study_bp.route('/reports')
 def reports():
     """View all test reports."""
-    test_results = TestResult.query.order_by(TestResult.completed_at.desc()).all()
+    test_results = TestResult.query.options(
+        joinedload(TestResult.student),
+        joinedload(TestResult.deck)
+    ).order_by(TestResult.completed_at.desc()).all()
     return render_template('study/reports.html', results=test_results)
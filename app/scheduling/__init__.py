@@ -0,0 +1,44 @@
+"""Pluggable spaced repetition schedulers."""
+
+from app.scheduling.base import Scheduler
+from app.scheduling.sm2 import SM2Scheduler
+from app.scheduling.fsrs import FSRSScheduler, quality_to_grade
+
+SCHEDULERS = {
+    SM2Scheduler.name: SM2Scheduler,
+    FSRSScheduler.name: FSRSScheduler
+}
+
+DEFAULT_SCHEDULER = SM2Scheduler.name
+
+
+def get_scheduler(name=None, params=None, desired_retention=0.9):
+    """Instantiate a scheduler by name (default SM-2)."""
+    name = name or DEFAULT_SCHEDULER
+    if name not in SCHEDULERS:
+        raise ValueError(f'Unknown scheduler "{name}". Choose from: {", ".join(SCHEDULERS)}')
+    if name == FSRSScheduler.name:
+        return FSRSScheduler(params, desired_retention)
+    return SCHEDULERS[name]()
+
+
+def scheduler_for_card(card):
+    """Resolve a card's scheduler: its deck's choice, else the deck owner's, else SM-2."""
+    deck = card.deck
+    owner = deck.owner if deck else None
+    name = (deck.scheduler if deck else None) or (owner.scheduler if owner else None)
+    if owner is not None:
+        return get_scheduler(name, owner.fsrs_params, owner.desired_retention or 0.9)
+    return get_scheduler(name)
+
+
+__all__ = [
+    'Scheduler',
+    'SM2Scheduler',
+    'FSRSScheduler',
+    'SCHEDULERS',
+    'DEFAULT_SCHEDULER',
+    'get_scheduler',
+    'scheduler_for_card',
+    'quality_to_grade'
+]
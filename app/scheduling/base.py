@@ -0,0 +1,20 @@
+"""Scheduler interface shared by all spaced repetition engines."""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+
+class Scheduler(ABC):
+    """
+    A spaced repetition engine.
+    
+    Flashcard.update_spaced_repetition bumps the review counters, then calls
+    review() to set the card's next interval (and any engine-specific
+    memory state), then dates the next review from interval_days.
+    """
+    
+    name = ''
+    
+    @abstractmethod
+    def review(self, card, quality: int, reviewed_at: datetime) -> None:
+        """Update the card's scheduling fields for an answer of `quality` (0-5)."""
@@ -0,0 +1,107 @@
+"""FSRS-style memory model scheduler."""
+
+import math
+from datetime import datetime
+from typing import Optional, Sequence
+from app.scheduling.base import Scheduler
+
+# Forgetting curve R(t, S) = (1 + FACTOR * t / S) ** DECAY, so R(S, S) = 0.9
+DECAY = -0.5
+FACTOR = 19 / 81
+
+# FSRS-4.5 reference weights
+DEFAULT_PARAMS = (
+    0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031, 1.6474,
+    0.1367, 1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755
+)
+
+# Bounds the optimizer keeps each weight inside
+PARAM_BOUNDS = (
+    (0.01, 100), (0.01, 100), (0.01, 100), (0.01, 100), (1, 10), (0.1, 5), (0.1, 5), (0, 0.75),
+    (0, 4.5), (0, 0.8), (0.01, 3.5), (0.1, 5), (0.01, 0.25), (0.01, 0.9), (0, 4), (0, 1), (1, 6)
+)
+
+MAX_INTERVAL = 36500
+
+
+def quality_to_grade(quality: int) -> int:
+    """Map the app's 0-5 quality scale onto FSRS grades 1 (again) to 4 (easy)."""
+    if quality <= 2:
+        return 1
+    return min(quality - 1, 4)
+
+
+def retrievability(elapsed_days: float, stability: float) -> float:
+    """Probability of recall after `elapsed_days` for a memory of `stability`."""
+    return (1 + FACTOR * elapsed_days / stability) ** DECAY
+
+
+class FSRSScheduler(Scheduler):
+    """
+    Two-component memory model (stability, difficulty) in the style of FSRS-4.5.
+    
+    Intervals are chosen so predicted recall at the next review equals
+    desired_retention. Cards coming from SM-2 are seeded from their current
+    interval and ease factor on their first FSRS review.
+    """
+    
+    name = 'fsrs'
+    
+    def __init__(self, params: Optional[Sequence[float]] = None, desired_retention: float = 0.9):
+        self.w = list(params or DEFAULT_PARAMS)
+        self.desired_retention = desired_retention
+    
+    def review(self, card, quality: int, reviewed_at: datetime) -> None:
+        grade = quality_to_grade(quality)
+        
+        if card.stability is None:
+            if card.times_reviewed <= 1 or not card.last_reviewed:
+                card.stability = self.initial_stability(grade)
+                card.memory_difficulty = self.initial_difficulty(grade)
+                card.interval_days = self.next_interval(card.stability)
+                return
+            # Carry over an SM-2 schedule: interval ~ stability at 90% retention
+            card.stability = max(float(card.interval_days or 1), 0.1)
+            card.memory_difficulty = min(max(10 - (card.ease_factor - 1.3) * 4, 1), 10)
+        
+        elapsed = max((reviewed_at - card.last_reviewed).total_seconds() / 86400, 0) if card.last_reviewed else 0
+        recall = retrievability(elapsed, card.stability)
+        
+        if grade == 1:
+            card.stability = self.forget_stability(card.memory_difficulty, card.stability, recall)
+        else:
+            card.stability = self.recall_stability(card.memory_difficulty, card.stability, recall, grade)
+        card.memory_difficulty = self.next_difficulty(card.memory_difficulty, grade)
+        card.interval_days = self.next_interval(card.stability)
+    
+    def initial_stability(self, grade: int) -> float:
+        return max(self.w[grade - 1], 0.1)
+    
+    def initial_difficulty(self, grade: int) -> float:
+        return min(max(self.w[4] - (grade - 3) * self.w[5], 1), 10)
+    
+    def next_difficulty(self, difficulty: float, grade: int) -> float:
+        shifted = difficulty - self.w[6] * (grade - 3)
+        # Mean reversion towards the difficulty of a "good" first answer
+        reverted = self.w[7] * self.initial_difficulty(3) + (1 - self.w[7]) * shifted
+        return min(max(reverted, 1), 10)
+    
+    def recall_stability(self, difficulty: float, stability: float, recall: float, grade: int) -> float:
+        hard_penalty = self.w[15] if grade == 2 else 1
+        easy_bonus = self.w[16] if grade == 4 else 1
+        growth = (
+            math.exp(self.w[8]) * (11 - difficulty) * stability ** -self.w[9]
+            * (math.exp((1 - recall) * self.w[10]) - 1) * hard_penalty * easy_bonus
+        )
+        return stability * (1 + growth)
+    
+    def forget_stability(self, difficulty: float, stability: float, recall: float) -> float:
+        new_stability = (
+            self.w[11] * difficulty ** -self.w[12] * ((stability + 1) ** self.w[13] - 1)
+            * math.exp((1 - recall) * self.w[14])
+        )
+        return max(min(new_stability, stability), 0.1)
+    
+    def next_interval(self, stability: float) -> int:
+        days = stability / FACTOR * (self.desired_retention ** (1 / DECAY) - 1)
+        return int(min(max(round(days), 1), MAX_INTERVAL))
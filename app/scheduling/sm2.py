@@ -0,0 +1,27 @@
+"""SM-2 scheduler (the original FlashMaster algorithm)."""
+
+from datetime import datetime
+from app.scheduling.base import Scheduler
+
+
+class SM2Scheduler(Scheduler):
+    """Classic SM-2: ease factor plus 1 / 6 / interval x ease progression."""
+    
+    name = 'sm2'
+    
+    def review(self, card, quality: int, reviewed_at: datetime) -> None:
+        if quality >= 3:
+            # Calculate new ease factor
+            card.ease_factor = max(1.3, card.ease_factor + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)))
+            
+            # Calculate new interval
+            if card.times_reviewed == 1:
+                card.interval_days = 1
+            elif card.times_reviewed == 2:
+                card.interval_days = 6
+            else:
+                card.interval_days = round(card.interval_days * card.ease_factor)
+        else:
+            # Reset on failure
+            card.interval_days = 1
+            card.ease_factor = max(1.3, card.ease_factor - 0.2)
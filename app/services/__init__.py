@@ -2,5 +2,15 @@
 
 from app.services.ai_service import FlashcardGenerator
 from app.services.evaluation_service import AnswerEvaluator
+from app.services.review_log import ReviewLogBuffer, review_log_buffer
+from app.services.rescheduler import BulkRescheduler
+from app.services.response_cache import ResponseCache, response_cache
+from app.services.exporter import FlashcardExporter
+from app.services.importer import FlashcardImporter
+from app.services.identity_cache import IdentityCache, identity_cache
+from app.services.generation_cache import GenerationCache, generation_cache, evaluation_cache
 
-__all__ = ['FlashcardGenerator', 'AnswerEvaluator']
+__all__ = ['FlashcardGenerator', 'AnswerEvaluator', 'ReviewLogBuffer', 'review_log_buffer', 'BulkRescheduler',
+           'ResponseCache', 'response_cache', 'FlashcardExporter',
+           'FlashcardImporter', 'IdentityCache', 'identity_cache',
+           'GenerationCache', 'generation_cache', 'evaluation_cache']
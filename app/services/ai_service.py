@@ -6,11 +6,21 @@ import os
 from typing import List, Dict, Optional
 from groq import Groq
 from flask import current_app
+from app.services.generation_cache import generation_cache, normalize_text
 
 
 class FlashcardGenerator:
     """Generate flashcards from text using Groq API with Llama."""
     
+    MODEL = 'llama-3.3-70b-versatile'
+    
+    # Part of every generation cache key: bump when _build_generation_prompt,
+    # the system message or _parse_response change what a request produces
+    PROMPT_VERSION = 1
+    
+    # Characters of source text included in the prompt
+    SOURCE_LIMIT = 6000
+    
     CARD_TYPES = {
         'qa': 'Question and Answer',
         'mcq': 'Multiple Choice Question',
@@ -24,7 +34,7 @@ class FlashcardGenerator:
         'advanced': 'Advanced - Analysis and synthesis',
         'expert': 'Expert - Evaluation and complex problem-solving'
     }
-
+    
     def __init__(self, api_key: Optional[str] = None):
         """Initialize the generator with API key."""
         self.api_key = api_key or current_app.config.get('GROQ_API_KEY') or os.environ.get('GROQ_API_KEY')
@@ -60,11 +70,24 @@ class FlashcardGenerator:
         if not text or len(text.strip()) < 50:
             raise ValueError("Source text must be at least 50 characters")
         
+        cache_key = generation_cache.key(
+            model=self.MODEL,
+            prompt_version=self.PROMPT_VERSION,
+            text=normalize_text(text[:self.SOURCE_LIMIT]),
+            card_type=card_type,
+            difficulty=difficulty,
+            quantity=quantity,
+            focus_area=focus_area
+        )
+        cached = generation_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         prompt = self._build_generation_prompt(text, card_type, difficulty, quantity, focus_area)
         
         try:
             response = self.client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
+                model=self.MODEL,
                 messages=[
                     {"role": "system", "content": "You are an expert educational content creator. Always respond with valid JSON only, no markdown formatting."},
                     {"role": "user", "content": prompt}
@@ -72,8 +95,10 @@ class FlashcardGenerator:
                 temperature=0.7,
                 max_tokens=4000
             )
-            flashcards = self._parse_response(response.choices[0].message.content, card_type)
-            return flashcards[:quantity]
+            flashcards = self._parse_response(response.choices[0].message.content, card_type)[:quantity]
+            if flashcards:
+                generation_cache.set(cache_key, flashcards)
+            return flashcards
         except Exception as e:
             current_app.logger.error(f"Flashcard generation failed: {e}")
             raise RuntimeError(f"Failed to generate flashcards: {str(e)}")
@@ -148,7 +173,7 @@ For MCQ cards:
 Return ONLY a valid JSON array of flashcard objects. No markdown, no explanation, just the JSON array.
 
 **Source Text:**
-{text[:6000]}
+{text[:self.SOURCE_LIMIT]}
 
 Generate the JSON array now:"""
         
@@ -228,10 +253,10 @@ User Feedback: {feedback}
 
 Return the improved flashcard as a JSON object with the same structure.
 Only return the JSON object, no other text."""
-
+        
         try:
             response = self.client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
+                model=self.MODEL,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.7,
                 max_tokens=500
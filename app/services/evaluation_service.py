@@ -3,10 +3,31 @@
 import json
 import re
 import os
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from typing import Optional, Dict, List
 from groq import Groq
 from flask import current_app
+from app.services.generation_cache import evaluation_cache, normalize_text
+
+STOP_WORDS = {'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 
+              'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
+              'would', 'could', 'should', 'may', 'might', 'must', 'shall',
+              'to', 'of', 'in', 'for', 'on', 'with', 'at', 'by', 'from',
+              'as', 'into', 'through', 'during', 'before', 'after', 'above',
+              'below', 'between', 'under', 'again', 'further', 'then', 'once',
+              'and', 'but', 'or', 'nor', 'so', 'yet', 'both', 'either', 'neither',
+              'not', 'only', 'own', 'same', 'than', 'too', 'very', 'just'}
+
+
+def normalize_answer(answer: str) -> str:
+    """
+    Canonical form of a free-text answer for the evaluation cache.
+    
+    Only case and whitespace are normalized. Punctuation, signs, operators
+    and short words can all carry the meaning ("-2" vs "2", "2/3" vs "2*3",
+    "before" vs "after"), so they stay in the key.
+    """
+    return normalize_text(answer).casefold()
 
 
 @dataclass
@@ -26,6 +47,12 @@ class AnswerEvaluator:
     CORRECT_THRESHOLD = 0.7  # Score above this is considered correct
     PARTIAL_THRESHOLD = 0.4  # Score above this gets partial credit
     
+    MODEL = 'llama-3.3-70b-versatile'
+    
+    # Part of every evaluation cache key: bump when the _ai_evaluate prompt
+    # or its parsing change
+    PROMPT_VERSION = 1
+    
     def __init__(self, api_key: Optional[str] = None):
         """Initialize the evaluator with API key."""
         self.api_key = api_key or current_app.config.get('GROQ_API_KEY') or os.environ.get('GROQ_API_KEY')
@@ -70,16 +97,35 @@ class AnswerEvaluator:
                 highlights={'correct': [student_answer], 'missing': []}
             )
         
-        # Use AI for semantic evaluation
+        # Use AI for semantic evaluation, reusing verdicts on equivalent answers
         if self.client:
+            cache_key = self._cache_key(question, expected_answer, student_answer, card_type)
+            cached = evaluation_cache.get(cache_key)
+            if cached is not None:
+                return EvaluationResult(**dict(cached, model_answer=expected_answer))
+            
             try:
-                return self._ai_evaluate(question, expected_answer, student_answer)
+                result = self._ai_evaluate(question, expected_answer, student_answer)
             except Exception as e:
                 current_app.logger.error(f"AI evaluation failed: {e}")
                 return self._simple_evaluate(expected_answer, student_answer)
+            
+            evaluation_cache.set(cache_key, asdict(result))
+            return result
         else:
             return self._simple_evaluate(expected_answer, student_answer)
     
+    def _cache_key(self, question: str, expected_answer: str, student_answer: str, card_type: str) -> str:
+        """Evaluation cache key: the card's content, not its id, so edited cards miss."""
+        return evaluation_cache.key(
+            model=self.MODEL,
+            prompt_version=self.PROMPT_VERSION,
+            card_type=card_type,
+            question=normalize_text(question),
+            expected_answer=normalize_text(expected_answer),
+            answer=normalize_answer(student_answer)
+        )
+    
     def _evaluate_mcq(self, expected: str, student: str) -> EvaluationResult:
         """Evaluate MCQ answer (letter matching)."""
         expected_letter = expected.strip().upper()[0] if expected else ''
@@ -128,9 +174,9 @@ Evaluate and respond with a JSON object:
 Scoring: 0.9-1.0=excellent, 0.7-0.9=mostly correct, 0.4-0.7=partial, 0.0-0.4=incorrect
 
 Return ONLY the JSON object."""
-
+        
         response = self.client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+            model=self.MODEL,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.3,
             max_tokens=500
@@ -154,26 +200,17 @@ Return ONLY the JSON object."""
                     'missing': result.get('missing_concepts', [])
                 }
             )
-        except (json.JSONDecodeError, KeyError, TypeError) as e:
-            current_app.logger.error(f"Failed to parse evaluation response: {e}")
-            return self._simple_evaluate(expected_answer, student_answer)
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            # evaluate() falls back to keyword matching and caches nothing
+            raise ValueError(f"Failed to parse evaluation response: {e}")
     
     def _simple_evaluate(self, expected: str, student: str) -> EvaluationResult:
         """Simple keyword-based evaluation as fallback."""
         expected_words = set(expected.lower().split())
         student_words = set(student.lower().split())
         
-        stop_words = {'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 
-                      'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
-                      'would', 'could', 'should', 'may', 'might', 'must', 'shall',
-                      'to', 'of', 'in', 'for', 'on', 'with', 'at', 'by', 'from',
-                      'as', 'into', 'through', 'during', 'before', 'after', 'above',
-                      'below', 'between', 'under', 'again', 'further', 'then', 'once',
-                      'and', 'but', 'or', 'nor', 'so', 'yet', 'both', 'either', 'neither',
-                      'not', 'only', 'own', 'same', 'than', 'too', 'very', 'just'}
-        
-        expected_keywords = expected_words - stop_words
-        student_keywords = student_words - stop_words
+        expected_keywords = expected_words - STOP_WORDS
+        student_keywords = student_words - STOP_WORDS
         
         if not expected_keywords:
             expected_keywords = expected_words
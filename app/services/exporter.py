@@ -0,0 +1,130 @@
+"""Streaming export of flashcards as NDJSON or CSV."""
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Iterator, List, Optional
+from sqlalchemy import select
+from app import db
+from app.models import Deck, Flashcard
+
+EXPORT_COLUMNS = (
+    'id', 'deck_id', 'deck_name', 'question', 'answer', 'difficulty',
+    'times_reviewed', 'times_correct', 'ease_factor', 'interval_days',
+    'next_review', 'last_reviewed', 'created_at'
+)
+
+
+class FlashcardExporter:
+    """
+    Stream flashcards from a server-side cursor in fixed-size batches.
+    
+    Rows are fetched `batch_size` at a time (yield_per) and written to the
+    output in chunks of the same size, so memory stays flat regardless of
+    how many cards are exported. Optionally gzip-compresses the stream.
+    Passing `user_id` limits the export to that user's cards.
+    """
+    
+    FORMATS = ('ndjson', 'csv')
+    
+    def __init__(self, deck_id: Optional[int] = None, include_subdecks: bool = False,
+                 fmt: str = 'ndjson', compress: bool = False, batch_size: int = 1000,
+                 user_id: Optional[int] = None):
+        if fmt not in self.FORMATS:
+            raise ValueError(f'Format must be one of: {", ".join(self.FORMATS)}')
+        self.user_id = user_id
+        self.deck_id = deck_id
+        self.include_subdecks = include_subdecks
+        self.fmt = fmt
+        self.compress = compress
+        self.batch_size = batch_size
+    
+    @property
+    def mimetype(self) -> str:
+        if self.compress:
+            return 'application/gzip'
+        return 'application/x-ndjson' if self.fmt == 'ndjson' else 'text/csv'
+    
+    @property
+    def filename(self) -> str:
+        name = f'deck-{self.deck_id}' if self.deck_id else 'flashcards'
+        return f'{name}.{self.fmt}' + ('.gz' if self.compress else '')
+    
+    def deck_ids(self) -> Optional[List[int]]:
+        """Ids of the exported decks, or None when exporting every card."""
+        if not self.deck_id:
+            return None
+        if not self.include_subdecks:
+            return [self.deck_id]
+        deck = db.session.get(Deck, self.deck_id)
+        if not deck or not deck.path:
+            return [self.deck_id]
+        return [row.id for row in db.session.query(Deck.id).filter(Deck.path.startswith(deck.path))]
+    
+    def stream(self) -> Iterator[bytes]:
+        """Yield the encoded (and optionally compressed) export in chunks."""
+        chunks = self._ndjson_chunks() if self.fmt == 'ndjson' else self._csv_chunks()
+        if not self.compress:
+            yield from chunks
+            return
+        
+        # wbits=31 writes a gzip container rather than a raw zlib stream
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+    
+    def _batches(self) -> Iterator[list]:
+        cards = Flashcard.__table__
+        decks = Deck.__table__
+        query = (
+            select(
+                cards.c.id, cards.c.deck_id, decks.c.name.label('deck_name'), cards.c.question,
+                cards.c.answer, cards.c.difficulty, cards.c.times_reviewed, cards.c.times_correct,
+                cards.c.ease_factor, cards.c.interval_days, cards.c.next_review, cards.c.last_reviewed,
+                cards.c.created_at
+            )
+            .select_from(cards.outerjoin(decks, decks.c.id == cards.c.deck_id))
+            .order_by(cards.c.id)
+        )
+        if self.user_id is not None:
+            query = query.where(cards.c.user_id == self.user_id)
+        deck_ids = self.deck_ids()
+        if deck_ids is not None:
+            query = query.where(cards.c.deck_id.in_(deck_ids))
+        
+        # yield_per streams from a server-side cursor where the driver supports one
+        result = db.session.execute(query.execution_options(yield_per=self.batch_size))
+        for partition in result.partitions():
+            yield [self._row_dict(row) for row in partition]
+    
+    @staticmethod
+    def _row_dict(row) -> dict:
+        data = dict(row._mapping)
+        # Never-reviewed cards carry the NEW_CARD_DUE sentinel; export them as unscheduled
+        if data['next_review'] is not None and data['next_review'] <= Flashcard.NEW_CARD_DUE:
+            data['next_review'] = None
+        for key in ('next_review', 'last_reviewed', 'created_at'):
+            if isinstance(data[key], datetime):
+                data[key] = data[key].isoformat()
+        return data
+    
+    def _ndjson_chunks(self) -> Iterator[bytes]:
+        for batch in self._batches():
+            yield ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in batch).encode()
+    
+    def _csv_chunks(self) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        for batch in self._batches():
+            writer.writerows(batch)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
@@ -0,0 +1,114 @@
+"""Content-addressed cache for LLM completions."""
+
+import hashlib
+import json
+import os
+import threading
+import unicodedata
+from typing import Any, Dict, Optional
+
+from app.services.response_cache import LRUBackend, SQLiteBackend
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of source text for hashing: NFC, whitespace runs collapsed."""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+class GenerationCache:
+    """
+    Two-tier cache of LLM results keyed by a hash of everything that shaped them.
+    
+    Lookups try an in-process LRU first, then a SQLite file shared by every
+    worker on the host (promoting hits into the LRU). Keys are content
+    hashes, so entries never go stale; the TTL and entry bounds only limit
+    how much is kept.
+    """
+    
+    BACKENDS = ('sqlite', 'lru', 'none')
+    
+    def __init__(self, name: str, ttl: float = 7 * 24 * 3600, max_entries: int = 128):
+        self.name = name
+        self.ttl = ttl
+        self.enabled = True
+        self.memory = LRUBackend(max_entries=max_entries)
+        self.disk: Optional[SQLiteBackend] = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+    
+    def init_app(self, app, prefix: str):
+        """
+        Configure from `{prefix}_BACKEND`, `_TTL`, `_MAX_ENTRIES`, `_DISK_MAX_ENTRIES` and `_PATH`.
+        
+        The sqlite backend keeps the LRU in front of the shared file; lru is
+        per worker only; none disables caching.
+        """
+        kind = app.config.get(f'{prefix}_BACKEND', 'sqlite')
+        if kind not in self.BACKENDS:
+            raise ValueError(f'{prefix}_BACKEND must be one of {", ".join(self.BACKENDS)}')
+        
+        self.ttl = app.config.get(f'{prefix}_TTL', self.ttl)
+        self.enabled = kind != 'none'
+        self.memory = LRUBackend(max_entries=app.config.get(f'{prefix}_MAX_ENTRIES', 128))
+        self.disk = None
+        
+        if kind == 'sqlite':
+            path = app.config.get(f'{prefix}_PATH') or os.path.join(app.instance_path, f'{self.name}_cache.db')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.disk = SQLiteBackend(path, max_entries=app.config.get(f'{prefix}_DISK_MAX_ENTRIES', 5000))
+    
+    @staticmethod
+    def key(**parts) -> str:
+        """Hash keyword parts (text, parameters, model, prompt version) into a cache key."""
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Cached JSON value for `key`, or None."""
+        if not self.enabled:
+            return None
+        
+        body = self.memory.get(key)
+        if body is None and self.disk is not None:
+            body = self.disk.get(key)
+            if body is not None:
+                self.memory.set(key, body, self.ttl)
+        
+        self._count(hit=body is not None)
+        return json.loads(body) if body is not None else None
+    
+    def set(self, key: str, value: Any):
+        if not self.enabled:
+            return
+        body = json.dumps(value).encode()
+        self.memory.set(key, body, self.ttl)
+        if self.disk is not None:
+            self.disk.set(key, body, self.ttl)
+    
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+    
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+    
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'backend': ('sqlite' if self.disk is not None else 'lru') if self.enabled else None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 2) if lookups else 0,
+            'memory_entries': self.memory.size(),
+            'disk_entries': self.disk.size() if self.disk is not None else 0
+        }
+
+
+generation_cache = GenerationCache('generation')
+evaluation_cache = GenerationCache('evaluation', max_entries=2048)
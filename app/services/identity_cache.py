@@ -0,0 +1,73 @@
+"""Short-lived cache of user identity payloads (user_to_dict) across requests."""
+
+import json
+from typing import Optional
+from flask import g
+from app import db
+from app.auth import user_to_dict
+from app.models import User
+from app.services.response_cache import LRUBackend, profile_scope, response_cache
+
+
+class IdentityCache:
+    """
+    Serve user_to_dict payloads from a per-request memo, then a TTL'd LRU.
+    
+    Entries are serialized JSON keyed by user id and the version of the
+    user's profile scope, which profile edits, password changes and logins
+    bump. The version counters live in the response cache backend: with the
+    (default) sqlite backend every worker on the host sees the bump and
+    drops its entry at once; with RESPONSE_CACHE_BACKEND=lru only the worker
+    that handled the change does, and the others serve the old payload for
+    up to IDENTITY_CACHE_TTL.
+    """
+    
+    def __init__(self, max_entries: int = 1024, ttl: float = 30):
+        self.ttl = ttl
+        self.backend = LRUBackend(max_entries=max_entries)
+    
+    def init_app(self, app):
+        """Read IDENTITY_CACHE_TTL and IDENTITY_CACHE_MAX_ENTRIES."""
+        self.ttl = app.config.get('IDENTITY_CACHE_TTL', self.ttl)
+        self.backend = LRUBackend(max_entries=app.config.get('IDENTITY_CACHE_MAX_ENTRIES', 1024))
+    
+    def user_dict(self, user_id) -> Optional[dict]:
+        """user_to_dict(user) for `user_id`, or None if there is no such user."""
+        if user_id is None:
+            return None
+        memo = g.setdefault('_identity_memo', {})
+        if user_id in memo:
+            return memo[user_id]
+        
+        key = self._key(user_id)
+        cached = self.backend.get(key) if self.ttl > 0 else None
+        if cached is not None:
+            data = json.loads(cached)
+        else:
+            user = db.session.get(User, user_id)
+            data = user_to_dict(user) if user else None
+            if data is not None and self.ttl > 0:
+                self.backend.set(key, json.dumps(data).encode(), self.ttl)
+        
+        memo[user_id] = data
+        return data
+    
+    def get_user(self, user_id) -> Optional[User]:
+        """The User row for `user_id`, loaded at most once per request."""
+        memo = g.setdefault('_identity_users', {})
+        if user_id not in memo:
+            memo[user_id] = db.session.get(User, user_id)
+        return memo[user_id]
+    
+    def invalidate(self, user_id):
+        """Retire the user's cached identity and their user-scoped responses (see the class docstring for which workers)."""
+        response_cache.invalidate_user(user_id)
+        g.get('_identity_memo', {}).pop(user_id, None)
+        g.get('_identity_users', {}).pop(user_id, None)
+    
+    def _key(self, user_id) -> str:
+        version, = response_cache.backend.versions([profile_scope(user_id)])
+        return f'identity:{user_id}:{version}'
+
+
+identity_cache = IdentityCache()
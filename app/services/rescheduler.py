@@ -0,0 +1,137 @@
+"""Vectorized bulk rescheduling of whole decks."""
+
+from datetime import datetime
+from typing import List
+import numpy as np
+from sqlalchemy import bindparam, func, select
+from app import db
+from app.models import Deck, DeckStats, Flashcard, User
+from app.scheduling import DEFAULT_SCHEDULER, FSRSScheduler
+from app.scheduling.fsrs import DECAY, FACTOR
+
+DAY = np.timedelta64(1, 'D').astype('timedelta64[us]')
+
+
+class BulkRescheduler:
+    """
+    Reschedule every reviewed card of a deck in one pass.
+    
+    Scheduling state is pulled into NumPy arrays, new intervals and due
+    dates are computed vectorized, and the results are written back with a
+    single executemany UPDATE. New (never-reviewed) cards are left alone.
+    """
+    
+    def __init__(self, deck_id: int, include_subdecks: bool = False):
+        self.deck_id = deck_id
+        self.include_subdecks = include_subdecks
+    
+    def shift(self, days: int) -> int:
+        """Move every due date by `days` (positive postpones, e.g. vacation mode)."""
+        state = self._load()
+        if not len(state['ids']):
+            return 0
+        due = state['next_review'] + days * DAY
+        intervals = np.maximum(state['interval_days'] + days, 1)
+        return self._write(state['ids'], intervals, due)
+    
+    def compress_to(self, exam_date: datetime) -> int:
+        """Scale the schedule so every card is due on or before `exam_date`, keeping order."""
+        now = np.datetime64(datetime.utcnow(), 'us')
+        exam = np.datetime64(exam_date, 'us')
+        if exam <= now:
+            raise ValueError('Exam date must be in the future')
+        
+        state = self._load()
+        due = state['next_review']
+        if not (due > exam).any():
+            return 0
+        
+        # Scale every future due date by the same factor so relative order is kept
+        upcoming = due > now
+        remaining = (due[upcoming] - now).astype(np.int64)
+        factor = (exam - now).astype(np.int64) / remaining.max()
+        due = now + np.rint(remaining * factor).astype('timedelta64[us]')
+        
+        elapsed = (due - state['last_reviewed'][upcoming]).astype(np.int64) / DAY.astype(np.int64)
+        intervals = np.maximum(np.ceil(elapsed), 1).astype(np.int64)
+        return self._write(state['ids'][upcoming], intervals, due)
+    
+    def recompute(self, interval_modifier: float = 1.0, max_interval: int = 36500) -> int:
+        """
+        Re-derive intervals with new parameters and re-date from each card's last review.
+        
+        Each card follows its own scheduler (deck's choice, else the owner's):
+        FSRS cards get the interval at which recall falls to the owner's
+        desired retention, from their stored stability; SM-2 cards, and FSRS
+        cards not yet reviewed under FSRS, use the SM-2 progression.
+        """
+        state = self._load()
+        if not len(state['ids']):
+            return 0
+        reviewed = state['times_reviewed']
+        intervals = np.select(
+            [reviewed <= 1, reviewed == 2],
+            [1, 6],
+            np.rint(state['interval_days'] * interval_modifier)
+        )
+        
+        fsrs = state['fsrs'] & ~np.isnan(state['stability'])
+        if fsrs.any():
+            fsrs_days = state['stability'] / FACTOR * (state['desired_retention'] ** (1 / DECAY) - 1)
+            intervals = np.where(fsrs, np.rint(fsrs_days * interval_modifier), intervals)
+        intervals = np.clip(intervals, 1, max_interval).astype(np.int64)
+        due = state['last_reviewed'] + intervals * DAY
+        return self._write(state['ids'], intervals, due)
+    
+    def deck_ids(self) -> List[int]:
+        """Ids of the decks this rescheduler touches."""
+        if not self.include_subdecks:
+            return [self.deck_id]
+        deck = db.session.get(Deck, self.deck_id)
+        if not deck or not deck.path:
+            return [self.deck_id]
+        return [row.id for row in db.session.query(Deck.id).filter(Deck.path.startswith(deck.path))]
+    
+    def _load(self):
+        cards, decks, users = Flashcard.__table__, Deck.__table__, User.__table__
+        now = datetime.utcnow()
+        rows = db.session.execute(
+            select(
+                cards.c.id, cards.c.ease_factor, cards.c.interval_days, cards.c.times_reviewed,
+                cards.c.next_review, cards.c.last_reviewed, cards.c.stability,
+                func.coalesce(decks.c.scheduler, users.c.scheduler, DEFAULT_SCHEDULER),
+                func.coalesce(users.c.desired_retention, 0.9)
+            )
+            .select_from(cards.join(decks, decks.c.id == cards.c.deck_id).outerjoin(users, users.c.id == decks.c.user_id))
+            .where(cards.c.deck_id.in_(self.deck_ids()))
+            .where(cards.c.times_reviewed > 0)
+        ).all()
+        columns = list(zip(*rows)) if rows else [()] * 9
+        return {
+            'ids': np.array(columns[0], dtype=np.int64),
+            'ease_factor': np.array(columns[1], dtype=np.float64),
+            'interval_days': np.array(columns[2], dtype=np.int64),
+            'times_reviewed': np.array(columns[3], dtype=np.int64),
+            'next_review': np.array(columns[4], dtype='datetime64[us]'),
+            'last_reviewed': np.array([r or now for r in columns[5]], dtype='datetime64[us]'),
+            'stability': np.array([np.nan if s is None else s for s in columns[6]], dtype=np.float64),
+            'fsrs': np.array([name == FSRSScheduler.name for name in columns[7]], dtype=bool),
+            'desired_retention': np.array(columns[8], dtype=np.float64)
+        }
+    
+    def _write(self, ids: np.ndarray, intervals: np.ndarray, due: np.ndarray) -> int:
+        if not len(ids):
+            return 0
+        cards = Flashcard.__table__
+        db.session.execute(
+            cards.update()
+            .where(cards.c.id == bindparam('card_id'))
+            .values(interval_days=bindparam('new_interval'), next_review=bindparam('new_due')),
+            [
+                {'card_id': card_id, 'new_interval': interval, 'new_due': due_at}
+                for card_id, interval, due_at in zip(ids.tolist(), intervals.tolist(), due.tolist())
+            ]
+        )
+        # Mastered counts depend on interval_days, which bypassed the ORM listeners
+        DeckStats.refresh(self.deck_ids())
+        return len(ids)
@@ -0,0 +1,283 @@
+"""Versioned response cache for aggregate read endpoints."""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Dict, Iterable, Optional, Tuple
+from flask import Response, request
+
+from app.auth import get_current_user_id
+
+# Scope bumped by every card, deck or test write. Only shared (per_user=False)
+# views depend on it; per-user views depend on their user's scope instead,
+# so one user's writes never evict another user's entries.
+ALL_SCOPE = 'all'
+
+
+def deck_scope(deck_id) -> str:
+    return f'deck:{deck_id}'
+
+
+def user_scope(user_id) -> str:
+    return f'user:{user_id}'
+
+
+def profile_scope(user_id) -> str:
+    """Bumped only by profile and login changes; keys the identity cache."""
+    return f'profile:{user_id}'
+
+
+class LRUBackend:
+    """In-process backend: a bounded OrderedDict per worker."""
+    
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Tuple[bytes, float]]' = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+    
+    def set(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def versions(self, scopes: Iterable[str]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._versions.get(scope, 0) for scope in scopes)
+    
+    def bump(self, scopes: Iterable[str]):
+        with self._lock:
+            for scope in scopes:
+                self._versions[scope] = self._versions.get(scope, 0) + 1
+    
+    def size(self) -> int:
+        return len(self._entries)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend:
+    """
+    Shared local backend: a SQLite file used by every worker on the host.
+    
+    Version counters live in the same file, so a write handled by one worker
+    invalidates the entries cached by all of them.
+    """
+    
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS entries '
+                '(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)'
+            )
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS versions '
+                '(scope TEXT PRIMARY KEY, version INTEGER NOT NULL)'
+            )
+    
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+    
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._connect().execute(
+            'SELECT value FROM entries WHERE key = ? AND expires >= ?', (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+    
+    def set(self, key: str, value: bytes, ttl: float):
+        connection = self._connect()
+        now = time.time()
+        connection.execute(
+            'INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)',
+            (key, sqlite3.Binary(value), now + ttl)
+        )
+        # Trim expired rows, then the soonest-expiring ones beyond the bound
+        connection.execute('DELETE FROM entries WHERE expires < ?', (now,))
+        connection.execute(
+            'DELETE FROM entries WHERE key IN '
+            '(SELECT key FROM entries ORDER BY expires DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        )
+    
+    def versions(self, scopes: Iterable[str]) -> Tuple[int, ...]:
+        scopes = list(scopes)
+        rows = dict(self._connect().execute(
+            f"SELECT scope, version FROM versions WHERE scope IN ({','.join('?' * len(scopes))})",
+            scopes
+        ).fetchall())
+        return tuple(rows.get(scope, 0) for scope in scopes)
+    
+    def bump(self, scopes: Iterable[str]):
+        connection = self._connect()
+        connection.executemany(
+            'INSERT INTO versions (scope, version) VALUES (?, 1) '
+            'ON CONFLICT(scope) DO UPDATE SET version = version + 1',
+            [(scope,) for scope in scopes]
+        )
+    
+    def size(self) -> int:
+        return self._connect().execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+    
+    def clear(self):
+        self._connect().execute('DELETE FROM entries')
+
+
+class ResponseCache:
+    """
+    Cache JSON responses of read endpoints, keyed by user, request and scope versions.
+    
+    Each cached view declares the scopes its data comes from (all decks, one
+    deck, the user's profile). Writes bump those scopes' version counters,
+    which changes the key of every dependent entry, so stale entries are never
+    read again and simply age out. Hits and misses are counted per worker.
+    """
+    
+    BACKENDS = ('lru', 'sqlite', 'none')
+    
+    def __init__(self, backend=None, ttl: float = 300):
+        self.backend = backend or LRUBackend()
+        self.ttl = ttl
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+    
+    def init_app(self, app):
+        """Pick the backend from RESPONSE_CACHE_BACKEND and related settings."""
+        kind = app.config.get('RESPONSE_CACHE_BACKEND', 'sqlite')
+        if kind not in self.BACKENDS:
+            raise ValueError(f'RESPONSE_CACHE_BACKEND must be one of {", ".join(self.BACKENDS)}')
+        
+        max_entries = app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 1024)
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', self.ttl)
+        self.enabled = kind != 'none'
+        
+        if kind == 'sqlite':
+            path = app.config.get('RESPONSE_CACHE_PATH') or os.path.join(app.instance_path, 'response_cache.db')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.backend = SQLiteBackend(path, max_entries=max_entries)
+        else:
+            self.backend = LRUBackend(max_entries=max_entries)
+    
+    def invalidate(self, deck_ids: Iterable = (), user_id=None):
+        """
+        Bump the scopes of the given decks and of the user who owns them.
+        
+        user_id: the owner whose data changed; looked up from the decks when
+        omitted (so pass it when the decks were just deleted)
+        """
+        deck_ids = {deck_id for deck_id in deck_ids if deck_id is not None}
+        owners = {user_id} if user_id is not None else self._owners(deck_ids)
+        scopes = [ALL_SCOPE]
+        scopes.extend(deck_scope(deck_id) for deck_id in deck_ids)
+        scopes.extend(user_scope(owner) for owner in owners if owner is not None)
+        self.backend.bump(scopes)
+    
+    @staticmethod
+    def _owners(deck_ids) -> set:
+        if not deck_ids:
+            return set()
+        from app import db
+        from app.models import Deck
+        
+        return set(db.session.execute(
+            db.select(Deck.user_id).where(Deck.id.in_(deck_ids)).distinct()
+        ).scalars())
+    
+    def invalidate_user(self, user_id):
+        """Bump only a user's scopes (profile and login changes)."""
+        self.backend.bump([user_scope(user_id), profile_scope(user_id)])
+    
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+    
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__ if self.enabled else None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 2) if lookups else 0,
+            'entries': self.backend.size()
+        }
+    
+    def cached(self, per_user: bool = True, deck_arg: Optional[str] = None):
+        """
+        Decorate a JSON view so successful responses are served from the cache.
+        
+        per_user: include the JWT user in the key and depend on that user's
+        scope (their card, deck, test and profile writes) instead of the
+        all-users scope
+        deck_arg: query argument that narrows the view to one deck; when given,
+        the entry depends on that deck's scope only
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return view(*args, **kwargs)
+                
+                deck_id = request.args.get(deck_arg, type=int) if deck_arg else None
+                user_id = get_current_user_id() if per_user else None
+                if deck_id:
+                    scopes = [deck_scope(deck_id)]
+                else:
+                    scopes = [user_scope(user_id) if per_user else ALL_SCOPE]
+                
+                versions = self.backend.versions(scopes)
+                query = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+                key = '|'.join([
+                    request.endpoint, query, str(user_id),
+                    ','.join(f'{scope}@{version}' for scope, version in zip(scopes, versions))
+                ])
+                
+                body = self.backend.get(key)
+                if body is not None:
+                    self._count(hit=True)
+                    response = Response(body, mimetype='application/json')
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+                
+                self._count(hit=False)
+                result = view(*args, **kwargs)
+                response = result if isinstance(result, Response) else None
+                if response is not None and response.status_code == 200 and response.is_json:
+                    self.backend.set(key, response.get_data(), self.ttl)
+                    response.headers['X-Cache'] = 'MISS'
+                return result
+            return wrapper
+        return decorator
+
+
+response_cache = ResponseCache()
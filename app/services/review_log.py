@@ -0,0 +1,141 @@
+"""Buffered writer for the append-only review log."""
+
+import atexit
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from flask import current_app
+from sqlalchemy.exc import DataError, IntegrityError
+from app import db
+from app.models import ReviewLog
+
+
+class ReviewLogBuffer:
+    """
+    Collect review records in memory and write them as multi-row INSERTs.
+    
+    A batch is written once it reaches REVIEW_LOG_BATCH_SIZE records, and a
+    background thread per worker writes records older than
+    REVIEW_LOG_FLUSH_SECONDS even when no further reviews arrive. Whatever
+    remains is written at interpreter exit. Each worker process keeps its
+    own buffer of at most REVIEW_LOG_MAX_BUFFER records.
+    """
+    
+    def __init__(self, batch_size: int = 50, max_age: float = 5.0, max_rows: int = 10000):
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self.max_rows = max_rows
+        self._rows: List[Dict] = []
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+        self._app = None
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_pid: Optional[int] = None
+    
+    def init_app(self, app):
+        """Read batch settings from config and flush on shutdown."""
+        self.batch_size = app.config.get('REVIEW_LOG_BATCH_SIZE', self.batch_size)
+        self.max_age = app.config.get('REVIEW_LOG_FLUSH_SECONDS', self.max_age)
+        self.max_rows = app.config.get('REVIEW_LOG_MAX_BUFFER', self.max_rows)
+        self._app = app
+        atexit.register(self._flush_at_exit)
+    
+    def __len__(self):
+        return len(self._rows)
+    
+    def add(self, record: Dict, user_id: Optional[int] = None):
+        """Queue one review record (as returned by update_spaced_repetition)."""
+        with self._lock:
+            if not self._rows:
+                self._oldest = time.monotonic()
+            self._rows.append(dict(record, user_id=user_id))
+            self._trim()
+            due = len(self._rows) >= self.batch_size
+        
+        self._ensure_flusher()
+        if due:
+            try:
+                self.flush()
+            except Exception as e:
+                current_app.logger.error(f"Review log flush failed: {e}")
+    
+    def flush(self) -> int:
+        """Write all buffered records now. Returns the number written."""
+        with self._lock:
+            rows, self._rows = self._rows, []
+            self._oldest = None
+        
+        if not rows:
+            return 0
+        
+        table = ReviewLog.__table__
+        try:
+            with db.engine.begin() as connection:
+                for start in range(0, len(rows), self.batch_size):
+                    connection.execute(table.insert().values(rows[start:start + self.batch_size]))
+            return len(rows)
+        except Exception as e:
+            current_app.logger.warning(f"Review log batch of {len(rows)} failed ({e}); retrying row by row")
+        
+        # One bad record (e.g. for a card deleted meanwhile) must not hold up the rest
+        written = 0
+        for index, row in enumerate(rows):
+            try:
+                with db.engine.begin() as connection:
+                    connection.execute(table.insert().values(row))
+                written += 1
+            except (IntegrityError, DataError) as e:
+                current_app.logger.error(
+                    f"Dropping review log record for card {row.get('flashcard_id')}: {e.orig}"
+                )
+            except Exception:
+                # Database unavailable: keep this and the remaining records for the next attempt
+                self._requeue(rows[index:])
+                raise
+        return written
+    
+    def _requeue(self, rows: List[Dict]):
+        with self._lock:
+            self._rows = rows + self._rows
+            self._oldest = time.monotonic()
+            self._trim()
+    
+    def _trim(self):
+        """Drop the oldest records beyond max_rows (caller holds the lock)."""
+        overflow = len(self._rows) - self.max_rows
+        if overflow > 0:
+            del self._rows[:overflow]
+            current_app.logger.error(f"Review log buffer full: dropped {overflow} oldest records")
+    
+    def _ensure_flusher(self):
+        """Start this process's background flush thread (again after a fork)."""
+        if self._app is None or self.max_age <= 0:
+            return
+        pid = os.getpid()
+        with self._lock:
+            if self._flusher_pid == pid and self._flusher.is_alive():
+                return
+            self._flusher_pid = pid
+            self._flusher = threading.Thread(target=self._run_flusher, name='review-log-flush', daemon=True)
+            self._flusher.start()
+    
+    def _run_flusher(self):
+        while True:
+            time.sleep(self.max_age / 2)
+            oldest = self._oldest
+            if oldest is None or time.monotonic() - oldest < self.max_age:
+                continue
+            with self._app.app_context():
+                try:
+                    self.flush()
+                except Exception as e:
+                    current_app.logger.error(f"Review log flush failed: {e}")
+    
+    def _flush_at_exit(self):
+        if self._rows and self._app is not None:
+            with self._app.app_context():
+                self.flush()
+
+
+review_log_buffer = ReviewLogBuffer()
@@ -0,0 +1,78 @@
+"""
+Benchmark saving AI-generated cards: per-card ORM objects vs Flashcard.bulk_insert.
+
+Runs against a throwaway SQLite database unless DATABASE_URL is set:
+
+    python benchmarks/bench_ai_save.py [--repeat 20]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SIZES = (10, 100, 1000)
+
+
+def orm_save(db, Flashcard, deck_id, cards):
+    """The previous path: one ORM object per card, flushed through the listeners."""
+    for card in cards:
+        db.session.add(Flashcard(deck_id=deck_id, **card))
+    db.session.commit()
+
+
+def bulk_save(db, Flashcard, deck_id, cards):
+    Flashcard.bulk_insert([dict(card, deck_id=deck_id) for card in cards])
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20, help='Saves per size and strategy.')
+    args = parser.parse_args()
+
+    if 'DATABASE_URL' not in os.environ:
+        handle, path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+
+    from sqlalchemy import event
+    from app import create_app, db
+    from app.models import Deck, Flashcard
+
+    app = create_app('production')
+    with app.app_context():
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: statements.append(1))
+
+        print(f'{"cards/save":>10} {"strategy":>8} {"ms/save":>9} {"cards/s":>10} {"stmts/save":>11}')
+        for size in SIZES:
+            cards = [
+                {'question': f'Question {i}?', 'answer': f'Answer {i}', 'difficulty': i % 5 + 1}
+                for i in range(size)
+            ]
+            for name, save in (('orm', orm_save), ('bulk', bulk_save)):
+                deck = Deck(name=f'bench-{name}-{size}')
+                db.session.add(deck)
+                db.session.commit()
+
+                statements.clear()
+                started = time.perf_counter()
+                for _ in range(args.repeat):
+                    save(db, Flashcard, deck.id, cards)
+                elapsed = time.perf_counter() - started
+
+                per_save = elapsed / args.repeat
+                print(f'{size:>10} {name:>8} {per_save * 1000:>9.2f} {size / per_save:>10.0f} '
+                      f'{len(statements) / args.repeat:>11.1f}')
+
+            db.session.refresh(deck)
+            expected = size * args.repeat
+            assert deck.card_count == expected, f'card_count {deck.card_count} != {expected}'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark concurrent SQLite writes: default settings vs the tuned engine profile.
+
+Writer processes answer cards (UPDATE a card + INSERT a review_log row per
+transaction) while reader processes run the dashboard aggregate, the way
+several gunicorn workers share one SQLite file. Each profile gets a fresh
+database file.
+    
+    python benchmarks/bench_sqlite_concurrency.py [--writers 4] [--readers 4] [--seconds 5]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CARDS = 5000
+
+WRITE_SQL = (
+    "UPDATE flashcards SET times_reviewed = times_reviewed + 1, times_correct = times_correct + 1, "
+    "interval_days = interval_days + 1, next_review = :due, updated_at = :now WHERE id = :card_id"
+)
+LOG_SQL = (
+    "INSERT INTO review_log (flashcard_id, reviewed_at, quality, previous_interval, new_interval) "
+    "VALUES (:card_id, :now, 4, 1, 2)"
+)
+READ_SQL = (
+    "SELECT COUNT(id), SUM(CASE WHEN next_review <= :now THEN 1 ELSE 0 END), "
+    "SUM(times_reviewed), SUM(times_correct) FROM flashcards"
+)
+
+
+def make_engine(uri, tuned):
+    from sqlalchemy import create_engine, event
+    from app.config import Config
+    from app.engine import sqlite_pragma_listener
+    
+    engine = create_engine(uri)
+    if tuned:
+        event.listen(engine, 'connect', sqlite_pragma_listener(Config.SQLITE_PRAGMAS))
+    return engine
+
+
+def worker(uri, tuned, role, seconds, results):
+    from datetime import datetime, timedelta
+    from sqlalchemy import text
+    
+    engine = make_engine(uri, tuned)
+    done = errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        now = datetime.utcnow()
+        try:
+            with engine.begin() as connection:
+                if role == 'write':
+                    card_id = random.randint(1, CARDS)
+                    params = {'card_id': card_id, 'now': now, 'due': now + timedelta(days=2)}
+                    connection.execute(text(WRITE_SQL), params)
+                    connection.execute(text(LOG_SQL), params)
+                else:
+                    connection.execute(text(READ_SQL), {'now': now}).one()
+            done += 1
+        except Exception:
+            # "database is locked" once the busy handler gives up
+            errors += 1
+    results.put((role, done, errors))
+    engine.dispose()
+
+
+def run_profile(name, tuned, args):
+    handle, path = tempfile.mkstemp(suffix='.db')
+    os.close(handle)
+    uri = f'sqlite:///{path}'
+    
+    from app import db
+    from app.models import Flashcard
+    
+    engine = make_engine(uri, tuned)
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(Flashcard.__table__.insert(), [
+            {'question': f'q{i}', 'answer': 'a', 'difficulty': 3, 'priority': 35.0} for i in range(CARDS)
+        ])
+    engine.dispose()
+    
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(uri, tuned, role, args.seconds, results))
+        for role in ['write'] * args.writers + ['read'] * args.readers
+    ]
+    for process in processes:
+        process.start()
+    totals = {'write': [0, 0], 'read': [0, 0]}
+    for _ in processes:
+        role, done, errors = results.get()
+        totals[role][0] += done
+        totals[role][1] += errors
+    for process in processes:
+        process.join()
+    os.remove(path)
+    
+    print(f'{name:>8} {totals["write"][0] / args.seconds:>10.0f} {totals["write"][1]:>12} '
+          f'{totals["read"][0] / args.seconds:>10.0f} {totals["read"][1]:>11}')
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+    
+    print(f'{args.writers} writers, {args.readers} readers, {args.seconds:g}s per profile')
+    print(f'{"profile":>8} {"writes/s":>10} {"write errors":>12} {"reads/s":>10} {"read errors":>11}')
+    baseline = run_profile('default', False, args)
+    tuned = run_profile('tuned', True, args)
+    if baseline['write'][0]:
+        print(f'write throughput x{tuned["write"][0] / baseline["write"][0]:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -104,11 +104,21 @@ class ApiClient {
         return this.request('/api/study/answer', { method: 'POST', token, body: JSON.stringify(data) });
     }
 
+    async submitAnswers(token: string, answers: { flashcard_id: number; quality: number; answered_at?: string }[]) {
+        return this.request('/api/study/answers', { method: 'POST', token, body: JSON.stringify({ answers }) });
+    }
+
     async getStudyStats(token: string, deckId?: number) {
         const query = deckId ? `?deck_id=${deckId}` : '';
         return this.request(`/api/study/stats${query}`, { token });
     }
 
+    async getForecast(token: string, days = 30, deckId?: number) {
+        const params = new URLSearchParams({ days: days.toString() });
+        if (deckId) params.set('deck_id', deckId.toString());
+        return this.request(`/api/study/forecast?${params.toString()}`, { token });
+    }
+
     // Dashboard
     async getDashboard(token: string) {
         return this.request('/api/users/dashboard', { token });
@@ -0,0 +1,117 @@
+"""Baseline schema: students, users, decks, flashcards, test_results
+
+Revision ID: 0001_baseline
+Revises: 
+Create Date: 2026-10-16 09:00:00
+
+Databases created by earlier releases (db.create_all) already have these
+tables; they are only created when missing, so `flask db upgrade` works on
+both new and existing databases.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if not _has_table('students'):
+        op.create_table(
+            'students',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('roll_no', sa.String(length=20), nullable=False),
+            sa.Column('student_class', sa.String(length=20), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('roll_no')
+        )
+    
+    if not _has_table('users'):
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(length=80), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=False),
+            sa.Column('password_hash', sa.String(length=256), nullable=False),
+            sa.Column('full_name', sa.String(length=120), nullable=True),
+            sa.Column('avatar_url', sa.String(length=256), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('last_login', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_users_email', 'users', ['email'], unique=True)
+        op.create_index('ix_users_username', 'users', ['username'], unique=True)
+    
+    if not _has_table('decks'):
+        op.create_table(
+            'decks',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('category', sa.String(length=50), nullable=True),
+            sa.Column('tags', sa.String(length=200), nullable=True),
+            sa.Column('card_count', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('parent_id', sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(['parent_id'], ['decks.id']),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    
+    if not _has_table('flashcards'):
+        op.create_table(
+            'flashcards',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('deck_id', sa.Integer(), nullable=True),
+            sa.Column('question', sa.Text(), nullable=False),
+            sa.Column('answer', sa.Text(), nullable=False),
+            sa.Column('difficulty', sa.Integer(), nullable=True),
+            sa.Column('times_reviewed', sa.Integer(), nullable=True),
+            sa.Column('times_correct', sa.Integer(), nullable=True),
+            sa.Column('ease_factor', sa.Float(), nullable=True),
+            sa.Column('interval_days', sa.Integer(), nullable=True),
+            sa.Column('next_review', sa.DateTime(), nullable=True),
+            sa.Column('last_reviewed', sa.DateTime(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['deck_id'], ['decks.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    
+    if not _has_table('test_results'):
+        op.create_table(
+            'test_results',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('student_id', sa.Integer(), nullable=False),
+            sa.Column('deck_id', sa.Integer(), nullable=True),
+            sa.Column('total_questions', sa.Integer(), nullable=False),
+            sa.Column('correct_answers', sa.Integer(), nullable=False),
+            sa.Column('wrong_answers', sa.Integer(), nullable=False),
+            sa.Column('score_percentage', sa.Float(), nullable=False),
+            sa.Column('time_taken_seconds', sa.Integer(), nullable=True),
+            sa.Column('completed_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['deck_id'], ['decks.id']),
+            sa.ForeignKeyConstraint(['student_id'], ['students.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('test_results')
+    op.drop_table('flashcards')
+    op.drop_table('decks')
+    op.drop_table('users')
+    op.drop_table('students')
@@ -0,0 +1,167 @@
+"""Card scheduling: stored priority, due-date sentinel, FSRS state, review log
+
+Revision ID: 0002_card_scheduling
+Revises: 0001_baseline
+Create Date: 2026-10-16 09:10:00
+
+Adds flashcards.priority (backfilled with Flashcard.compute_priority),
+makes next_review NOT NULL with never-reviewed cards due at the 1970-01-01
+sentinel, adds the FSRS columns and per-user/per-deck scheduler settings,
+the review_log table, and the pagination / conditional GET indexes.
+Columns, tables and indexes that db.create_all() already made are skipped.
+
+Schema by backlog request:
+    user-001  flashcards.priority (+ backfill), ix_flashcards_priority,
+              ix_flashcards_deck_priority
+    user-002  next_review NOT NULL with the 1970-01-01 sentinel,
+              ix_flashcards_next_review, ix_flashcards_deck_next_review
+    user-007  ix_flashcards_created, ix_flashcards_deck_created,
+              ix_test_results_completed, ix_test_results_student_completed
+    user-008  review_log and its indexes
+    user-011  flashcards.stability / memory_difficulty, users.scheduler /
+              fsrs_params / desired_retention, decks.scheduler
+    user-015  ix_flashcards_updated, ix_flashcards_deck_updated
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_card_scheduling'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+# Flashcard.NEW_CARD_DUE
+NEW_CARD_DUE = datetime(1970, 1, 1)
+
+flashcards = sa.table(
+    'flashcards',
+    sa.column('difficulty', sa.Integer),
+    sa.column('times_reviewed', sa.Integer),
+    sa.column('times_correct', sa.Integer),
+    sa.column('next_review', sa.DateTime),
+    sa.column('priority', sa.Float)
+)
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _columns(table):
+    return {column['name']: column for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _add_columns(table, *columns):
+    existing = _columns(table)
+    missing = [column for column in columns if column.name not in existing]
+    if missing:
+        with op.batch_alter_table(table) as batch_op:
+            for column in missing:
+                batch_op.add_column(column)
+
+
+def _create_indexes(table, *indexes):
+    existing = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+    for name, columns in indexes:
+        if name not in existing:
+            op.create_index(name, table, columns)
+
+
+def _priority():
+    """Flashcard.compute_priority as a SQL expression."""
+    reviewed = sa.func.coalesce(flashcards.c.times_reviewed, 0)
+    correct = sa.func.coalesce(flashcards.c.times_correct, 0)
+    error_rate = sa.case((reviewed == 0, 0.5), else_=1.0 - sa.cast(correct, sa.Float) / reviewed)
+    new_card_boost = sa.case((reviewed < 3, 20), else_=0)
+    difficulty = sa.case((sa.func.coalesce(flashcards.c.difficulty, 0) == 0, 1), else_=flashcards.c.difficulty)
+    return error_rate * 100 + new_card_boost + difficulty * 5
+
+
+def upgrade():
+    _add_columns(
+        'flashcards',
+        sa.Column('stability', sa.Float(), nullable=True),
+        sa.Column('memory_difficulty', sa.Float(), nullable=True),
+        sa.Column('priority', sa.Float(), nullable=True)
+    )
+    _add_columns(
+        'users',
+        sa.Column('scheduler', sa.String(length=20), nullable=False, server_default='sm2'),
+        sa.Column('fsrs_params', sa.JSON(), nullable=True),
+        sa.Column('desired_retention', sa.Float(), nullable=False, server_default='0.9')
+    )
+    _add_columns('decks', sa.Column('scheduler', sa.String(length=20), nullable=True))
+    
+    op.execute(flashcards.update().where(flashcards.c.priority.is_(None)).values(priority=_priority()))
+    op.execute(flashcards.update().where(flashcards.c.next_review.is_(None)).values(next_review=NEW_CARD_DUE))
+    if _columns('flashcards')['next_review']['nullable']:
+        with op.batch_alter_table('flashcards') as batch_op:
+            batch_op.alter_column('next_review', existing_type=sa.DateTime(), nullable=False)
+    
+    _create_indexes(
+        'flashcards',
+        ('ix_flashcards_priority', ['priority']),
+        ('ix_flashcards_next_review', ['next_review']),
+        ('ix_flashcards_deck_priority', ['deck_id', 'priority']),
+        ('ix_flashcards_deck_next_review', ['deck_id', 'next_review']),
+        ('ix_flashcards_created', ['created_at', 'id']),
+        ('ix_flashcards_deck_created', ['deck_id', 'created_at', 'id']),
+        ('ix_flashcards_updated', ['updated_at']),
+        ('ix_flashcards_deck_updated', ['deck_id', 'updated_at'])
+    )
+    _create_indexes(
+        'test_results',
+        ('ix_test_results_completed', ['completed_at', 'id']),
+        ('ix_test_results_student_completed', ['student_id', 'completed_at', 'id'])
+    )
+    
+    if not _has_table('review_log'):
+        op.create_table(
+            'review_log',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('flashcard_id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('reviewed_at', sa.DateTime(), nullable=False),
+            sa.Column('quality', sa.SmallInteger(), nullable=False),
+            sa.Column('previous_interval', sa.Integer(), nullable=True),
+            sa.Column('new_interval', sa.Integer(), nullable=True),
+            sa.Column('elapsed_days', sa.Float(), nullable=True),
+            sa.ForeignKeyConstraint(['flashcard_id'], ['flashcards.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    _create_indexes(
+        'review_log',
+        ('ix_review_log_card_reviewed', ['flashcard_id', 'reviewed_at']),
+        ('ix_review_log_user_reviewed', ['user_id', 'reviewed_at']),
+        ('ix_review_log_reviewed', ['reviewed_at'])
+    )
+
+
+def downgrade():
+    op.drop_table('review_log')
+    for name in ('ix_test_results_student_completed', 'ix_test_results_completed'):
+        op.drop_index(name, table_name='test_results')
+    for name in ('ix_flashcards_deck_updated', 'ix_flashcards_updated', 'ix_flashcards_deck_created',
+                 'ix_flashcards_created', 'ix_flashcards_deck_next_review', 'ix_flashcards_deck_priority',
+                 'ix_flashcards_next_review', 'ix_flashcards_priority'):
+        op.drop_index(name, table_name='flashcards')
+    
+    with op.batch_alter_table('flashcards') as batch_op:
+        batch_op.alter_column('next_review', existing_type=sa.DateTime(), nullable=True)
+    op.execute(flashcards.update().where(flashcards.c.next_review == NEW_CARD_DUE).values(next_review=None))
+    
+    with op.batch_alter_table('flashcards') as batch_op:
+        batch_op.drop_column('priority')
+        batch_op.drop_column('memory_difficulty')
+        batch_op.drop_column('stability')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('desired_retention')
+        batch_op.drop_column('fsrs_params')
+        batch_op.drop_column('scheduler')
+    with op.batch_alter_table('decks') as batch_op:
+        batch_op.drop_column('scheduler')
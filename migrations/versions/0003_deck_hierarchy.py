@@ -0,0 +1,162 @@
+"""Deck hierarchy: materialized paths, rolled-up card counts, review stats rollup
+
+Revision ID: 0003_deck_hierarchy
+Revises: 0002_card_scheduling
+Create Date: 2026-10-16 09:20:00
+
+Adds decks.path and decks.total_card_count and fills them (the same work
+as `flask decks rebuild-paths` and `flask decks reconcile-counts`), then
+creates deck_stats and seeds it from the cards table (as `flask decks
+reconcile-stats` does).
+
+Schema by backlog request:
+    user-003  decks.path (+ rebuild)
+    user-004  decks.total_card_count (+ reconcile)
+    user-005  deck_stats (+ rebuild)
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_deck_hierarchy'
+down_revision = '0002_card_scheduling'
+branch_labels = None
+depends_on = None
+
+# DeckStats.MASTERED_INTERVAL
+MASTERED_INTERVAL = 21
+
+decks = sa.table(
+    'decks',
+    sa.column('id', sa.Integer),
+    sa.column('parent_id', sa.Integer),
+    sa.column('path', sa.String),
+    sa.column('card_count', sa.Integer),
+    sa.column('total_card_count', sa.Integer)
+)
+flashcards = sa.table(
+    'flashcards',
+    sa.column('id', sa.Integer),
+    sa.column('deck_id', sa.Integer),
+    sa.column('times_reviewed', sa.Integer),
+    sa.column('times_correct', sa.Integer),
+    sa.column('interval_days', sa.Integer)
+)
+deck_stats = sa.table(
+    'deck_stats',
+    sa.column('deck_id', sa.Integer),
+    sa.column('total_reviews', sa.Integer),
+    sa.column('total_correct', sa.Integer),
+    sa.column('mastered_count', sa.Integer),
+    sa.column('new_count', sa.Integer),
+    sa.column('updated_at', sa.DateTime)
+)
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _index_names(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def _rebuild_paths(connection):
+    """Deck.rebuild_paths, on the migration connection."""
+    parents = dict(connection.execute(sa.select(decks.c.id, decks.c.parent_id)).all())
+    paths = {}
+    
+    def resolve(deck_id):
+        if deck_id not in paths:
+            parent_id = parents.get(deck_id)
+            parent_path = resolve(parent_id) if parent_id in parents else None
+            paths[deck_id] = f'{parent_path or "/"}{deck_id}/'
+        return paths[deck_id]
+    
+    for deck_id in parents:
+        resolve(deck_id)
+    
+    if paths:
+        connection.execute(
+            decks.update().where(decks.c.id == sa.bindparam('deck_id')),
+            [{'deck_id': deck_id, 'path': path} for deck_id, path in paths.items()]
+        )
+
+
+def upgrade():
+    connection = op.get_bind()
+    
+    missing = [
+        column for column in (
+            sa.Column('total_card_count', sa.Integer(), nullable=True),
+            sa.Column('path', sa.String(length=255), nullable=True)
+        ) if column.name not in _columns('decks')
+    ]
+    if missing:
+        with op.batch_alter_table('decks') as batch_op:
+            for column in missing:
+                batch_op.add_column(column)
+    if 'ix_decks_path' not in _index_names('decks'):
+        op.create_index('ix_decks_path', 'decks', ['path'])
+    
+    _rebuild_paths(connection)
+    
+    # Deck.reconcile_card_counts
+    subtree = decks.alias('subtree')
+    direct = sa.select(sa.func.count()).where(flashcards.c.deck_id == decks.c.id).scalar_subquery()
+    total = (
+        sa.select(sa.func.count())
+        .select_from(flashcards.join(subtree, flashcards.c.deck_id == subtree.c.id))
+        .where(subtree.c.path.startswith(decks.c.path))
+        .scalar_subquery()
+    )
+    connection.execute(decks.update().values(card_count=direct, total_card_count=total))
+    
+    if not _has_table('deck_stats'):
+        op.create_table(
+            'deck_stats',
+            sa.Column('deck_id', sa.Integer(), nullable=False),
+            sa.Column('total_reviews', sa.Integer(), nullable=False),
+            sa.Column('total_correct', sa.Integer(), nullable=False),
+            sa.Column('mastered_count', sa.Integer(), nullable=False),
+            sa.Column('new_count', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['deck_id'], ['decks.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('deck_id')
+        )
+    
+    # DeckStats.rebuild
+    reviewed = sa.func.coalesce(flashcards.c.times_reviewed, 0)
+    rollup = (
+        sa.select(
+            decks.c.id,
+            sa.func.coalesce(sa.func.sum(reviewed), 0),
+            sa.func.coalesce(sa.func.sum(flashcards.c.times_correct), 0),
+            sa.func.coalesce(sa.func.sum(sa.case(
+                ((reviewed > 0) & (flashcards.c.interval_days >= MASTERED_INTERVAL), 1), else_=0
+            )), 0),
+            sa.func.coalesce(sa.func.sum(sa.case(
+                ((flashcards.c.id.isnot(None)) & (reviewed == 0), 1), else_=0
+            )), 0),
+            sa.func.now()
+        )
+        .select_from(decks.outerjoin(flashcards, flashcards.c.deck_id == decks.c.id))
+        .group_by(decks.c.id)
+    )
+    connection.execute(deck_stats.delete())
+    connection.execute(deck_stats.insert().from_select(
+        ['deck_id', 'total_reviews', 'total_correct', 'mastered_count', 'new_count', 'updated_at'], rollup
+    ))
+
+
+def downgrade():
+    op.drop_table('deck_stats')
+    op.drop_index('ix_decks_path', table_name='decks')
+    with op.batch_alter_table('decks') as batch_op:
+        batch_op.drop_column('path')
+        batch_op.drop_column('total_card_count')
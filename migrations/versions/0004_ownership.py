@@ -0,0 +1,104 @@
+"""Ownership: user_id on cards and test results, user-leading indexes, revoked tokens
+
+Revision ID: 0004_ownership
+Revises: 0003_deck_hierarchy
+Create Date: 2026-10-16 09:30:00
+
+Adds flashcards.user_id and test_results.user_id and copies them from the
+deck owner (as `flask decks backfill-owners` does for decks that already
+have one), the per-user indexes used by the REST API, and the shared
+revoked_tokens table.
+
+Schema by backlog request:
+    user-021  flashcards.user_id and test_results.user_id (+ backfill) and
+              the user-leading indexes on flashcards, decks and test_results
+    user-022  revoked_tokens and its indexes
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_ownership'
+down_revision = '0003_deck_hierarchy'
+branch_labels = None
+depends_on = None
+
+decks = sa.table('decks', sa.column('id', sa.Integer), sa.column('user_id', sa.Integer))
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _create_indexes(table, *indexes):
+    existing = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+    for name, columns in indexes:
+        if name not in existing:
+            op.create_index(name, table, columns)
+
+
+def upgrade():
+    for table in ('flashcards', 'test_results'):
+        if 'user_id' not in _columns(table):
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.add_column(sa.Column('user_id', sa.Integer(), nullable=True))
+                batch_op.create_foreign_key(f'fk_{table}_user_id_users', 'users', ['user_id'], ['id'])
+        
+        owned = sa.table(table, sa.column('deck_id', sa.Integer), sa.column('user_id', sa.Integer))
+        deck_owner = sa.select(decks.c.user_id).where(decks.c.id == owned.c.deck_id).scalar_subquery()
+        op.execute(
+            owned.update()
+            .where(owned.c.user_id.is_(None), owned.c.deck_id.isnot(None))
+            .values(user_id=deck_owner)
+        )
+    
+    _create_indexes(
+        'flashcards',
+        ('ix_flashcards_user_priority', ['user_id', 'priority']),
+        ('ix_flashcards_user_next_review', ['user_id', 'next_review']),
+        ('ix_flashcards_user_created', ['user_id', 'created_at', 'id']),
+        ('ix_flashcards_user_updated', ['user_id', 'updated_at'])
+    )
+    _create_indexes(
+        'decks',
+        ('ix_decks_user_parent_name', ['user_id', 'parent_id', 'name']),
+        ('ix_decks_user_created', ['user_id', 'created_at']),
+        ('ix_decks_user_updated', ['user_id', 'updated_at']),
+        ('ix_decks_user_path', ['user_id', 'path'])
+    )
+    _create_indexes('test_results', ('ix_test_results_user_completed', ['user_id', 'completed_at', 'id']))
+    
+    if not _has_table('revoked_tokens'):
+        op.create_table(
+            'revoked_tokens',
+            sa.Column('jti', sa.String(length=64), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('revoked_at', sa.DateTime(), nullable=False),
+            sa.Column('expires_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('jti')
+        )
+    _create_indexes(
+        'revoked_tokens',
+        ('ix_revoked_tokens_revoked_at', ['revoked_at']),
+        ('ix_revoked_tokens_expires_at', ['expires_at'])
+    )
+
+
+def downgrade():
+    op.drop_table('revoked_tokens')
+    op.drop_index('ix_test_results_user_completed', table_name='test_results')
+    for name in ('ix_decks_user_path', 'ix_decks_user_updated', 'ix_decks_user_created', 'ix_decks_user_parent_name'):
+        op.drop_index(name, table_name='decks')
+    for name in ('ix_flashcards_user_updated', 'ix_flashcards_user_created', 'ix_flashcards_user_next_review',
+                 'ix_flashcards_user_priority'):
+        op.drop_index(name, table_name='flashcards')
+    for table in ('test_results', 'flashcards'):
+        # Dropping the column drops its foreign key (named here, unnamed under create_all)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('user_id')
@@ -0,0 +1,53 @@
+import os
+import tempfile
+
+import pytest
+
+# Config reads the environment at import time: point every database and
+# cache file at a scratch directory before the app package is imported
+_scratch = tempfile.mkdtemp(prefix='flashcards-tests-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_scratch, 'app.db')
+os.environ['GENERATION_CACHE_PATH'] = os.path.join(_scratch, 'generation_cache.db')
+os.environ['EVALUATION_CACHE_PATH'] = os.path.join(_scratch, 'evaluation_cache.db')
+os.environ['RESPONSE_CACHE_PATH'] = os.path.join(_scratch, 'response_cache.db')
+
+from app import create_app, db  # noqa: E402
+from app.services.response_cache import response_cache  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    app = create_app('production')
+    app.config['TESTING'] = True
+    yield app
+    response_cache.backend.clear()
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def register(client, username):
+    """Register `username` and return Authorization headers for them."""
+    response = client.post('/api/auth/register', json={
+        'username': username,
+        'email': f'{username}@example.com',
+        'password': 'secret123'
+    })
+    assert response.status_code == 201, response.get_json()
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+@pytest.fixture
+def alice(client):
+    return register(client, 'alice')
+
+
+@pytest.fixture
+def bob(client):
+    return register(client, 'bob')
@@ -0,0 +1,38 @@
+import json
+
+from app.models import Flashcard, User
+from test_decks import create_deck
+
+
+def save_form(client, deck_id, *flashcards):
+    return client.post('/ai/save', data={'deck_id': str(deck_id), 'flashcards': list(flashcards)})
+
+
+def test_form_saves_belong_to_the_decks_owner(app, client, alice):
+    deck_id = create_deck(client, alice, 'Biology')
+    cards = [{'question': f'Q{i}', 'answer': f'A{i}'} for i in range(3)]
+    
+    response = save_form(client, deck_id, *[json.dumps(card) for card in cards],
+                         json.dumps({'question': 'no answer'}))
+    assert response.status_code == 302
+    
+    with app.app_context():
+        alice_id = User.query.filter_by(username='alice').one().id
+        saved = Flashcard.query.filter_by(deck_id=deck_id).all()
+        assert sorted(card.question for card in saved) == ['Q0', 'Q1', 'Q2']
+        assert {card.user_id for card in saved} == {alice_id}
+    assert len(client.get('/api/flashcards', headers=alice).get_json()['flashcards']) == 3
+
+
+def test_saves_reject_items_that_are_not_objects(app, client, alice):
+    deck_id = create_deck(client, alice, 'Biology')
+    
+    # Two objects in one form value no longer splice into the list
+    for item in ('"just a string"', '42', '{"question": "a", "answer": "b"},{"question": "c", "answer": "d"}'):
+        assert save_form(client, deck_id, item).status_code == 302
+    for item in ('just a string', 42, ['question', 'answer']):
+        response = client.post('/ai/save', json={'deck_id': deck_id, 'flashcards': [item]})
+        assert response.status_code == 400
+    
+    with app.app_context():
+        assert Flashcard.query.count() == 0
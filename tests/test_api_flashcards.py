@@ -0,0 +1,60 @@
+def create_card(client, headers, question='What is 2 + 2?', answer='4', **extra):
+    response = client.post('/api/flashcards', headers=headers, json={
+        'question': question, 'answer': answer, **extra
+    })
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['flashcard']['id']
+
+
+def test_flashcard_routes_require_a_token(client):
+    assert client.get('/api/flashcards').status_code == 401
+    assert client.post('/api/flashcards', json={'question': 'q', 'answer': 'a'}).status_code == 401
+
+
+def test_users_cannot_see_each_others_cards(client, alice, bob):
+    card_id = create_card(client, alice)
+    
+    assert client.get(f'/api/flashcards/{card_id}', headers=bob).status_code == 404
+    assert client.put(f'/api/flashcards/{card_id}', headers=bob, json={'answer': 'five'}).status_code == 404
+    assert client.delete(f'/api/flashcards/{card_id}', headers=bob).status_code == 404
+    assert client.get('/api/flashcards', headers=bob).get_json()['flashcards'] == []
+    
+    owned = client.get(f'/api/flashcards/{card_id}', headers=alice)
+    assert owned.status_code == 200
+    assert owned.get_json()['flashcard']['answer'] == '4'
+
+
+def test_cursor_pagination_walks_every_card_once(client, alice, bob):
+    card_ids = [create_card(client, alice, question=f'Question {i}') for i in range(7)]
+    create_card(client, bob)
+    
+    seen, cursor, pages = [], '', 0
+    while cursor is not None:
+        response = client.get('/api/flashcards', headers=alice, query_string={'cursor': cursor, 'per_page': 3})
+        assert response.status_code == 200
+        body = response.get_json()
+        assert 'pages' not in body  # keyset mode, not page numbers
+        seen.extend(card['id'] for card in body['flashcards'])
+        cursor = body['next_cursor']
+        pages += 1
+    
+    assert pages == 3
+    assert seen == sorted(card_ids, reverse=True)
+
+
+def test_malformed_cursor_is_rejected(client, alice):
+    response = client.get('/api/flashcards', headers=alice, query_string={'cursor': 'not-a-cursor'})
+    assert response.status_code == 400
+
+
+def test_random_card_comes_from_the_callers_cards(client, alice, bob):
+    assert client.get('/api/flashcards/random', headers=alice).status_code == 404
+    
+    card_ids = {create_card(client, alice, question=f'Question {i}') for i in range(3)}
+    create_card(client, bob)
+    
+    for _ in range(10):
+        response = client.get('/api/flashcards/random', headers=alice)
+        assert response.status_code == 200
+        assert response.get_json()['flashcard']['id'] in card_ids
+    assert client.get('/api/flashcards/random').status_code == 401
@@ -0,0 +1,55 @@
+from sqlalchemy import event
+
+from app import db
+
+
+def create_deck(client, headers, name, parent_id=None):
+    response = client.post('/api/flashcards/decks', headers=headers, json={'name': name, 'parent_id': parent_id})
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['deck']['id']
+
+
+def count_queries(app, call):
+    statements = []
+    
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = call()
+    finally:
+        with app.app_context():
+            event.remove(db.engine, 'before_cursor_execute', record)
+    return response, len(statements)
+
+
+def test_deck_list_counts_sub_decks_in_one_query(app, client, alice):
+    root = create_deck(client, alice, 'Languages')
+    for name in ('French', 'German', 'Spanish'):
+        create_deck(client, alice, name, parent_id=root)
+    _, few = count_queries(app, lambda: client.get('/api/decks'))
+    
+    for name in ('Italian', 'Dutch', 'Polish', 'Greek'):
+        create_deck(client, alice, name, parent_id=root)
+    response, many = count_queries(app, lambda: client.get('/api/decks'))
+    
+    assert response.status_code == 200
+    assert many == few
+    folders = {deck['name']: deck['is_folder'] for deck in response.get_json()}
+    assert folders['Languages'] is True
+    assert folders['French'] is False
+
+
+def test_deck_tree_refuses_decks_without_paths(app, client, alice):
+    root = create_deck(client, alice, 'Languages')
+    create_deck(client, alice, 'French', parent_id=root)
+    assert client.get(f'/api/flashcards/decks/tree?root_id={root}', headers=alice).status_code == 200
+    
+    with app.app_context():
+        db.session.execute(db.text('UPDATE decks SET path = NULL'))
+        db.session.commit()
+    
+    assert client.get(f'/api/flashcards/decks/tree?root_id={root}', headers=alice).status_code == 409
+    assert client.get('/api/flashcards/decks/tree', headers=alice).status_code == 409
@@ -0,0 +1,20 @@
+import pytest
+
+from app.services.evaluation_service import normalize_answer
+
+
+@pytest.mark.parametrize('first, second', [
+    ('-2', '2'),
+    ('x = -3', 'x = 3'),
+    ('2/3', '2*3'),
+    ('3.14', '314'),
+    ('before the war', 'after the war'),
+    ('above the membrane', 'below the membrane'),
+    ('is a mammal', 'is not a mammal'),
+])
+def test_answers_with_different_meanings_get_different_keys(first, second):
+    assert normalize_answer(first) != normalize_answer(second)
+
+
+def test_case_and_whitespace_variants_share_a_key():
+    assert normalize_answer('  The Powerhouse\tof the\n cell ') == normalize_answer('the powerhouse of the cell')
@@ -0,0 +1,19 @@
+from app.services.identity_cache import identity_cache
+from test_api_flashcards import create_card
+
+
+def cached_identities():
+    return identity_cache.backend.size()
+
+
+def test_profile_changes_retire_cached_identity_but_card_writes_do_not(app, client, alice):
+    assert client.get('/api/auth/me', headers=alice).get_json()['user']['full_name'] is None
+    cached = cached_identities()
+    
+    create_card(client, alice)
+    assert client.get('/api/auth/me', headers=alice).status_code == 200
+    assert cached_identities() == cached
+    
+    response = client.put('/api/users/profile', headers=alice, json={'full_name': 'Alice Liddell'})
+    assert response.status_code == 200, response.get_json()
+    assert client.get('/api/auth/me', headers=alice).get_json()['user']['full_name'] == 'Alice Liddell'
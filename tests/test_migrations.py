@@ -0,0 +1,27 @@
+import os
+
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import downgrade, upgrade
+
+from app import db
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+
+def schema_diff():
+    with db.engine.connect() as connection:
+        return compare_metadata(MigrationContext.configure(connection), db.metadata)
+
+
+def test_migrations_bring_the_baseline_schema_up_to_the_models(app):
+    with app.app_context():
+        # create_all already built the current schema: upgrading over it is a no-op
+        upgrade(directory=MIGRATIONS)
+        assert schema_diff() == []
+        
+        # Back to the tables of the first release, then forward again
+        downgrade(directory=MIGRATIONS, revision='0001_baseline')
+        assert 'priority' not in {c['name'] for c in db.inspect(db.engine).get_columns('flashcards')}
+        upgrade(directory=MIGRATIONS)
+        assert schema_diff() == []
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from app import create_app, db
+from app.config import ProductionConfig, replica_binds
+from app.engine import REPLICA_BIND
+from conftest import _scratch
+
+
+@pytest.fixture
+def replica_app(monkeypatch):
+    monkeypatch.setattr(ProductionConfig, 'SQLALCHEMY_BINDS',
+                        replica_binds('sqlite:///' + os.path.join(_scratch, 'replica.db')))
+    monkeypatch.setattr(ProductionConfig, 'REPLICA_STICKY_PATH', os.path.join(_scratch, 'replica_sticky.db'), raising=False)
+    app = create_app('production')
+    app.config['TESTING'] = True
+    # The replica starts as a copy of the (empty) primary and is never synced again
+    assert app.test_cli_runner().invoke(args=['replica', 'sync']).exit_code == 0
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        for engine in db.engines.values():
+            engine.dispose()
+    # init_app registered a metadata for the replica bind on the shared db object
+    db.metadatas.pop(REPLICA_BIND, None)
+
+
+def test_new_logins_read_their_own_writes_from_the_primary(replica_app):
+    client = replica_app.test_client()
+    response = client.post('/api/auth/register', json={
+        'username': 'carol', 'email': 'carol@example.com', 'password': 'secret123'
+    })
+    assert response.status_code == 201
+    headers = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+    
+    me = client.get('/api/auth/me', headers=headers)
+    assert me.status_code == 200, me.get_json()
+    assert me.get_json()['user']['username'] == 'carol'
@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Deck, Flashcard, User
+from app.scheduling import FSRSScheduler
+from app.services.rescheduler import BulkRescheduler
+
+
+def test_recompute_follows_each_cards_scheduler(app, alice):
+    last_reviewed = datetime.utcnow() - timedelta(days=3)
+    with app.app_context():
+        user = User.query.filter_by(username='alice').one()
+        user.desired_retention = 0.9
+        sm2_deck = Deck(name='SM-2', user_id=user.id)
+        fsrs_deck = Deck(name='FSRS', user_id=user.id, scheduler='fsrs', parent=sm2_deck)
+        db.session.add_all([sm2_deck, fsrs_deck])
+        db.session.flush()
+        card = dict(user_id=user.id, answer='a', times_reviewed=5, interval_days=10, last_reviewed=last_reviewed)
+        db.session.add_all([
+            Flashcard(question='sm2', deck_id=sm2_deck.id, **card),
+            Flashcard(question='fsrs', deck_id=fsrs_deck.id, stability=40.0, **card),
+            Flashcard(question='fsrs, not yet reviewed under FSRS', deck_id=fsrs_deck.id, **card)
+        ])
+        db.session.commit()
+        
+        assert BulkRescheduler(sm2_deck.id, include_subdecks=True).recompute(interval_modifier=2.0) == 3
+        db.session.commit()
+        
+        intervals = {row.question: row.interval_days for row in Flashcard.query}
+        # R(S, S) = 0.9, so at 90% desired retention the FSRS interval equals the stability
+        assert intervals == {
+            'sm2': 20,
+            'fsrs': 2 * FSRSScheduler(desired_retention=0.9).next_interval(40.0),
+            'fsrs, not yet reviewed under FSRS': 20
+        }
+        assert Flashcard.query.filter_by(question='fsrs').one().next_review == last_reviewed + timedelta(days=80)
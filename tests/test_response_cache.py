@@ -0,0 +1,19 @@
+from test_api_flashcards import create_card
+
+
+def dashboard(client, headers):
+    response = client.get('/api/users/dashboard', headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return response.headers.get('X-Cache')
+
+
+def test_writes_only_invalidate_the_writers_cached_views(client, alice, bob):
+    create_card(client, alice)
+    assert dashboard(client, alice) == 'MISS'
+    assert dashboard(client, alice) == 'HIT'
+    
+    create_card(client, bob)
+    assert dashboard(client, alice) == 'HIT'
+    
+    create_card(client, alice)
+    assert dashboard(client, alice) == 'MISS'
@@ -0,0 +1,63 @@
+import time
+from datetime import datetime
+
+from app import db
+from app.models import ReviewLog
+from app.services.review_log import ReviewLogBuffer
+
+
+def create_card(client, headers):
+    response = client.post('/api/flashcards', headers=headers, json={'question': 'q', 'answer': 'a'})
+    return response.get_json()['flashcard']['id']
+
+
+def record(card_id, quality=4):
+    return {'flashcard_id': card_id, 'reviewed_at': datetime.utcnow(), 'quality': quality,
+            'previous_interval': None, 'new_interval': 1, 'elapsed_days': None}
+
+
+def buffer_for(app, **settings):
+    app.config.update(REVIEW_LOG_BATCH_SIZE=50, REVIEW_LOG_FLUSH_SECONDS=0, **settings)
+    buffer = ReviewLogBuffer()
+    buffer.init_app(app)
+    return buffer
+
+
+def test_a_bad_record_is_dropped_and_the_rest_written(app, client, alice):
+    card_id = create_card(client, alice)
+    buffer = buffer_for(app)
+    with app.app_context():
+        buffer.add(record(card_id))
+        buffer.add(record(card_id, quality=None))  # violates NOT NULL
+        buffer.add(record(card_id, quality=2))
+        
+        assert buffer.flush() == 2
+        assert len(buffer) == 0
+        assert [log.quality for log in ReviewLog.query.order_by(ReviewLog.id)] == [4, 2]
+
+
+def test_buffer_keeps_only_the_newest_records_when_full(app, client, alice):
+    card_id = create_card(client, alice)
+    buffer = buffer_for(app, REVIEW_LOG_MAX_BUFFER=3)
+    with app.app_context():
+        for quality in range(5):
+            buffer.add(record(card_id, quality=quality))
+        
+        assert len(buffer) == 3
+        buffer.flush()
+        assert [log.quality for log in ReviewLog.query.order_by(ReviewLog.id)] == [2, 3, 4]
+
+
+def test_idle_worker_flushes_in_the_background(app, client, alice):
+    card_id = create_card(client, alice)
+    buffer = buffer_for(app)
+    buffer.max_age = 0.1
+    with app.app_context():
+        buffer.add(record(card_id))
+        
+        deadline = time.monotonic() + 2
+        while len(buffer) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        
+        assert len(buffer) == 0
+        assert db.session.query(ReviewLog).count() == 1
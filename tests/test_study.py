@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Flashcard
+from test_api_flashcards import create_card
+
+
+def session_questions(client, headers, **params):
+    response = client.get('/api/study/session', headers=headers, query_string={'mode': 'due', **params})
+    assert response.status_code == 200, response.get_json()
+    return [card['question'] for card in response.get_json()['flashcards']]
+
+
+def test_due_session_puts_overdue_reviews_before_new_cards(app, client, alice):
+    for i in range(3):
+        create_card(client, alice, question=f'new {i}')
+    overdue = [create_card(client, alice, question=f'overdue {i}') for i in range(2)]
+    with app.app_context():
+        for days, card_id in zip((1, 5), overdue):
+            db.session.get(Flashcard, card_id).next_review = datetime.utcnow() - timedelta(days=days)
+        db.session.commit()
+    
+    assert session_questions(client, alice, limit=3) == ['overdue 1', 'overdue 0', 'new 0']
+    assert session_questions(client, alice, limit=10, new_limit=1) == ['overdue 1', 'overdue 0', 'new 0']
+    assert session_questions(client, alice, limit=10) == ['overdue 1', 'overdue 0', 'new 0', 'new 1', 'new 2']
+
+
+def test_answer_batches_reject_malformed_items_and_stale_timestamps(client, alice):
+    card_id = create_card(client, alice)
+    
+    def submit(*answers):
+        return client.post('/api/study/answers', headers=alice, json={'answers': list(answers)})
+    
+    assert submit(card_id).status_code == 400
+    stale = (datetime.utcnow() - timedelta(days=365)).isoformat()
+    assert submit({'flashcard_id': card_id, 'quality': 4, 'answered_at': stale}).status_code == 400
+    
+    recent = (datetime.utcnow() - timedelta(hours=2)).isoformat()
+    response = submit({'flashcard_id': card_id, 'quality': 4, 'answered_at': recent})
+    assert response.status_code == 200
+    assert response.get_json()['processed'] == 1
+
+
+def test_answer_batches_reject_out_of_range_quality_and_answers_before_the_last_review(client, alice):
+    card_id = create_card(client, alice)
+    
+    def submit(*answers):
+        return client.post('/api/study/answers', headers=alice, json={'answers': list(answers)})
+    
+    for quality in (9, -4, 'good'):
+        assert submit({'flashcard_id': card_id, 'quality': quality}).status_code == 400
+    assert client.post('/api/study/answer', headers=alice, json={'flashcard_id': card_id, 'quality': 9}).status_code == 400
+    
+    reviewed = submit({'flashcard_id': card_id, 'quality': 4})
+    assert reviewed.get_json()['processed'] == 1
+    
+    earlier = (datetime.utcnow() - timedelta(days=1)).isoformat()
+    response = submit({'flashcard_id': card_id, 'quality': 4, 'answered_at': earlier})
+    assert response.status_code == 200
+    assert response.get_json()['processed'] == 0
+    assert response.get_json()['results'][0]['error'] == "Answered before the card's last review"